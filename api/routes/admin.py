@@ -5,6 +5,16 @@ from storage.analytics_db import analytics_db
 from config.settings import selector_cache
 from typing import Optional
 from core.html_processing.renderer import get_cache_stats
+from core.html_processing.host_scheduler import get_host_scheduler
+from core.html_processing.fetcher import get_fetch_flight_stats
+from core.html_processing.render_decisions import get_render_decisions
+from core.html_processing.knowledge_service import get_knowledge_service
+from core.html_processing.circuit_breaker import get_circuit_breaker
+from core.html_processing.adaptive_concurrency import get_concurrency_controller
+from core.html_processing.request_blocking import (
+    get_blocked_hosts, add_blocked_hosts, remove_blocked_hosts, load_blocklist
+)
+from models import BlocklistUpdateRequest
 
 router = APIRouter()
 
@@ -20,6 +30,7 @@ async def cache_stats():
         "analytics": {
             "cache_hits": analytics_db["cache_hits"],
             "cache_misses": analytics_db["cache_misses"],
+            "revalidations": analytics_db["cache_revalidations"],
             "hit_rate": round(analytics_db["cache_hits"] / (analytics_db["cache_hits"] + analytics_db["cache_misses"]) * 100, 1) if (analytics_db["cache_hits"] + analytics_db["cache_misses"]) > 0 else 0
         }
     }
@@ -108,6 +119,12 @@ async def rendering_stats():
     return {
         "cache": cache_stats,
         "strategies": analytics_db["strategies_used"],
+        "scheduler": get_host_scheduler().get_stats(),
+        "fetch_coalescing": get_fetch_flight_stats(),
+        "learned_decisions": get_render_decisions().get_stats(),
+        "knowledge": get_knowledge_service().get_stats(),
+        "circuit_breaker": get_circuit_breaker().get_stats(),
+        "concurrency": get_concurrency_controller().get_stats(),
         "domains": {
             domain: {
                 "total": stats["success"] + stats["fail"],
@@ -115,4 +132,25 @@ async def rendering_stats():
             }
             for domain, stats in list(analytics_db["domains_tried"].items())[:20]
         }
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/rendering/blocklist")
+async def get_blocklist():
+    """Third-party hosts blocked in every render"""
+    hosts = get_blocked_hosts()
+    return {"count": len(hosts), "hosts": hosts}
+
+
+@router.post("/rendering/blocklist")
+async def update_blocklist(request: BlocklistUpdateRequest):
+    """Add/remove hosts at runtime (applies from the next render)"""
+    add_blocked_hosts(request.add)
+    remove_blocked_hosts(request.remove)
+    return {"status": "updated", "count": len(get_blocked_hosts())}
+
+
+@router.post("/rendering/blocklist/reload")
+async def reload_blocklist():
+    """Reload config/blocklist.txt (drops runtime changes)"""
+    return {"status": "reloaded", "count": load_blocklist()}
@@ -1,7 +1,8 @@
 from fastapi import BackgroundTasks, APIRouter
-from models.requests import BatchScrapeRequest
+from models.requests import BatchScrapeRequest, SitemapBatchRequest
 from datetime import datetime
 from core.processing.batch import BatchProcessor
+from core.crawling.sitemap import discover_urls
 from storage.jobs_db import jobs_db
 from config.config import BATCH_CONFIG
 
@@ -61,3 +62,72 @@ async def batch_scrape(request: BatchScrapeRequest, background_tasks: Background
         "message": f"Processing {len(request.urls)} URLs in batch mode...",
         "check_status": f"/job/{job_id}"
     }
+
+
+@router.post("/batch/sitemap")
+async def batch_scrape_sitemap(request: SitemapBatchRequest, background_tasks: BackgroundTasks):
+    """
+    Batch scrape every page a site lists in its sitemap
+    
+    Reads robots.txt + sitemap.xml (indexes and .gz included) instead of
+    crawling list pages, then runs the normal batch pipeline
+    """
+    
+    job_id = f"batch_{datetime.now().timestamp()}"
+    
+    jobs_db[job_id] = {
+        "type": "batch",
+        "status": "pending",
+        "created_at": datetime.now().isoformat(),
+        "site_url": str(request.site_url),
+        "prompt": request.prompt
+    }
+    
+    async def process_batch():
+        jobs_db[job_id]["status"] = "discovering"
+        
+        try:
+            urls = await discover_urls(
+                str(request.site_url),
+                path_prefix=request.path_prefix,
+                max_urls=request.max_urls
+            )
+            
+            if not urls:
+                jobs_db[job_id]["status"] = "failed"
+                jobs_db[job_id]["error"] = "No sitemap URLs found"
+                return
+            
+            jobs_db[job_id]["status"] = "processing"
+            jobs_db[job_id]["total_urls"] = len(urls)
+            
+            processor = BatchProcessor(
+                job_id=job_id,
+                max_concurrent=request.max_concurrent or BATCH_CONFIG["max_concurrent_static"]
+            )
+            
+            stats = await processor.process_batch(
+                urls=urls,
+                prompt=request.prompt,
+                resume=False
+            )
+            
+            # Export to CSV automatically
+            processor.export_to_csv()
+            
+            jobs_db[job_id]["status"] = "completed"
+            jobs_db[job_id]["stats"] = stats
+            jobs_db[job_id]["completed_at"] = datetime.now().isoformat()
+            
+        except Exception as e:
+            jobs_db[job_id]["status"] = "failed"
+            jobs_db[job_id]["error"] = str(e)
+    
+    background_tasks.add_task(process_batch)
+    
+    return {
+        "job_id": job_id,
+        "status": "pending",
+        "message": f"Reading sitemap for {request.site_url} (up to {request.max_urls} URLs)...",
+        "check_status": f"/job/{job_id}"
+    }
@@ -44,7 +44,8 @@ async def crawl_website(request: CrawlRequest, background_tasks: BackgroundTasks
                 start_url=str(request.start_url),
                 extract_prompt=request.prompt,
                 max_depth=request.max_depth,
-                max_pages=request.max_pages
+                max_pages=request.max_pages,
+                use_sitemap=request.use_sitemap
             )
             
             jobs_db[job_id]["status"] = "completed"
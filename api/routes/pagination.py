@@ -53,7 +53,8 @@ async def pagination_scrape(request: PaginationScrapeRequest, background_tasks:
             else:
                 scraper = PaginationScraper(
                     max_pages=request.max_pages,
-                    delay=1.0
+                    delay=1.0,
+                    replay_endpoints=True  # smart_extract reads captured/replayed JSON
                 )
                 
                 # Define extraction callback
@@ -4,6 +4,7 @@ from storage.jobs_db import get_job, create_job, job_exists
 from core.job_processor import process_scraping_job
 from datetime import datetime
 from core.extraction.smart_extractor import smart_extract
+from core.extraction.meta_extractor import is_meta_request
 from core.html_processing.fetcher import fetch_html
 from storage.jobs_db import jobs_db
 
@@ -48,7 +49,7 @@ async def create_scrape_job(request: ScrapeRequest, background_tasks: Background
                 jobs_db[job_id]["current_url"] = url_str
                 jobs_db[job_id]["progress"] = int(((i - 1) / total_urls) * 100)
 
-                html = await fetch_html(url_str)
+                html = await fetch_html(url_str, meta_only=is_meta_request(request.prompt))
                 
                 # --- Stage: Extracting ---
                 jobs_db[job_id]["stage"] = f"🤖 Extracting data from page {i} of {total_urls}…"
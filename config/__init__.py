@@ -9,15 +9,33 @@ from .settings import (
     GROQ_API_KEY,
     GROQ_MODEL,
     selector_cache,
+    domain_selector_cache,
     DEFAULT_HEADERS
 )
 
 # Import existing config
 try:
-    from .config import BATCH_CONFIG, PAGINATION_CONFIG
+    from .config import BATCH_CONFIG, PAGINATION_CONFIG, HTTP_CLIENT_CONFIG, POLITENESS_CONFIG, SITEMAP_CONFIG, BROWSER_POOL_CONFIG, RENDER_SERVICE_CONFIG, RENDER_CACHE_CONFIG, RENDER_WAIT_CONFIG, JSON_CAPTURE_CONFIG, ENDPOINT_REPLAY_CONFIG, STORAGE_STATE_CONFIG, HYDRATION_CONFIG, KNOWLEDGE_STORE_CONFIG, RENDER_DECISION_CONFIG, NEEDS_JS_MODEL_CONFIG, ADAPTIVE_LEARNING_CONFIG, CIRCUIT_BREAKER_CONFIG, ADAPTIVE_CONCURRENCY_CONFIG
 except ImportError:
     BATCH_CONFIG = {}
     PAGINATION_CONFIG = {}
+    HTTP_CLIENT_CONFIG = {}
+    POLITENESS_CONFIG = {}
+    SITEMAP_CONFIG = {}
+    BROWSER_POOL_CONFIG = {}
+    RENDER_SERVICE_CONFIG = {}
+    RENDER_CACHE_CONFIG = {}
+    RENDER_WAIT_CONFIG = {}
+    JSON_CAPTURE_CONFIG = {}
+    ENDPOINT_REPLAY_CONFIG = {}
+    STORAGE_STATE_CONFIG = {}
+    HYDRATION_CONFIG = {}
+    KNOWLEDGE_STORE_CONFIG = {}
+    RENDER_DECISION_CONFIG = {}
+    NEEDS_JS_MODEL_CONFIG = {}
+    ADAPTIVE_LEARNING_CONFIG = {}
+    CIRCUIT_BREAKER_CONFIG = {}
+    ADAPTIVE_CONCURRENCY_CONFIG = {}
 
 __all__ = [
     'API_URL',
@@ -27,7 +45,25 @@ __all__ = [
     'GROQ_API_KEY',
     'GROQ_MODEL',
     'selector_cache',
+    'domain_selector_cache',
     'DEFAULT_HEADERS',
     'BATCH_CONFIG',
-    'PAGINATION_CONFIG'
+    'PAGINATION_CONFIG',
+    'HTTP_CLIENT_CONFIG',
+    'POLITENESS_CONFIG',
+    'SITEMAP_CONFIG',
+    'BROWSER_POOL_CONFIG',
+    'RENDER_SERVICE_CONFIG',
+    'RENDER_CACHE_CONFIG',
+    'RENDER_WAIT_CONFIG',
+    'JSON_CAPTURE_CONFIG',
+    'ENDPOINT_REPLAY_CONFIG',
+    'STORAGE_STATE_CONFIG',
+    'HYDRATION_CONFIG',
+    'KNOWLEDGE_STORE_CONFIG',
+    'RENDER_DECISION_CONFIG',
+    'NEEDS_JS_MODEL_CONFIG',
+    'ADAPTIVE_LEARNING_CONFIG',
+    'CIRCUIT_BREAKER_CONFIG',
+    'ADAPTIVE_CONCURRENCY_CONFIG'
 ]
\ No newline at end of file
@@ -58,6 +58,107 @@ DEFAULT_WAIT_TIME = 2.0      # seconds for lazy-loaded content
 ENABLE_CACHE = True
 CACHE_TTL = 3600  # 1 hour (increase to 24h in production)
 
+# Renderer's in-process HTML cache (bounded by bytes, LRU + TTL)
+RENDER_CACHE_CONFIG = {
+    "max_bytes": 256 * 1024 * 1024,   # Total memory budget
+    "ttl": CACHE_TTL,                 # Seconds an entry stays valid
+    "compress": True,                 # zlib large pages (HTML shrinks ~5-10x)
+    "compress_min_bytes": 32 * 1024,  # Don't bother below this size
+    "compress_level": 1,              # Fastest level; most of the gain
+}
+
+# Post-navigation wait ("smart" strategy): return once the DOM has been
+# quiet this long; the strategy's wait_time is the upper bound
+RENDER_WAIT_CONFIG = {
+    "quiet_window": 0.5,   # Seconds without mutations / resource loads
+    "min_wait": 0.25,      # Never return earlier than this
+    "ready_selector_ratio": 0.5,  # Share of cached selectors that must match (first one always)
+}
+
+# JSON API responses recorded during renders (extraction source for SPAs)
+JSON_CAPTURE_CONFIG = {
+    "enabled": True,                       # fetch_html / batch renders opt in
+    "max_payloads": 20,                    # Per render
+    "max_payload_bytes": 2 * 1024 * 1024,  # Skip bigger bodies
+    "min_records": 2,                      # List of >= N objects counts as data
+    "min_field_coverage": 0.5,             # Share of requested fields a payload must supply
+    "max_items": 100,                      # Records returned per extraction
+}
+
+# Replay learned XHR endpoints instead of rendering (see endpoint_registry.py)
+ENDPOINT_REPLAY_CONFIG = {
+    "enabled": True,
+    "min_observations": 2,   # Renders that must agree on the endpoint
+    "max_failures": 3,       # Consecutive failed replays before the template is dropped
+    "timeout": 15.0,
+}
+
+# Clearance cookies / localStorage saved per domain after a challenge solve
+STORAGE_STATE_CONFIG = {
+    "enabled": True,
+    "default_ttl": 1800,   # For session-only clearance cookies
+    "max_ttl": 86400,      # Cap even if the cookie lives longer
+}
+
+# SSR hydration state (__NEXT_DATA__, __NUXT__, ...) read from static HTML
+HYDRATION_CONFIG = {
+    "enabled": True,
+    "min_text_chars": 500,   # Prose in the state that makes rendering unnecessary
+    "min_records": 3,        # ...or a list of at least this many objects
+}
+
+# Persistent store for what the scraper learns about sites (SQLite, WAL mode)
+KNOWLEDGE_STORE_CONFIG = {
+    "path": "scraping_knowledge.db",
+    "flush_interval": 5.0,   # Seconds between batched writes
+    "batch_size": 200,       # ...or as soon as this many values are queued
+}
+
+# Rendering decisions learned per domain + URL path template
+RENDER_DECISION_CONFIG = {
+    "enabled": True,
+    "half_life_hours": 72,   # Evidence loses half its weight every 3 days
+    "min_weight": 3.0,       # Decayed observations needed before trusting a decision
+    "min_agreement": 0.8,    # Share of observations that must agree
+}
+
+# Learned needs-JS classifier (python train_needs_js_model.py train)
+NEEDS_JS_MODEL_CONFIG = {
+    "enabled": True,                            # Used only once a model has been trained
+    "model_path": "config/needs_js_model.json",
+    "outcome_log": None,                        # Path for training examples (e.g. "render_outcomes.jsonl"); None disables logging
+    "outcome_log_max_bytes": 50_000_000,        # Stop appending once the log reaches this size
+}
+
+# AdaptiveLearner (per-domain success rates, persisted in the knowledge store)
+ADAPTIVE_LEARNING_CONFIG = {
+    "history_size": 200,     # Recent attempts kept per domain (ring buffer)
+    "half_life_days": 7,     # Success-rate time decay
+    "detector_history_size": 50,  # Protection signals kept per domain (shared detector)
+}
+
+# Per-domain circuit breaker (blocked / failing sites fail fast)
+CIRCUIT_BREAKER_CONFIG = {
+    "enabled": True,
+    "failure_threshold": 5,      # Consecutive failures that open the circuit
+    "open_seconds": 60.0,        # First cool-down, doubled after each failed probe
+    "max_open_seconds": 900.0,
+    "probe_timeout": 120.0,      # A probe that never reports is replaced after this
+}
+
+# Adaptive per-domain concurrency (AIMD on the host scheduler's in-flight limit)
+ADAPTIVE_CONCURRENCY_CONFIG = {
+    "enabled": True,
+    "min_in_flight": 1,
+    "max_in_flight": 16,         # Ceiling for tolerant hosts
+    "additive_increase": 1.0,    # Slots gained per window of fast responses
+    "decrease_factor": 0.5,      # On 429/503, timing anomalies, latency inflation
+    "latency_inflation": 2.5,    # Latency over this many times the baseline counts as overload
+    "min_latency_samples": 5,
+    "max_retry_after": 300.0,    # Longest Retry-After honored
+    "max_inline_backoff": 10.0,  # Renders wait out shorter rate limits on the page
+}
+
 # ============================================================================
 # PLAYWRIGHT SETTINGS
 # ============================================================================
@@ -81,6 +182,24 @@ STEALTH_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.
 BROWSER_POOL_SIZE = 1  # Increase to 3-5 in production
 REUSE_BROWSER = True   # Keep browser alive between requests
 
+BROWSER_POOL_CONFIG = {
+    "browsers": BROWSER_POOL_SIZE,    # Chromium processes (spread across cores)
+    "contexts_per_browser": 2,        # Isolated contexts per browser
+    "pages_per_context": 2,           # Warm pages per context (concurrent renders)
+    "recycle_after": 100,             # Replace a context after this many pages (memory)
+    "acquire_timeout": 60.0,          # Seconds to wait for a free page
+}
+
+# Render workers (render_worker.py); endpoints come from RENDER_WORKER_URLS
+RENDER_SERVICE_CONFIG = {
+    "host": "127.0.0.1",              # Workers listen locally by default
+    "base_port": 8101,                # Worker i listens on base_port + i
+    "processes": 2,                   # Workers started by `python render_worker.py`
+    "timeout": 120.0,                 # Seconds per remote render (incl. queueing)
+    "cooldown": 15.0,                 # Seconds an unreachable worker is skipped
+    "fallback_local": True,           # Render in-process if no worker is reachable
+}
+
 # ============================================================================
 # DETECTION RULES
 # ============================================================================
@@ -265,9 +384,56 @@ BATCH_CONFIG = {
     "batch_size": 100,                # Process in chunks of 100
     "retry_failed": True,             # Retry failed URLs
     "max_retries": 2,                 # Max retry attempts
+    "max_circuit_deferrals": 10,      # Times a URL waits for its domain's circuit (no attempt spent)
+    "retry_base_delay": 1.0,          # First backoff (seconds), doubles per attempt
+    "retry_max_delay": 30.0,          # Backoff cap (seconds)
+    "hedge_requests": False,          # Send a second GET for slow static fetches (uses a spare host slot)
+    "hedge_after": 3.0,               # Hedge delay until the host's p95 latency is known
+    "hedge_percentile": 95,           # Hedge requests slower than this percentile (per host)
     "save_interval": 50,              # Save progress every 50 URLs
 }
 
+# ============================================================================
+# HTTP CLIENT (shared static fetch pool)
+# ============================================================================
+
+HTTP_CLIENT_CONFIG = {
+    "http2": True,                    # Needs the `h2` package (httpx[http2])
+    "timeout": 30.0,                  # Total request timeout (seconds)
+    "connect_timeout": 10.0,          # TCP + TLS handshake timeout
+    "max_connections": 200,           # Across all hosts
+    "max_keepalive_connections": 50,  # Idle connections kept warm
+    "keepalive_expiry": 30.0,         # Seconds before idle connections close
+    "max_connections_per_host": 6,    # Like a browser, don't hammer one host
+    "dns_cache_ttl": 300,             # Seconds to reuse a resolved address
+    "max_body_bytes": 5_000_000,      # Stop reading HTML bodies past this size
+}
+
+# ============================================================================
+# ROBOTS.TXT / SITEMAPS (crawl and batch seeding)
+# ============================================================================
+
+SITEMAP_CONFIG = {
+    "user_agent": "*",                # robots.txt group we follow
+    "robots_ttl": 86400,              # Cache robots.txt for a day
+    "sitemap_ttl": 21600,             # Cache parsed sitemaps for 6 hours
+    "max_crawl_delay": 30.0,          # Ignore absurd Crawl-delay values above this
+    "max_sitemaps": 50,               # Child sitemaps read from an index
+    "max_urls": 50000,                # URLs taken from sitemaps per job
+    "max_sitemap_bytes": 50_000_000,  # Protocol limit for one uncompressed sitemap
+}
+
+# ============================================================================
+# POLITENESS (per-domain scheduling shared by all jobs)
+# ============================================================================
+
+POLITENESS_CONFIG = {
+    "requests_per_second": 2.0,       # Default pace per domain
+    "burst": 2,                       # Requests allowed back-to-back
+    "max_in_flight_per_host": 4,      # Concurrent fetches per domain
+    "idle_host_seconds": 300.0,       # Forget a domain's pacing state after this long unused
+}
+
 # ============================================================================
 # CACHING
 # ============================================================================
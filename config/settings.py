@@ -53,8 +53,12 @@ if not GROQ_API_KEY:
 # This stores generated selectors so we don't regenerate them for same domain
 selector_cache = {}
 
+# Selectors that extracted real data, by URL path template (renders finish once they match)
+domain_selector_cache = {}
+
 # Cache TTL (Time To Live) in seconds
 CACHE_HTML_TTL = 3600  # 1 hour for HTML cache
+CACHE_HTML_REVALIDATE_WINDOW = 7 * 86400  # Keep stale HTML 7 days for ETag/Last-Modified revalidation
 CACHE_EXTRACTION_TTL = 1800  # 30 minutes for extraction cache
 
 # ============================================================================
@@ -96,6 +100,11 @@ PLAYWRIGHT_TIMEOUT = 45000  # 45 seconds
 PLAYWRIGHT_WAIT_TIME = 2.0  # Default wait time for JS rendering
 PLAYWRIGHT_STEALTH_MODE = True  # Enable stealth mode by default
 
+# Out-of-process render workers (render_worker.py), comma-separated base URLs
+# e.g. RENDER_WORKER_URLS=http://127.0.0.1:8101,http://127.0.0.1:8102
+# Empty = render inside the API process
+RENDER_WORKER_URLS = [u.strip() for u in os.getenv("RENDER_WORKER_URLS", "").split(",") if u.strip()]
+
 # ============================================================================
 # CORS CONFIGURATION
 # ============================================================================
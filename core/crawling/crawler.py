@@ -12,17 +12,18 @@ Perfect for:
 import asyncio
 import re
 from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Optional, Set, Callable
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional, Set, Callable, Union
 import httpx
 import logging
 from datetime import datetime
 
 
 from core.html_processing.renderer import fetch_html_js
+from core.html_processing.host_scheduler import get_host_scheduler
+from core.crawling.sitemap import get_robots, discover_urls
 from core.html_processing.detector import get_rendering_strategy
-from core.html_processing.adaptive_learning_sytem import AdaptiveLearner
-from core.html_processing.advance_stealth_mode import MultiSignalDetector, ProtectionType
+from core.html_processing.knowledge_service import get_knowledge_service
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
 logger = logging.getLogger(__name__)
 
@@ -46,13 +47,18 @@ class SmartCrawler:
         max_pages: int = 100,
         delay: float = 1.0,
         same_domain_only: bool = True,
-        max_concurrent: int = 5
+        max_concurrent: int = 5,
+        use_sitemap: bool = False,
+        respect_robots: bool = True
     ):
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.delay = delay
         self.same_domain_only = same_domain_only
         self.max_concurrent = max_concurrent
+        self.use_sitemap = use_sitemap
+        self.respect_robots = respect_robots
+        self.robots = None
         
         # Tracking
         self.visited_urls: Set[str] = set()
@@ -60,9 +66,8 @@ class SmartCrawler:
         self.results: List[Dict] = []
         self.start_domain = None
         
-        # AI Systems
-        self.learner = AdaptiveLearner()
-        self.detector = MultiSignalDetector()
+        # AI Systems (shared with every other crawl / render in this process)
+        self.knowledge = get_knowledge_service()
         
         # Statistics
         self.stats = {
@@ -70,6 +75,8 @@ class SmartCrawler:
             "urls_found": 0,
             "data_extracted": 0,
             "errors": 0,
+            "sitemap_urls": 0,
+            "robots_blocked": 0,
             "start_time": None,
             "end_time": None
         }
@@ -113,12 +120,17 @@ class SmartCrawler:
         if any(re.search(pattern, url, re.I) for pattern in skip_patterns):
             return False
         
+        # robots.txt Disallow rules
+        if self.robots and not self.robots.can_fetch(url):
+            self.stats["robots_blocked"] += 1
+            return False
+        
         return True
     
     
     def extract_links(
         self,
-        html: str,
+        html: Union[str, ParsedDocument],
         base_url: str,
         link_selector: Optional[str] = None
     ) -> List[str]:
@@ -126,19 +138,19 @@ class SmartCrawler:
         Extract links from HTML
         
         Args:
-            html: HTML content
+            html: HTML content (or the page's ParsedDocument)
             base_url: Base URL for resolving relative links
             link_selector: CSS selector for links (optional)
         
         Returns:
             List of normalized URLs
         """
-        soup = BeautifulSoup(html, 'html.parser')
+        doc = as_document(html)
         links = []
         
         if link_selector:
             # Use specific selector
-            elements = soup.select(link_selector)
+            elements = doc.soup.select(link_selector)
             for elem in elements:
                 href = elem.get('href')
                 if href:
@@ -147,7 +159,7 @@ class SmartCrawler:
                         links.append(normalized)
         else:
             # Get all links
-            for a_tag in soup.find_all('a', href=True):
+            for a_tag in doc.links:
                 href = a_tag['href']
                 normalized = self.normalize_url(href, base_url)
                 if self.should_crawl_url(normalized):
@@ -156,7 +168,7 @@ class SmartCrawler:
         return list(set(links))  # Deduplicate
     
     
-    def smart_link_detection(self, html: str, base_url: str) -> Dict[str, List[str]]:
+    def smart_link_detection(self, html: Union[str, ParsedDocument], base_url: str) -> Dict[str, List[str]]:
         """
         Intelligently categorize links by type
         
@@ -167,7 +179,6 @@ class SmartCrawler:
                 "external": [...]       # External links
             }
         """
-        soup = BeautifulSoup(html, 'html.parser')
         categorized = {
             "detail_pages": [],
             "list_pages": [],
@@ -187,7 +198,7 @@ class SmartCrawler:
             r'page=', r'/page/\d+', r'?p=', r'offset='
         ]
         
-        for a_tag in soup.find_all('a', href=True):
+        for a_tag in as_document(html).links:
             href = a_tag['href']
             normalized = self.normalize_url(href, base_url)
             
@@ -231,48 +242,28 @@ class SmartCrawler:
         
         # 🧠 ADAPTIVE LEARNING: Get recommended wait time
         # Assume "None" protection initially or use history default
-        wait_time = self.learner.get_recommended_wait_time(domain, "unknown", 1)
+        wait_time = self.knowledge.get_recommended_wait_time(domain, "unknown", 1)
         wait_time = max(wait_time, 1.5) # Minimum 1.5s
         
         logger.info(f"🧠 Adaptive Wait: {wait_time:.2f}s for {domain}")
         
-        start_time = asyncio.get_event_loop().time()
-        
         try:
-            # ⚡ FETCH with Auto-Solve
-            html, final_url = await fetch_html_js(
-                url=url,
-                wait_time=wait_time,
-                stealth_mode=True, # Always use stealth for safety
-                try_auto_solve=True
-            )
-            
-            elapsed = asyncio.get_event_loop().time() - start_time
+            # ⚡ FETCH with Auto-Solve (paced per domain with every other job)
+            async with get_host_scheduler().slot(url):
+                html, final_url = await fetch_html_js(
+                    url=url,
+                    wait_time=wait_time,
+                    stealth_mode=True, # Always use stealth for safety
+                    try_auto_solve=True
+                )
             
             # 🕵️ DETECT (Post-Fetch Verification)
             # Did we actually get the content or are we still blocked?
-            signal = self.detector.detect_protection(
-                url=final_url,
-                html=html,
-                status_code=200, # Assumed success if no error
-                headers={},
-                cookies={},
-                response_time=elapsed
-            )
-            
-            success = signal.protection_type == ProtectionType.NONE
-            
-            # 📝 RECORD KNOWLEDGE
-            self.learner.record_attempt(
-                domain=domain,
-                protection_type=signal.protection_type.value,
-                technique_used="playwright_auto",
-                success=success,
-                response_time=elapsed
-            )
-            
-            if not success:
-                logger.warning(f"⚠️ Still blocked by {signal.protection_type.value} after auto-solve")
+            # (fetch_html_js already recorded the attempt in the shared knowledge)
+            signals = self.knowledge.detector.detect_from_html(html)
+            if signals:
+                blocked = max(signals, key=lambda s: s.confidence)
+                logger.warning(f"⚠️ Still blocked by {blocked.protection_type.value} after auto-solve")
             
             return html
             
@@ -293,7 +284,8 @@ class SmartCrawler:
         
         Args:
             start_url: Starting URL
-            extract_callback: Async function(html, url) -> data
+            extract_callback: Async function(page, url) -> data; page is the
+                ParsedDocument shared with link detection (page.html is the HTML)
             link_selector: CSS selector for links to follow (optional)
             auto_detect_links: Auto-detect detail vs list pages
         
@@ -301,15 +293,42 @@ class SmartCrawler:
             List of extracted data from all crawled pages
         """
         
+        # Polite delay is enforced per domain by the shared scheduler, for as long as this crawl runs
+        with get_host_scheduler().min_interval(start_url, self.delay):
+            return await self._crawl(start_url, extract_callback, link_selector, auto_detect_links)
+    
+    
+    async def _crawl(
+        self,
+        start_url: str,
+        extract_callback: Callable,
+        link_selector: Optional[str],
+        auto_detect_links: bool
+    ) -> List[Dict]:
+        """BFS over the site (see crawl_and_extract)"""
+        
         self.stats["start_time"] = datetime.now().isoformat()
         
         # Set starting domain
         parsed = urlparse(start_url)
         self.start_domain = parsed.netloc
         
+        # robots.txt (cached): Disallow rules + Crawl-delay on the scheduler
+        if self.respect_robots:
+            self.robots = await get_robots(start_url)
+        
         # Queue for BFS crawling
         queue = [(start_url, 0)]  # (url, depth)
         
+        # Sitemap seeding: pages come straight from the XML, no list-page renders
+        if self.use_sitemap:
+            seeds = await self._sitemap_seeds(start_url)
+            if seeds:
+                # Seeds are leaves: extract them, don't follow their links
+                queue = [(url, self.max_depth) for url in seeds]
+                self.queued_urls.update(seeds)
+                logger.info(f"🗺️ Seeded {len(seeds)} URLs from sitemap (list pages skipped)")
+        
         logger.info(f"🚀 Starting crawl from: {start_url}")
         logger.info(f"📊 Max depth: {self.max_depth}, Max pages: {self.max_pages}")
         
@@ -328,9 +347,12 @@ class SmartCrawler:
                 self.visited_urls.add(current_url)
                 self.stats["pages_crawled"] += 1
                 
+                # Parsed once for extraction and link discovery
+                page = ParsedDocument(html, current_url)
+                
                 # Extract data from this page
                 try:
-                    extracted_data = await extract_callback(html, current_url)
+                    extracted_data = await extract_callback(page, current_url)
                     
                     if extracted_data:
                         self.results.extend(extracted_data)
@@ -344,7 +366,7 @@ class SmartCrawler:
                 if depth < self.max_depth:
                     if auto_detect_links:
                         # Smart detection
-                        categorized = self.smart_link_detection(html, current_url)
+                        categorized = self.smart_link_detection(page, current_url)
                         
                         # Prioritize detail pages
                         new_links = categorized["detail_pages"][:50]  # Limit per page
@@ -355,7 +377,7 @@ class SmartCrawler:
                     
                     else:
                         # Use selector or get all links
-                        new_links = self.extract_links(html, current_url, link_selector)
+                        new_links = self.extract_links(page, current_url, link_selector)
                     
                     # Add to queue
                     for link in new_links:
@@ -365,9 +387,6 @@ class SmartCrawler:
                             self.stats["urls_found"] += 1
                     
                     logger.info(f"📎 Queued {len(new_links)} new URLs (total queue: {len(queue)})")
-                
-                # Polite delay
-                await asyncio.sleep(self.delay)
             
             except Exception as e:
                 logger.error(f"❌ Error crawling {current_url}: {e}")
@@ -384,6 +403,30 @@ class SmartCrawler:
         return self.results
     
     
+    async def _sitemap_seeds(self, start_url: str) -> List[str]:
+        """Sitemap URLs under the start URL's directory"""
+        
+        path = urlparse(start_url).path
+        # Directory of the start page: /pros/list/1.html -> /pros/list/
+        prefix = path.rsplit('/', 1)[0] + '/' if path.count('/') > 1 else None
+        
+        urls = await discover_urls(
+            start_url,
+            path_prefix=prefix,
+            max_urls=self.max_pages * 2,
+            respect_robots=self.respect_robots
+        )
+        
+        seeds = []
+        for url in urls:
+            normalized = self.normalize_url(url, start_url)
+            if self.should_crawl_url(normalized):
+                seeds.append(normalized)
+        
+        self.stats["sitemap_urls"] = len(seeds)
+        return seeds[:self.max_pages]
+    
+    
     def get_stats(self) -> Dict:
         """Get crawling statistics"""
         return {
@@ -406,7 +449,8 @@ async def crawl_directory_site(
     start_url: str,
     extract_prompt: str,
     max_depth: int = 2,
-    max_pages: int = 100
+    max_pages: int = 100,
+    use_sitemap: bool = False
 ) -> Dict:
     """
     Easy function for directory-style sites
@@ -434,11 +478,12 @@ async def crawl_directory_site(
         max_depth=max_depth,
         max_pages=max_pages,
         delay=1.0,
-        same_domain_only=True
+        same_domain_only=True,
+        use_sitemap=use_sitemap
     )
     
-    async def extract_callback(html: str, url: str):
-        result = await smart_extract(html, extract_prompt, cache_key=url)
+    async def extract_callback(page: ParsedDocument, url: str):
+        result = await smart_extract(page, extract_prompt, cache_key=url)
         return result.get("data", [])
     
     results = await crawler.crawl_and_extract(
@@ -485,8 +530,8 @@ async def crawl_with_selectors(
         delay=1.0
     )
     
-    async def extract_callback(html: str, url: str):
-        result = extract_with_selectors(html, data_selectors)
+    async def extract_callback(page: ParsedDocument, url: str):
+        result = extract_with_selectors(page, data_selectors)
         return result.get("data", [])
     
     results = await crawler.crawl_and_extract(
@@ -8,10 +8,14 @@ import re
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 from typing import List, Optional, Dict, Callable
 from bs4 import BeautifulSoup
-import httpx
 import logging
 from core.html_processing.renderer import fetch_html_js
+from core.html_processing.http_client import fetch_static_html
+from core.html_processing.host_scheduler import get_host_scheduler
 from core.html_processing.detector import get_rendering_strategy
+from core.html_processing.endpoint_registry import get_endpoint_registry, page_number_of
+from storage.cache_manager import cache_json_payloads
+from config.config import ENDPOINT_REPLAY_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -244,11 +248,18 @@ class PaginationScraper:
         self,
         max_pages: int = 50,
         delay: float = 1.0,
-        stop_if_empty: bool = True
+        stop_if_empty: bool = True,
+        replay_endpoints: bool = False
     ):
+        """
+        replay_endpoints: capture JSON while rendering and, once a page's data
+        endpoint is learned, call it directly for later pages. Only for
+        extract callbacks that use smart_extract (which reads the captured JSON).
+        """
         self.max_pages = max_pages
         self.delay = delay
         self.stop_if_empty = stop_if_empty
+        self.replay_endpoints = replay_endpoints and ENDPOINT_REPLAY_CONFIG.get("enabled", True)
         self.detector = PaginationDetector()
     
     
@@ -270,6 +281,19 @@ class PaginationScraper:
             List of all extracted data from all pages
         """
         
+        # Polite delay is enforced per domain by the shared scheduler, for as long as this job runs
+        with get_host_scheduler().min_interval(start_url, self.delay):
+            return await self._scrape_pages(start_url, extract_callback, **extract_kwargs)
+    
+    
+    async def _scrape_pages(
+        self,
+        start_url: str,
+        extract_callback: Callable,
+        **extract_kwargs
+    ) -> List[Dict]:
+        """Follow next-page links from start_url (see scrape_all_pages)"""
+        
         all_results = []
         current_url = start_url
         page_num = 1
@@ -281,7 +305,7 @@ class PaginationScraper:
             
             try:
                 # Fetch page
-                html = await self._fetch_page(current_url)
+                html = await self._fetch_page(current_url, page_num)
                 
                 # Extract data
                 page_results = await extract_callback(html, current_url, **extract_kwargs)
@@ -313,9 +337,6 @@ class PaginationScraper:
                 current_url = next_url
                 page_num += 1
                 
-                # Polite delay
-                await asyncio.sleep(self.delay)
-                
             except Exception as e:
                 logger.error(f"❌ Error on page {page_num}: {e}")
                 break
@@ -324,25 +345,34 @@ class PaginationScraper:
         return all_results
     
     
-    async def _fetch_page(self, url: str) -> str:
-        """Fetch page HTML (with JS rendering if needed)"""
-        
-        # Try static first
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
-            html = response.text
-        
-        # Check if JS needed
-        strategy = get_rendering_strategy(url, html)
-        
-        if strategy["needs_js"]:
-            logger.info(f"⚡ Using JS rendering for: {url}")
-            html, _ = await fetch_html_js(
-                url=url,
-                wait_time=strategy["wait_time"],
-                wait_strategy=strategy.get("wait_strategy", "smart"),
-                stealth_mode=strategy["stealth_mode"]
-            )
+    async def _fetch_page(self, url: str, page_num: int = 1) -> str:
+        """Fetch page HTML (with JS rendering, or a replay of its data endpoint, if needed)"""
+        
+        async with get_host_scheduler().slot(url):
+            # Try static first (shared pooled client, streamed with a size cap).
+            # A 403/503 block page still goes to the detector: rendering often gets past it
+            page = await fetch_static_html(url, raise_for_status=False)
+            html = page.html
+            
+            # Check if JS needed
+            strategy = get_rendering_strategy(url, html)
+            
+            if strategy["needs_js"] and self.replay_endpoints:
+                # A /page/N URL knows its own number (the job may have started past page 1)
+                payloads = await get_endpoint_registry().replay(url, page_number=page_number_of(url) or page_num)
+                if payloads:
+                    await cache_json_payloads(url, payloads)
+                    return html
+            
+            if strategy["needs_js"]:
+                logger.info(f"⚡ Using JS rendering for: {url}")
+                html, _ = await fetch_html_js(
+                    url=url,
+                    wait_time=strategy["wait_time"],
+                    wait_strategy=strategy.get("wait_strategy", "smart"),
+                    stealth_mode=strategy["stealth_mode"],
+                    capture_json=self.replay_endpoints
+                )
         
         return html
 
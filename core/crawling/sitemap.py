@@ -0,0 +1,274 @@
+"""
+robots.txt and sitemap.xml reader
+Seeds crawls and batches straight from a site's sitemaps (sitemap indexes and
+.xml.gz included) and applies robots.txt Disallow rules and Crawl-delay.
+One small XML download replaces rendering hundreds of list pages.
+"""
+
+import gzip
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+import xml.etree.ElementTree as ET
+import logging
+
+from core.html_processing.http_client import get_http_client
+from core.html_processing.host_scheduler import get_host_scheduler
+from storage.cache_manager import get_cache_manager
+from config.config import SITEMAP_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# ROBOTS.TXT
+# ============================================================================
+
+@dataclass
+class RobotsRules:
+    """Rules from robots.txt that apply to us (group `*` or our agent token)"""
+    allow: List[str] = field(default_factory=list)
+    disallow: List[str] = field(default_factory=list)
+    crawl_delay: Optional[float] = None
+    sitemaps: List[str] = field(default_factory=list)
+
+    def can_fetch(self, url: str) -> bool:
+        """Longest matching rule wins; Allow wins ties (RFC 9309)"""
+        parsed = urlparse(url)
+        path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+
+        best_len, allowed = -1, True
+        for rule, verdict in [(r, False) for r in self.disallow] + [(r, True) for r in self.allow]:
+            if _rule_matches(rule, path) and (len(rule) > best_len or (len(rule) == best_len and verdict)):
+                best_len, allowed = len(rule), verdict
+        return allowed
+
+
+def _rule_matches(rule: str, path: str) -> bool:
+    if not rule:
+        return False
+    if "*" not in rule and not rule.endswith("$"):
+        return path.startswith(rule)
+    pattern = re.escape(rule).replace(r"\*", ".*")
+    if pattern.endswith(r"\$"):
+        pattern = pattern[:-2] + "$"
+    return re.match(pattern, path) is not None
+
+
+def parse_robots(text: str, agent: str = "*") -> RobotsRules:
+    """Parse robots.txt, keeping the group for `agent` (falls back to `*`)"""
+    groups: Dict[str, RobotsRules] = {}
+    sitemaps: List[str] = []
+    current_agents: List[str] = []
+    in_rules = False
+
+    for raw in text.splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        key, value = [part.strip() for part in line.split(":", 1)]
+        key = key.lower()
+
+        if key == "sitemap":
+            sitemaps.append(value)
+        elif key == "user-agent":
+            # Consecutive User-agent lines share one group
+            if in_rules:
+                current_agents, in_rules = [], False
+            current_agents.append(value.lower())
+            groups.setdefault(value.lower(), RobotsRules())
+        elif key in ("allow", "disallow", "crawl-delay") and current_agents:
+            in_rules = True
+            for name in current_agents:
+                rules = groups[name]
+                if key == "allow" and value:
+                    rules.allow.append(value)
+                elif key == "disallow" and value:
+                    rules.disallow.append(value)
+                elif key == "crawl-delay":
+                    try:
+                        rules.crawl_delay = float(value)
+                    except ValueError:
+                        pass
+
+    rules = groups.get(agent.lower()) or groups.get("*") or RobotsRules()
+    rules.sitemaps = sitemaps
+    return rules
+
+
+async def get_robots(url: str) -> RobotsRules:
+    """
+    robots.txt for the URL's site (cached), with Crawl-delay applied to the
+    shared per-domain scheduler
+    """
+    parsed = urlparse(url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+
+    cache = get_cache_manager()
+    cached = await cache.get("robots", origin)
+
+    if cached is not None:
+        rules = RobotsRules(**cached)
+    else:
+        text = ""
+        try:
+            client = await get_http_client()
+            async with get_host_scheduler().slot(origin):
+                response = await client.get(f"{origin}/robots.txt")
+            if response.status_code == 200:
+                text = response.text
+            logger.info(f"🤖 robots.txt for {origin}: HTTP {response.status_code}")
+        except Exception as e:
+            # Unreachable robots.txt: treat as "allow all"
+            logger.warning(f"⚠️ robots.txt unavailable for {origin}: {e}")
+
+        rules = parse_robots(text, SITEMAP_CONFIG.get("user_agent", "*"))
+        await cache.set("robots", origin, rules.__dict__, ttl=SITEMAP_CONFIG.get("robots_ttl", 86400))
+
+    if rules.crawl_delay:
+        # Holds as long as this robots.txt is trusted; re-applied (or dropped) when it's fetched again
+        get_host_scheduler().set_min_interval(
+            origin,
+            min(rules.crawl_delay, SITEMAP_CONFIG.get("max_crawl_delay", 30.0)),
+            ttl=SITEMAP_CONFIG.get("robots_ttl", 86400),
+            key="robots"
+        )
+    else:
+        get_host_scheduler().release_min_interval(origin, "robots")
+
+    return rules
+
+
+# ============================================================================
+# SITEMAPS
+# ============================================================================
+
+def _local(tag: str) -> str:
+    """Tag name without the XML namespace"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(content: bytes) -> Dict[str, List[str]]:
+    """
+    Parse a <urlset> or <sitemapindex> document
+
+    Returns:
+        {"urls": [...], "sitemaps": [...]}
+    """
+    # .xml.gz served without Content-Encoding arrives still compressed
+    if content[:2] == b"\x1f\x8b":
+        with gzip.GzipFile(fileobj=io.BytesIO(content)) as archive:
+            content = archive.read(SITEMAP_CONFIG.get("max_sitemap_bytes", 50_000_000))
+
+    parsed = {"urls": [], "sitemaps": []}
+
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        # Some sites serve plain-text sitemaps: one URL per line
+        text = content.decode("utf-8", errors="replace")
+        parsed["urls"] = [line.strip() for line in text.splitlines() if line.strip().startswith("http")]
+        return parsed
+
+    target = "sitemaps" if _local(root.tag) == "sitemapindex" else "urls"
+    for entry in root:
+        for child in entry:
+            if _local(child.tag) == "loc" and child.text:
+                parsed[target].append(child.text.strip())
+
+    return parsed
+
+
+async def _download(url: str) -> bytes:
+    """Fetch a sitemap through the shared client, capped at max_sitemap_bytes"""
+    max_bytes = SITEMAP_CONFIG.get("max_sitemap_bytes", 50_000_000)
+    client = await get_http_client()
+
+    async with get_host_scheduler().slot(url):
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= max_bytes:
+                    logger.warning(f"✂️ Sitemap capped at {max_bytes:,} bytes: {url}")
+                    break
+            return bytes(body[:max_bytes])
+
+
+async def read_sitemap(sitemap_url: str) -> Dict[str, List[str]]:
+    """One sitemap document (cached)"""
+    cache = get_cache_manager()
+    cached = await cache.get("sitemap", sitemap_url)
+    if cached is not None:
+        return cached
+
+    parsed = parse_sitemap(await _download(sitemap_url))
+    logger.info(f"🗺️ Sitemap {sitemap_url}: {len(parsed['urls'])} URLs, {len(parsed['sitemaps'])} child sitemaps")
+
+    await cache.set("sitemap", sitemap_url, parsed, ttl=SITEMAP_CONFIG.get("sitemap_ttl", 21600))
+    return parsed
+
+
+async def discover_urls(
+    site_url: str,
+    path_prefix: Optional[str] = None,
+    max_urls: Optional[int] = None,
+    respect_robots: bool = True
+) -> List[str]:
+    """
+    All page URLs a site lists in its sitemaps
+
+    Args:
+        site_url: Any URL on the site (or a sitemap URL ending in .xml/.xml.gz)
+        path_prefix: Keep only URLs under this path (e.g. "/pros/")
+        max_urls: Stop after this many URLs
+        respect_robots: Drop URLs disallowed by robots.txt
+
+    Returns:
+        Deduplicated URLs in sitemap order (empty if the site has no sitemap)
+    """
+    max_urls = max_urls or SITEMAP_CONFIG.get("max_urls", 50000)
+    max_sitemaps = SITEMAP_CONFIG.get("max_sitemaps", 50)
+
+    robots = await get_robots(site_url)
+
+    if re.search(r"\.xml(\.gz)?$", urlparse(site_url).path, re.I):
+        pending = [site_url]
+    else:
+        pending = list(robots.sitemaps) or [urljoin(site_url, "/sitemap.xml")]
+
+    seen_sitemaps = set()
+    urls: List[str] = []
+    seen_urls = set()
+
+    while pending and len(urls) < max_urls and len(seen_sitemaps) < max_sitemaps:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in seen_sitemaps:
+            continue
+        seen_sitemaps.add(sitemap_url)
+
+        try:
+            parsed = await read_sitemap(sitemap_url)
+        except Exception as e:
+            logger.warning(f"⚠️ Sitemap failed {sitemap_url}: {e}")
+            continue
+
+        pending.extend(parsed["sitemaps"])
+
+        for url in parsed["urls"]:
+            if url in seen_urls:
+                continue
+            if path_prefix and not urlparse(url).path.startswith(path_prefix):
+                continue
+            if respect_robots and not robots.can_fetch(url):
+                continue
+            seen_urls.add(url)
+            urls.append(url)
+            if len(urls) >= max_urls:
+                break
+
+    logger.info(f"🗺️ {len(urls)} URLs from {len(seen_sitemaps)} sitemap(s) for {site_url}")
+    return urls
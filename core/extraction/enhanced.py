@@ -6,11 +6,12 @@ Goal: 90%+ accuracy on real-world sites
 
 import re
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import json
 from groq import Groq
 import os
 from dotenv import load_dotenv
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
 # Load .env and ensure GROQ_API_KEY is present before importing modules that instantiate Groq
 load_dotenv()
@@ -100,7 +101,7 @@ def extract_hidden_data(html: str) -> Dict[str, List[str]]:
 # FEATURE 2: Multi-Level Scraping (List → Detail Pages)
 # ============================================================================
 
-def detect_list_page(html: str) -> Dict:
+def detect_list_page(html: Union[str, ParsedDocument]) -> Dict:
     """
     Detect if this is a list/directory page with links to detail pages
     
@@ -113,10 +114,8 @@ def detect_list_page(html: str) -> Dict:
         }
     """
     
-    soup = BeautifulSoup(html, 'html.parser')
-    
     # Find all links
-    all_links = soup.find_all('a', href=True)
+    all_links = as_document(html).links
     
     # Group links by pattern
     link_patterns = {}
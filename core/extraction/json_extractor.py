@@ -0,0 +1,158 @@
+"""
+Extraction from JSON payloads captured during rendering
+Maps the fields a prompt asks for onto record lists found in the page's own
+API responses - no HTML parsing, no LLM.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.config import JSON_CAPTURE_CONFIG
+from .field_parser import extract_requested_fields
+
+# Requested field -> key names it commonly has in APIs (normalized: lowercase, alnum only)
+FIELD_SYNONYMS = {
+    "title": ["title", "name", "headline", "heading", "subject"],
+    "name": ["name", "title", "productname", "displayname", "fullname"],
+    "heading": ["heading", "headline", "title"],
+    "price": ["price", "saleprice", "finalprice", "currentprice", "priceamount", "amount", "cost"],
+    "description": ["description", "desc", "summary", "details", "body"],
+    "image": ["image", "imageurl", "img", "thumbnail", "thumb", "picture", "photo", "cover"],
+    "url": ["url", "link", "href", "permalink", "canonicalurl", "slug"],
+    "link": ["link", "url", "href", "permalink"],
+    "author": ["author", "authorname", "creator", "seller", "sellername", "username"],
+    "date": ["date", "publishedat", "createdat", "posted", "published", "created", "updatedat", "timestamp"],
+    "category": ["category", "categoryname", "categories", "section", "type"],
+    "rating": ["rating", "ratingaverage", "averagerating", "score", "stars"],
+    "review": ["reviewcount", "reviews", "review", "ratingcount"],
+    "stock": ["stock", "instock", "quantity", "inventory"],
+    "availability": ["availability", "available", "instock", "stockstatus"],
+    "content": ["content", "body", "text"],
+    "text": ["text", "content", "body"],
+}
+
+
+def _normalize(key: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", key.lower())
+
+
+def _flatten(record: dict, prefix: str = "", depth: int = 0) -> Dict[str, Any]:
+    """Scalars of a record, nested objects joined with "_" (price.amount -> price_amount)"""
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}_{key}" if prefix else str(key)
+        if isinstance(value, dict) and depth < 2:
+            flat.update(_flatten(value, name, depth + 1))
+        elif isinstance(value, list):
+            # First scalar of a list (images: [...], categories: [...])
+            first = next((v for v in value if isinstance(v, (str, int, float))), None)
+            if first is not None:
+                flat[name] = first
+        elif value is not None and value != "":
+            flat[name] = value
+    return flat
+
+
+def _record_groups(data: Any, min_records: int, depth: int = 0) -> List[List[dict]]:
+    """Every list of objects (and rich single objects) in a payload"""
+    if depth > 6:
+        return []
+
+    groups = []
+    if isinstance(data, list):
+        records = [item for item in data if isinstance(item, dict)]
+        if len(records) >= min_records:
+            groups.append(records)
+        for item in data[:20]:
+            groups.extend(_record_groups(item, min_records, depth + 1))
+    elif isinstance(data, dict):
+        scalars = sum(1 for v in data.values() if isinstance(v, (str, int, float)) and not isinstance(v, bool))
+        if scalars >= 5:
+            groups.append([data])  # Detail-page object
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                groups.extend(_record_groups(value, min_records, depth + 1))
+    return groups
+
+
+def _match_field(field: str, keys: Dict[str, int]) -> Optional[str]:
+    """Best key for a requested field; keys maps key -> number of records having it"""
+    synonyms = FIELD_SYNONYMS.get(field, [field])
+    best, best_score = None, 0.0
+
+    for key, count in keys.items():
+        norm = _normalize(key)
+        last = _normalize(key.rsplit("_", 1)[-1])
+        for rank, synonym in enumerate(synonyms):
+            if norm == synonym or last == synonym:
+                score = 3.0
+            elif len(synonym) >= 4 and synonym in norm:
+                score = 2.0
+            else:
+                continue
+            # Earlier synonyms, more populated and shorter keys win ties
+            score += count / 1000 - rank * 0.1 - len(norm) / 10000
+            if score > best_score:
+                best, best_score = key, score
+    return best
+
+
+def _map_group(records: List[dict], fields: List[str]) -> Tuple[float, Dict[str, str], List[dict]]:
+    flat = [_flatten(r) for r in records]
+
+    keys: Dict[str, int] = {}
+    for record in flat[:50]:
+        for key in record:
+            keys[key] = keys.get(key, 0) + 1
+
+    mapping = {}
+    for field in fields:
+        key = _match_field(field, keys)
+        if key:
+            mapping[field] = key
+
+    return len(mapping) / len(fields), mapping, flat
+
+
+def extract_from_json(payloads: List[dict], prompt: str) -> Optional[dict]:
+    """
+    Extract the prompt's fields from captured payloads ([{"url", "data"}])
+
+    Returns a smart_extract-style result, or None when no payload covers
+    enough of the requested fields.
+    """
+    fields = extract_requested_fields(prompt)
+    if not payloads or not fields:
+        return None
+
+    min_records = JSON_CAPTURE_CONFIG.get("min_records", 2)
+    best = None  # (coverage, records, mapping, flat, source)
+
+    for payload in payloads:
+        for group in _record_groups(payload.get("data"), min_records):
+            coverage, mapping, flat = _map_group(group, fields)
+            candidate = (coverage, len(group), mapping, flat, payload.get("url"))
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+
+    if best is None or best[0] < JSON_CAPTURE_CONFIG.get("min_field_coverage", 0.5):
+        return None
+
+    coverage, _, mapping, flat, source = best
+    items = []
+    for record in flat:
+        item = {field: record.get(key) for field, key in mapping.items()}
+        if any(v is not None for v in item.values()):
+            items.append(item)
+        if len(items) >= JSON_CAPTURE_CONFIG.get("max_items", 100):
+            break
+
+    if not items:
+        return None
+
+    return {
+        "data": items,
+        "strategy": "json_payload",
+        "source": source,
+        "fields_mapped": mapping,
+        "confidence": round(coverage, 2)
+    }
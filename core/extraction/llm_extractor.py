@@ -1,11 +1,13 @@
 # Fallback: Full LLM Extraction
 import json
 import re
+from typing import Union
 from api.dependencies import groq_client
+from core.html_processing.parsed_document import ParsedDocument
 from core.html_processing.cleaner import clean_html_for_extraction, extract_article_structure
 
 
-def extract_with_llm_fallback(html: str, prompt: str) -> dict:
+def extract_with_llm_fallback(html: Union[str, ParsedDocument], prompt: str) -> dict:
     """Fallback to full LLM extraction with better context"""
     
     # For content extraction, use structured text instead of raw HTML
@@ -1,10 +1,11 @@
 import re
-from bs4 import BeautifulSoup
+from typing import Union
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
 # Meta Tag Extraction (NO LLM NEEDED)
-def extract_meta_tags(html: str) -> dict:
+def extract_meta_tags(html: Union[str, ParsedDocument]) -> dict:
     """Direct meta tag extraction - fast and free"""
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = as_document(html).soup
     
     meta = {}
     
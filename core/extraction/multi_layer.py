@@ -5,11 +5,12 @@ Extracts data with 90%+ accuracy using multiple methods
 
 import re
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Union
 import json
 from groq import Groq
 import os
 from dotenv import load_dotenv
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
 load_dotenv()
 
@@ -23,9 +24,11 @@ class MultiLayerExtractor:
     Layer 3: LLM verification (check if extracted data is valid)
     """
     
-    def __init__(self, html: str):
-        self.html = html
-        self.soup = BeautifulSoup(html, 'html.parser')
+    def __init__(self, html: Union[str, ParsedDocument]):
+        # Shared with the other extraction steps: the page is parsed once
+        self.doc = as_document(html)
+        self.html = self.doc.html
+        self.soup = self.doc.soup
         self.extracted = {
             "phones": set(),
             "emails": set(),
@@ -49,7 +52,7 @@ class MultiLayerExtractor:
         phones = set()
         
         # All links
-        for link in self.soup.find_all('a', href=True):
+        for link in self.doc.links:
             href = link.get('href', '').lower()
             original_href = link.get('href', '')  # Keep original for extraction
             
@@ -356,7 +359,7 @@ class MultiLayerExtractor:
         websites = set()
         
         # Look for external links
-        for link in self.soup.find_all('a', href=True):
+        for link in self.doc.links:
             href = link.get('href', '')
             
             # Must be http/https
@@ -402,7 +405,7 @@ class MultiLayerExtractor:
         #             print(f"   📞 Layer2: Found tel: → {phone}")
         
         # Get all text from HTML (including hidden)
-        all_text = self.soup.get_text()
+        all_text = self.doc.text
         
         # Phone patterns (international + local)
         patterns = [
@@ -421,7 +424,7 @@ class MultiLayerExtractor:
                     phones.add(cleaned.strip())
         
         # ✅ NEW: Also check href attributes for numbers (but skip social media!)
-        for link in self.soup.find_all('a', href=True):
+        for link in self.doc.links:
             href = link.get('href', '')
             
             # Skip social media
@@ -445,7 +448,7 @@ class MultiLayerExtractor:
         """Layer 2: Deep regex search for email patterns"""
         emails = set()
         
-        all_text = self.soup.get_text()
+        all_text = self.doc.text
         
         # Email pattern
         pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
@@ -596,7 +599,7 @@ Which are REAL {field_type}s? Return JSON."""
 # CONVENIENCE FUNCTION
 # ============================================================================
 
-def extract_with_multi_layer(html: str, fields: List[str] = None) -> Dict:
+def extract_with_multi_layer(html: Union[str, ParsedDocument], fields: List[str] = None) -> Dict:
     """
     Easy-to-use function for multi-layer extraction
     
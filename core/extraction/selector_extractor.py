@@ -1,10 +1,10 @@
-from typing import Dict
-from bs4 import BeautifulSoup
+from typing import Dict, Union
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
 # Fast Extraction with Selectors
-def extract_with_selectors(html: str, selectors: Dict[str, str]) -> dict:
+def extract_with_selectors(html: Union[str, ParsedDocument], selectors: Dict[str, str]) -> dict:
     """Extract data using CSS selectors - NO LLM"""
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = as_document(html).soup
     results = []
     
     if not selectors:
@@ -5,8 +5,9 @@ IMPROVED: Validates content has ACTUAL TEXT, not just divs
 from bs4 import BeautifulSoup
 import re
 import json
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from api.dependencies import groq_client
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
 
 def has_meaningful_content(element: BeautifulSoup, min_text_length: int = 100) -> bool:
@@ -132,12 +133,13 @@ def find_main_content(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
     return body
 
 
-def generate_selectors_with_llm(html: str, prompt: str) -> Dict[str, str]:
+def generate_selectors_with_llm(html: Union[str, ParsedDocument], prompt: str) -> Dict[str, str]:
     """
     ✅ IMPROVED: Better content finding and validation
     """
     
-    soup = BeautifulSoup(html, 'html.parser')
+    # Pruned below: work on a copy of the page's shared tree
+    soup = as_document(html).mutable_soup()
     
     # Remove scripts, styles, SVGs
     for tag in soup(['script', 'style', 'noscript', 'svg', 'path']):
@@ -229,7 +229,7 @@
 Smart extraction orchestrator
 Decides which extraction strategy to use BASED ON USER PROMPT
 """
-from typing import Optional
+from typing import Optional, Union
 from .meta_extractor import extract_meta_tags, is_meta_request
 from .selector_generator import generate_selectors_with_llm
 from .selector_extractor import extract_with_selectors
@@ -237,44 +237,48 @@ from .llm_extractor import extract_with_llm_fallback, is_full_content_request
 from .field_parser import extract_requested_fields, filter_to_requested_fields
 from core.extraction.enhanced import detect_list_page
 from core.extraction.multi_layer import extract_with_multi_layer
-from storage.cache_manager import get_cached_extraction, cache_extracted_data
+from storage.cache_manager import get_cached_extraction, cache_extracted_data, get_captured_json
+from .json_extractor import extract_from_json
+from core.html_processing.endpoint_registry import get_endpoint_registry
 from config.settings import selector_cache
+from core.html_processing.quiescence import remember_ready_selectors
+from core.html_processing.page_signals import register_patterns
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
-def is_blocked_by_bot_protection(html: str, url: str) -> bool:
+# Bot protection page text (matched case-insensitively)
+BLOCK_INDICATORS = register_patterns([
+    # Cloudflare
+    'Just a moment',
+    'Checking your browser',
+    'Enable JavaScript and cookies',
+    'cf-browser-verification',
+    
+    # Distil Networks
+    'distilnetworks.com',
+    'Third-Party Browser Plugins',
+    'Our website is made possible by displaying',
+    
+    # Other protections
+    'Access Denied',
+    'Access denied',
+    'You have been blocked',
+    'Suspicious activity',
+    'Please verify you are human',
+    
+    # Common bot block patterns
+    'bot protection',
+    'security check',
+])
+
+def is_blocked_by_bot_protection(html: Union[str, ParsedDocument], url: str) -> bool:
     """
     ✅ NEW: Detect if we got a bot protection page instead of real content
     """
-    block_indicators = [
-        # Cloudflare
-        'Just a moment',
-        'Checking your browser',
-        'Enable JavaScript and cookies',
-        'cf-browser-verification',
-        
-        # Distil Networks
-        'distilnetworks.com',
-        'Third-Party Browser Plugins',
-        'Our website is made possible by displaying',
-        
-        # Other protections
-        'Access Denied',
-        'Access denied',
-        'You have been blocked',
-        'Suspicious activity',
-        'Please verify you are human',
-        
-        # Common bot block patterns
-        'bot protection',
-        'security check',
-    ]
-    
-    html_lower = html.lower()
-    
     # Check for indicators
-    for indicator in block_indicators:
-        if indicator.lower() in html_lower:
-            print(f"🚫 Bot protection detected: {indicator}")
-            return True
+    indicator = as_document(html).signals.first(BLOCK_INDICATORS)
+    if indicator:
+        print(f"🚫 Bot protection detected: {indicator}")
+        return True
     
     # Check if HTML is suspiciously short for a real page
     if len(html) < 5000 and url:
@@ -291,20 +295,27 @@ def is_contact_info_request(prompt: str) -> bool:
     return any(keyword in prompt_lower for keyword in contact_keywords)
 
 
-async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str = None) -> dict:
+async def smart_extract(html: Union[str, ParsedDocument], prompt: str, cache_key: str = None, url: str = None, json_payloads: list = None) -> dict:
     """
     Enhanced smart extraction with multi-layer approach
     
+    html may be a ParsedDocument the caller already built for this page;
+    every step below shares its parsed tree.
+    
     Flow:
     1. Check cache
+    1b. JSON payloads captured while rendering / hydration state → map fields directly
     2. Detect if list page → crawl all items
     3. Check prompt type → route to correct extractor
     4. Return structured data
     """
+    # Parsed at most once, on the first step that needs the tree
+    doc = as_document(html, url)
+    
     # ========================================================================
     # STEP 0: Check if we got blocked
     # ========================================================================
-    if is_blocked_by_bot_protection(html, url):
+    if is_blocked_by_bot_protection(doc, url):
         print("🚫 Bot protection detected - cannot extract data")
         return {
             "data": [],
@@ -321,11 +332,38 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
             print(f"📦 Extraction cache HIT")
             return cached
     
+    # ========================================================================
+    # STEP 1b: Structured data from the page's own JSON (API responses
+    # captured while rendering, or SSR hydration state in the HTML)
+    # ========================================================================
+    if not is_meta_request(prompt) and not is_full_content_request(prompt):
+        if json_payloads is None and (url or cache_key):
+            json_payloads = await get_captured_json(url or cache_key)
+        json_payloads = list(json_payloads or [])
+        
+        hydration = doc.hydration
+        if hydration:
+            json_payloads.append({"url": hydration["source"], "data": hydration["data"]})
+        
+        if json_payloads:
+            result = extract_from_json(json_payloads, prompt)
+            if result:
+                print(f"🧾 JSON payload extraction ({result['source'][:60]}): {len(result['data'])} items, fields {result['fields_mapped']}")
+                # This endpoint really carries the data: it may be replayed without a browser
+                if result["source"].startswith("http"):
+                    get_endpoint_registry().mark_extracted(result["source"])
+                
+                if cache_key:
+                    await cache_extracted_data(cache_key, prompt, result["data"])
+                
+                return result
+            print("⚠️ Captured JSON doesn't cover the requested fields, extracting from HTML")
+    
     # ========================================================================
     # STEP 2: Check if it's a list page that needs crawling
     # ========================================================================
     if url:
-        list_detection = detect_list_page(html)
+        list_detection = detect_list_page(doc)
         
         if list_detection["is_list"] and list_detection["total_items"] > 1:
             print(f"📋 Detected list page with {list_detection['total_items']} items")
@@ -363,7 +401,7 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
     # Strategy 1: Meta tags (instant, free)
     if is_meta_request(prompt):
         print("🏷️ Meta tag request detected")
-        meta_data = extract_meta_tags(html)
+        meta_data = extract_meta_tags(doc)
         result = {"data": [meta_data], "strategy": "meta_direct"}
         
         if cache_key:
@@ -374,7 +412,7 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
     # Strategy 2: Full content extraction (articles, blogs)
     if is_full_content_request(prompt):
         print("📄 Full content request detected, using LLM directly")
-        result = extract_with_llm_fallback(html, prompt)
+        result = extract_with_llm_fallback(doc, prompt)
         
         if requested_fields and result.get("data"):
             result["data"] = filter_to_requested_fields(result["data"], requested_fields)
@@ -387,7 +425,7 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
     # Strategy 3: Contact info extraction (ONLY if user asks for it!)
     if is_contact_info_request(prompt):
         print("📞 Contact info request detected, using multi-layer extraction")
-        multi_layer_result = extract_with_multi_layer(html, fields=["phones", "emails", "websites"])
+        multi_layer_result = extract_with_multi_layer(doc, fields=["phones", "emails", "websites"])
         
         # Check if we got good data
         if multi_layer_result and any(multi_layer_result.get("phones", []) or multi_layer_result.get("emails", [])):
@@ -412,7 +450,7 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
     
     if not selectors:
         print("🤖 Generating CSS selectors with LLM...")
-        selectors = generate_selectors_with_llm(html, prompt)
+        selectors = generate_selectors_with_llm(doc, prompt)
         if selectors and cache_key:
             selector_cache[cache_key] = selectors
             print(f"💾 Cached selectors for future use: {list(selectors.keys())}")
@@ -420,7 +458,7 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
         print(f"📦 Using cached selectors: {list(selectors.keys())}")
     
     if selectors:
-        result = extract_with_selectors(html, selectors)
+        result = extract_with_selectors(doc, selectors)
         data = result.get("data", [])
         
         # Validate data quality
@@ -436,6 +474,8 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
                 result["data"] = filtered_data
             
             result["selectors_used"] = selectors
+            # Future renders of this domain can finish as soon as these match
+            remember_ready_selectors(url or cache_key, selectors)
             print(f"✅ Selectors worked! Extracted {len(data)} items with fields: {list(data[0].keys()) if data else []}")
             
             if cache_key:
@@ -449,7 +489,7 @@ async def smart_extract(html: str, prompt: str, cache_key: str = None, url: str
     
     # Strategy 5: Fallback to full LLM extraction
     print("🤖 Falling back to full LLM extraction")
-    result = extract_with_llm_fallback(html, prompt)
+    result = extract_with_llm_fallback(doc, prompt)
     
     if requested_fields and result.get("data"):
         result["data"] = filter_to_requested_fields(result["data"], requested_fields)
@@ -0,0 +1,239 @@
+"""
+Adaptive per-domain concurrency (AIMD)
+Each domain's in-flight limit in the host scheduler follows additive
+increase / multiplicative decrease: every response that comes back fast
+while the domain is busy grows the limit by about one per window of
+requests; a 429/503, a Retry-After, a timing anomaly or latency well above
+the domain's baseline halves it. Tolerant hosts climb towards max_limit,
+hosts that start to struggle are backed off before they ban us.
+"""
+
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+import logging
+
+from core.html_processing.host_scheduler import get_host_scheduler, get_host_key
+from config.config import ADAPTIVE_CONCURRENCY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "slow down"
+BACKOFF_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header value (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class HostWindow:
+    """Congestion window for one domain"""
+    limit: float
+    baseline: Dict[str, float] = field(default_factory=dict)   # kind -> latency EMA
+    samples: Dict[str, int] = field(default_factory=dict)
+    last_decrease: float = 0.0
+    increases: int = 0
+    decreases: int = 0
+    decreases_in_row: int = 0           # Backoff exponent while no response succeeds
+    last_reason: str = ""
+
+
+class AimdController:
+    """
+    Drives HostScheduler.set_max_in_flight from response outcomes
+
+    Usage:
+        controller = get_concurrency_controller()
+        controller.on_response(url, status_code, latency)          # Every fetch
+        controller.on_timing_anomaly(url, "timing_slow_challenge")
+        delay = controller.on_rate_limited(url, retry_after)       # Seconds to back off
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_inflation: float = 2.5,
+        min_latency_samples: int = 5,
+        max_retry_after: float = 300.0
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.latency_inflation = latency_inflation
+        self.min_latency_samples = min_latency_samples
+        self.max_retry_after = max_retry_after
+        self.scheduler = get_host_scheduler()
+        self._hosts: Dict[str, HostWindow] = {}
+
+    def _window(self, host: str) -> HostWindow:
+        window = self._hosts.get(host)
+        if window is None:
+            start = min(max(self.scheduler.default_max_in_flight, self.min_limit), self.max_limit)
+            window = self._hosts[host] = HostWindow(limit=float(start))
+        return window
+
+    def _apply(self, host: str, window: HostWindow):
+        limit = int(window.limit)
+        if limit != self.scheduler.get_max_in_flight(host):
+            self.scheduler.set_max_in_flight(host, limit)
+
+    # ========================================================================
+    # SIGNALS
+    # ========================================================================
+
+    def on_response(self, url: str, status_code: int, latency: float, kind: str = "static",
+                    retry_after: Optional[float] = None):
+        """
+        Feed one completed request
+
+        kind keeps separate latency baselines per request type (a render is
+        always slower than a static GET).
+        """
+        if not ADAPTIVE_CONCURRENCY_CONFIG.get("enabled", True):
+            return
+
+        if status_code in BACKOFF_STATUSES:
+            self.on_rate_limited(url, retry_after, reason=f"HTTP {status_code}")
+            return
+
+        host = get_host_key(url)
+        window = self._window(host)
+        samples = window.samples.get(kind, 0)
+        baseline = window.baseline.get(kind)
+
+        # The scheduler forgets idle hosts: restore the learned limit
+        self._apply(host, window)
+
+        # Slow hosts drift the baseline up too, so a permanent slowdown stops counting as inflation
+        window.baseline[kind] = latency if baseline is None else baseline * 0.9 + latency * 0.1
+        window.samples[kind] = samples + 1
+
+        if baseline is not None and samples >= self.min_latency_samples:
+            # Queueing on the server shows up as latency before it shows up as errors
+            if latency > baseline * self.latency_inflation and latency - baseline > 0.5:
+                self._decrease(host, window, f"latency {latency:.1f}s vs {baseline:.1f}s")
+                return
+
+        if status_code < 400:
+            window.decreases_in_row = 0
+            self._increase(host, window)
+
+    def on_timing_anomaly(self, url: str, reason: str):
+        """The detector saw a suspicious response time (challenge / block page)"""
+        if not ADAPTIVE_CONCURRENCY_CONFIG.get("enabled", True):
+            return
+        host = get_host_key(url)
+        self._decrease(host, self._window(host), reason)
+
+    def on_rate_limited(self, url: str, retry_after: Optional[float] = None, reason: str = "rate limited") -> float:
+        """
+        The host told us to slow down: shrink its window and pause its bucket
+
+        Returns the seconds to wait before the next request to the host.
+        """
+        if not ADAPTIVE_CONCURRENCY_CONFIG.get("enabled", True):
+            return min(retry_after or 5.0, self.max_retry_after)
+
+        host = get_host_key(url)
+        window = self._window(host)
+        self._decrease(host, window, reason)
+
+        if retry_after:
+            delay = min(retry_after, self.max_retry_after)
+        else:
+            delay = min(2.0 ** window.decreases_in_row, self.max_retry_after)
+        self.scheduler.pause(host, delay)
+        return delay
+
+    # ========================================================================
+    # WINDOW
+    # ========================================================================
+
+    def _increase(self, host: str, window: HostWindow):
+        # Only grow while the limit is what's holding the domain back
+        if window.limit >= self.max_limit or not self.scheduler.is_saturated(host):
+            return
+        window.limit = min(self.max_limit, window.limit + self.additive_increase / window.limit)
+        window.increases += 1
+        self._apply(host, window)
+
+    def _decrease(self, host: str, window: HostWindow, reason: str):
+        now = time.monotonic()
+        window.last_reason = reason
+
+        # Responses already in flight carry the same congestion: one cut per window
+        baseline = max(window.baseline.values(), default=1.0)
+        if now - window.last_decrease < max(baseline, 1.0):
+            return
+
+        window.last_decrease = now
+        window.decreases += 1
+        window.decreases_in_row += 1
+        window.limit = max(float(self.min_limit), window.limit * self.decrease_factor)
+        self._apply(host, window)
+        logger.info(f"🐢 {host}: concurrency → {int(window.limit)} ({reason})")
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def get_limit(self, url: str) -> int:
+        window = self._hosts.get(get_host_key(url))
+        return int(window.limit) if window else self.scheduler.default_max_in_flight
+
+    def get_stats(self) -> dict:
+        return {
+            "hosts": {
+                host: {
+                    "limit": round(window.limit, 2),
+                    "latency": {kind: round(value, 3) for kind, value in window.baseline.items()},
+                    "increases": window.increases,
+                    "decreases": window.decreases,
+                    "last_reason": window.last_reason
+                }
+                for host, window in list(self._hosts.items())[:50]
+            }
+        }
+
+
+# ============================================================================
+# GLOBAL CONTROLLER INSTANCE
+# ============================================================================
+
+_controller: Optional[AimdController] = None
+
+
+def get_concurrency_controller() -> AimdController:
+    """Get or create the process-wide AIMD controller"""
+    global _controller
+
+    if _controller is None:
+        _controller = AimdController(
+            min_limit=ADAPTIVE_CONCURRENCY_CONFIG.get("min_in_flight", 1),
+            max_limit=ADAPTIVE_CONCURRENCY_CONFIG.get("max_in_flight", 16),
+            additive_increase=ADAPTIVE_CONCURRENCY_CONFIG.get("additive_increase", 1.0),
+            decrease_factor=ADAPTIVE_CONCURRENCY_CONFIG.get("decrease_factor", 0.5),
+            latency_inflation=ADAPTIVE_CONCURRENCY_CONFIG.get("latency_inflation", 2.5),
+            min_latency_samples=ADAPTIVE_CONCURRENCY_CONFIG.get("min_latency_samples", 5),
+            max_retry_after=ADAPTIVE_CONCURRENCY_CONFIG.get("max_retry_after", 300.0)
+        )
+
+    return _controller
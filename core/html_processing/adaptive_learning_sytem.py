@@ -5,12 +5,15 @@ Success rates learn from actual results per domain
 
 import json
 import time
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from collections import defaultdict
+from typing import Deque, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
+from collections import defaultdict, deque
 from datetime import datetime, timedelta
 import math
 
+from storage.knowledge_store import KnowledgeStore, get_knowledge_store
+from config.config import ADAPTIVE_LEARNING_CONFIG
+
 
 @dataclass
 class AttemptRecord:
@@ -37,6 +40,19 @@ class DomainStats:
     best_technique: Optional[str] = None
 
 
+@dataclass
+class DomainAggregate:
+    """Running, time-decayed aggregates for a domain (updated in O(1) per attempt)"""
+    total: int = 0
+    successes: int = 0
+    weighted_successes: float = 0.0    # Decayed sums: success_rate = weighted_successes / weight
+    weight: float = 0.0
+    weighted_response_time: float = 0.0
+    updated: float = 0.0               # When the decayed sums were last brought up to date
+    protection_types: Dict[str, int] = field(default_factory=dict)
+    techniques: Dict[str, List[float]] = field(default_factory=dict)  # technique -> [attempts, successes]
+
+
 class AdaptiveLearner:
     """
     Learn from scraping attempts and adapt success rates
@@ -47,13 +63,29 @@ class AdaptiveLearner:
     - Time-decay (old data matters less)
     - Technique effectiveness tracking
     - Automatic strategy adjustment
+    
+    Each attempt updates running aggregates (no recomputation over history),
+    history is a bounded ring buffer per domain, and knowledge is persisted
+    through the knowledge store (SQLite WAL, batched off the event loop).
     """
     
-    def __init__(self, persistence_file: str = "scraping_knowledge.json"):
-        self.persistence_file = persistence_file
-        
-        # Domain-level tracking
-        self.domain_history: Dict[str, List[AttemptRecord]] = defaultdict(list)
+    NAMESPACE = "adaptive_learning"
+    
+    def __init__(
+        self,
+        persistence_file: str = "scraping_knowledge.json",
+        store: Optional[KnowledgeStore] = None,
+        history_size: int = ADAPTIVE_LEARNING_CONFIG.get("history_size", 200),
+        half_life_days: float = ADAPTIVE_LEARNING_CONFIG.get("half_life_days", 7)
+    ):
+        self.persistence_file = persistence_file  # Legacy JSON knowledge, imported once
+        self.store = store or get_knowledge_store()
+        self.history_size = history_size
+        self.half_life = half_life_days * 24 * 60 * 60
+        
+        # Domain-level tracking (recent attempts only: ring buffers)
+        self.domain_history: Dict[str, Deque[AttemptRecord]] = defaultdict(lambda: deque(maxlen=self.history_size))
+        self.domain_aggregates: Dict[str, DomainAggregate] = {}
         self.domain_stats: Dict[str, DomainStats] = {}
         
         # Protection-type level tracking (global)
@@ -100,11 +132,11 @@ class AdaptiveLearner:
             error_type=error_type
         )
         
-        # Add to domain history
+        # Add to domain history (oldest attempts fall off)
         self.domain_history[domain].append(record)
         
         # Update domain stats
-        self._update_domain_stats(domain)
+        self._update_domain_stats(domain, record)
         
         # Update protection-type stats (global)
         self._update_protection_stats(protection_type, success)
@@ -112,96 +144,64 @@ class AdaptiveLearner:
         # Update technique effectiveness
         self._update_technique_effectiveness(protection_type, technique_used, success)
         
-        # Persist knowledge
-        self.save_knowledge()
+        # Queue the changed entries (written in batches, off the event loop)
+        self.store.put(self.NAMESPACE, f"domain:{domain}", asdict(self.domain_aggregates[domain]))
+        self.store.put(self.NAMESPACE, f"protection:{protection_type}", self.protection_stats[protection_type])
+        self.store.put(self.NAMESPACE, f"technique:{protection_type}", dict(self.technique_effectiveness[protection_type]))
     
     
-    def _update_domain_stats(self, domain: str):
-        """Recalculate stats for a domain"""
-        history = self.domain_history[domain]
-        
-        if not history:
-            return
-        
-        # Filter recent history (last 30 days)
-        cutoff = time.time() - (30 * 24 * 60 * 60)
-        recent = [r for r in history if r.timestamp > cutoff]
-        
-        if not recent:
-            recent = history[-50:]  # At least last 50 attempts
-        
-        total = len(recent)
-        successes = sum(1 for r in recent if r.success)
-        failures = total - successes
-        
-        # Calculate success rate with time decay
-        success_rate = self._calculate_time_weighted_success_rate(recent)
+    def _decay(self, aggregate: DomainAggregate, now: float):
+        """Bring the decayed sums up to now: weight = 2^(-age/half_life)"""
+        if aggregate.updated:
+            factor = math.exp(-max(0.0, now - aggregate.updated) / self.half_life * math.log(2))
+            aggregate.weighted_successes *= factor
+            aggregate.weight *= factor
+            aggregate.weighted_response_time *= factor
+        aggregate.updated = now
+    
+    
+    def _update_domain_stats(self, domain: str, record: AttemptRecord):
+        """Fold one attempt into the domain's running aggregates"""
+        aggregate = self.domain_aggregates.setdefault(domain, DomainAggregate())
+        self._decay(aggregate, record.timestamp)
         
-        # Find most common protection type
-        protection_counts = defaultdict(int)
-        for r in recent:
-            protection_counts[r.protection_type] += 1
+        aggregate.total += 1
+        aggregate.successes += 1 if record.success else 0
+        aggregate.weight += 1.0
+        aggregate.weighted_successes += 1.0 if record.success else 0.0
+        aggregate.weighted_response_time += record.response_time
+        aggregate.protection_types[record.protection_type] = aggregate.protection_types.get(record.protection_type, 0) + 1
         
-        # Average response time
-        avg_response = sum(r.response_time for r in recent) / len(recent)
+        technique = aggregate.techniques.setdefault(record.technique_used, [0, 0])
+        technique[0] += 1
+        technique[1] += 1 if record.success else 0
         
+        self.domain_stats[domain] = self._stats_from_aggregate(domain, aggregate)
+    
+    
+    def _stats_from_aggregate(self, domain: str, aggregate: DomainAggregate) -> DomainStats:
         # Find best technique
-        technique_success = defaultdict(lambda: {"success": 0, "total": 0})
-        for r in recent:
-            technique_success[r.technique_used]["total"] += 1
-            if r.success:
-                technique_success[r.technique_used]["success"] += 1
-        
         best_technique = None
         best_rate = 0.0
-        for tech, stats in technique_success.items():
-            rate = stats["success"] / stats["total"] if stats["total"] > 0 else 0
-            if rate > best_rate and stats["total"] >= 3:  # At least 3 attempts
+        for tech, (attempts, successes) in aggregate.techniques.items():
+            rate = successes / attempts if attempts > 0 else 0
+            if rate > best_rate and attempts >= 3:  # At least 3 attempts
                 best_rate = rate
                 best_technique = tech
         
-        # Store stats
-        self.domain_stats[domain] = DomainStats(
+        return DomainStats(
             domain=domain,
-            total_attempts=total,
-            successful_attempts=successes,
-            failed_attempts=failures,
-            success_rate=success_rate,
-            last_attempt=recent[-1].timestamp,
-            protection_types=dict(protection_counts),
-            avg_response_time=avg_response,
+            total_attempts=aggregate.total,
+            successful_attempts=aggregate.successes,
+            failed_attempts=aggregate.total - aggregate.successes,
+            success_rate=aggregate.weighted_successes / aggregate.weight if aggregate.weight > 0 else 0.5,
+            last_attempt=aggregate.updated,
+            protection_types=dict(aggregate.protection_types),
+            avg_response_time=aggregate.weighted_response_time / aggregate.weight if aggregate.weight > 0 else 0.0,
             best_technique=best_technique
         )
     
     
-    def _calculate_time_weighted_success_rate(self, records: List[AttemptRecord]) -> float:
-        """
-        Calculate success rate with exponential time decay
-        Recent attempts matter more than old ones
-        """
-        
-        if not records:
-            return 0.5
-        
-        now = time.time()
-        weighted_sum = 0.0
-        weight_sum = 0.0
-        
-        # Decay factor: half-life of 7 days
-        half_life = 7 * 24 * 60 * 60  # 7 days in seconds
-        
-        for record in records:
-            age = now - record.timestamp
-            
-            # Exponential decay: weight = 2^(-age/half_life)
-            weight = math.exp(-age / half_life * math.log(2))
-            
-            weighted_sum += (1.0 if record.success else 0.0) * weight
-            weight_sum += weight
-        
-        return weighted_sum / weight_sum if weight_sum > 0 else 0.5
-    
-    
     def _update_protection_stats(self, protection_type: str, success: bool):
         """Update global stats for a protection type"""
         stats = self.protection_stats[protection_type]
@@ -444,48 +444,69 @@ class AdaptiveLearner:
     # ========================================================================
     
     def save_knowledge(self):
-        """Save learned knowledge to disk"""
+        """Write queued knowledge to disk now (normally batched by the store)"""
+        self.store.flush_sync()
+    
+    
+    def load_knowledge(self):
+        """Load previously learned knowledge"""
         
-        data = {
-            "domain_stats": {k: asdict(v) for k, v in self.domain_stats.items()},
-            "protection_stats": dict(self.protection_stats),
-            "technique_effectiveness": {
-                k: dict(v) for k, v in self.technique_effectiveness.items()
-            },
-            "saved_at": time.time()
-        }
+        entries = self.store.namespace(self.NAMESPACE)
+        if not entries:
+            self._import_legacy_file()
+            entries = self.store.namespace(self.NAMESPACE)
         
         try:
-            with open(self.persistence_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            for key, value in entries.items():
+                kind, _, name = key.partition(":")
+                if kind == "domain":
+                    aggregate = DomainAggregate(**value)
+                    self.domain_aggregates[name] = aggregate
+                    self.domain_stats[name] = self._stats_from_aggregate(name, aggregate)
+                elif kind == "protection":
+                    self.protection_stats[name] = value
+                elif kind == "technique":
+                    self.technique_effectiveness[name] = defaultdict(float, value)
+            
+            if entries:
+                print(f"✅ Loaded knowledge: {len(self.domain_stats)} domains")
+            else:
+                print("📝 No previous knowledge found, starting fresh")
         except Exception as e:
-            print(f"Failed to save knowledge: {e}")
+            print(f"⚠️ Failed to load knowledge: {e}")
     
     
-    def load_knowledge(self):
-        """Load previously learned knowledge"""
+    def _import_legacy_file(self):
+        """One-time import of the old scraping_knowledge.json format"""
         
         try:
             with open(self.persistence_file, 'r') as f:
                 data = json.load(f)
-            
-            # Load domain stats
-            for domain, stats_dict in data.get("domain_stats", {}).items():
-                self.domain_stats[domain] = DomainStats(**stats_dict)
-            
-            # Load protection stats
-            self.protection_stats = defaultdict(
-                lambda: {"attempts": 0, "successes": 0, "failures": 0, "success_rate": 0.5, "last_updated": time.time()},
-                data.get("protection_stats", {})
-            )
-            
-            # Load technique effectiveness
-            for ptype, techniques in data.get("technique_effectiveness", {}).items():
-                self.technique_effectiveness[ptype] = defaultdict(float, techniques)
-            
-            print(f"✅ Loaded knowledge: {len(self.domain_stats)} domains")
-        
         except FileNotFoundError:
-            print("📝 No previous knowledge found, starting fresh")
+            return
         except Exception as e:
-            print(f"⚠️ Failed to load knowledge: {e}")
\ No newline at end of file
+            print(f"⚠️ Failed to load knowledge: {e}")
+            return
+        
+        for domain, stats in data.get("domain_stats", {}).items():
+            weight = float(stats["total_attempts"])
+            aggregate = DomainAggregate(
+                total=stats["total_attempts"],
+                successes=stats["successful_attempts"],
+                weighted_successes=stats["success_rate"] * weight,
+                weight=weight,
+                weighted_response_time=stats["avg_response_time"] * weight,
+                updated=stats["last_attempt"],
+                protection_types=stats.get("protection_types", {}),
+                # Only the winner was saved: credit it with a passing record
+                techniques={stats["best_technique"]: [3, 3]} if stats.get("best_technique") else {}
+            )
+            self.store.put(self.NAMESPACE, f"domain:{domain}", asdict(aggregate))
+        
+        for ptype, stats in data.get("protection_stats", {}).items():
+            self.store.put(self.NAMESPACE, f"protection:{ptype}", stats)
+        
+        for ptype, techniques in data.get("technique_effectiveness", {}).items():
+            self.store.put(self.NAMESPACE, f"technique:{ptype}", techniques)
+        
+        print(f"📥 Imported {self.persistence_file} into the knowledge store")
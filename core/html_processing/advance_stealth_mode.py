@@ -11,10 +11,12 @@ from typing import Dict, List, Optional, Tuple, Set
 import time
 import hashlib
 import json
-from collections import defaultdict
+from collections import defaultdict, deque
 import asyncio
 import re
 
+from core.html_processing.page_signals import register_patterns, get_page_signals
+
 
 class ProtectionType(Enum):
     """Granular protection types (not just 'CAPTCHA')"""
@@ -174,6 +176,36 @@ class DetectionSignal:
     metadata: Dict  # Additional info
 
 
+# Page text the HTML detector looks for (one shared scan per page, see page_signals.py)
+HTML_PROTECTION_SIGNS = register_patterns([
+    'checking your browser',
+    'please wait while we check your browser',
+    'cf-browser-verification',
+    'perimeterx',
+    'px-captcha',
+    '_pxhd',
+    'verify your phone number',
+    'verify your email',
+    'enter the code sent to',
+    'sms verification',
+    'captcha',
+    'turnstile',
+    'cf-turnstile',
+    'challenges.cloudflare.com/turnstile',
+    'data-sitekey',
+    'datadome',
+    'geo.captcha-delivery',
+    'recaptcha',
+    'g-recaptcha',
+    'grecaptcha.execute',
+    'data-action',
+    'hcaptcha',
+    'enterprise',
+    'funcaptcha',
+    'arkoselabs'
+])
+
+
 class MultiSignalDetector:
     """
     Advanced detector using multiple signals:
@@ -185,8 +217,9 @@ class MultiSignalDetector:
     - TLS fingerprints
     """
     
-    def __init__(self):
-        self.domain_history: Dict[str, List[DetectionSignal]] = defaultdict(list)
+    def __init__(self, history_size: int = 50):
+        # Bounded per-domain window (the detector is shared process-wide)
+        self.domain_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=history_size))
         self.timing_baseline: Dict[str, float] = {}
     
     
@@ -197,14 +230,14 @@ class MultiSignalDetector:
     def detect_from_html(self, html: str) -> List[DetectionSignal]:
         """HTML-based detection (your original method + enhancements)"""
         signals = []
-        html_lower = html.lower()
+        scan = get_page_signals(html)
         
         # Cloudflare Browser Check (5-sec challenge)
-        if any(s in html_lower for s in [
+        if scan.any([
             'checking your browser',
             'please wait while we check your browser',
             'cf-browser-verification'
-        ]) and 'captcha' not in html_lower:
+        ]) and not scan.has('captcha'):
             signals.append(DetectionSignal(
                 protection_type=ProtectionType.CF_BROWSER_CHECK,
                 confidence=0.95,
@@ -213,11 +246,11 @@ class MultiSignalDetector:
             ))
         
         # Cloudflare Turnstile (granular detection)
-        if 'turnstile' in html_lower or 'cf-turnstile' in html_lower:
+        if scan.has('turnstile') or scan.has('cf-turnstile'):
             # Check if visible or invisible
-            if 'challenges.cloudflare.com/turnstile' in html_lower:
+            if scan.has('challenges.cloudflare.com/turnstile'):
                 # Check complexity
-                if 'data-sitekey' in html_lower:
+                if scan.has('data-sitekey'):
                     # Extract sitekey to determine difficulty
                     sitekey_match = re.search(r'data-sitekey="([^"]+)"', html)
                     if sitekey_match:
@@ -244,8 +277,8 @@ class MultiSignalDetector:
                 ))
         
         # DataDome
-        if 'datadome' in html_lower:
-            if 'captcha' in html_lower or 'geo.captcha-delivery' in html_lower:
+        if scan.has('datadome'):
+            if scan.has('captcha') or scan.has('geo.captcha-delivery'):
                 protection = ProtectionType.DATADOME_CAPTCHA
                 confidence = 0.90
             else:
@@ -260,8 +293,8 @@ class MultiSignalDetector:
             ))
         
         # PerimeterX
-        if any(s in html_lower for s in ['perimeterx', 'px-captcha', '_pxhd']):
-            if 'captcha' in html_lower:
+        if scan.any(['perimeterx', 'px-captcha', '_pxhd']):
+            if scan.has('captcha'):
                 protection = ProtectionType.PX_CAPTCHA
                 confidence = 0.90
             else:
@@ -276,12 +309,12 @@ class MultiSignalDetector:
             ))
         
         # reCAPTCHA variants
-        if 'recaptcha' in html_lower:
-            if 'g-recaptcha' in html_lower:
+        if scan.has('recaptcha'):
+            if scan.has('g-recaptcha'):
                 # Visible checkbox
                 protection = ProtectionType.RECAPTCHA_V2_CHECKBOX
                 confidence = 0.95
-            elif 'grecaptcha.execute' in html_lower or 'data-action' in html_lower:
+            elif scan.has('grecaptcha.execute') or scan.has('data-action'):
                 # Invisible v3
                 protection = ProtectionType.RECAPTCHA_V3
                 confidence = 0.90
@@ -298,9 +331,9 @@ class MultiSignalDetector:
             ))
         
         # hCaptcha
-        if 'hcaptcha' in html_lower:
+        if scan.has('hcaptcha'):
             # Check difficulty by looking at sitekey or challenge type
-            if 'data-sitekey' in html_lower and 'enterprise' in html_lower:
+            if scan.has('data-sitekey') and scan.has('enterprise'):
                 protection = ProtectionType.HCAPTCHA_HARD
                 confidence = 0.90
             else:
@@ -315,7 +348,7 @@ class MultiSignalDetector:
             ))
         
         # FunCaptcha (Arkose)
-        if 'funcaptcha' in html_lower or 'arkoselabs' in html_lower:
+        if scan.has('funcaptcha') or scan.has('arkoselabs'):
             signals.append(DetectionSignal(
                 protection_type=ProtectionType.FUNCAPTCHA,
                 confidence=0.95,
@@ -324,7 +357,7 @@ class MultiSignalDetector:
             ))
         
         # Manual verification
-        if any(s in html_lower for s in [
+        if scan.any([
             'verify your phone number',
             'verify your email',
             'enter the code sent to',
@@ -441,6 +474,10 @@ class MultiSignalDetector:
                 metadata={'baseline': baseline, 'actual': response_time}
             ))
         
+        # Normal response: let the baseline follow the domain's typical timing
+        if not signals:
+            self.timing_baseline[domain] = baseline * 0.8 + response_time * 0.2
+        
         return signals
     
     
@@ -676,8 +713,9 @@ class CostFreeSolver:
         """
         print("   ðŸª Cookie-based solving...")
         
-        # Load cookies if we have them (would need cookie storage)
-        # For now, just navigate and let cookies be set
+        # Saved clearance cookies are loaded before navigation and saved
+        # after a solve by the renderer (storage_state.py); here we just let
+        # the challenge script set fresh ones
         
         await asyncio.sleep(2)
         
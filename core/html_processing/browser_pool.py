@@ -0,0 +1,278 @@
+"""
+Playwright browser pool
+N browsers x M contexts, warm pages reused across navigations, crash
+recovery and context recycling after K pages to cap memory growth.
+Each browser is its own Chromium process, so renders spread across cores.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+PageFactory = Callable[[BrowserContext, bool], Awaitable[Page]]
+
+
+@dataclass
+class PooledContext:
+    """One browser context and its warm pages"""
+    context: BrowserContext
+    in_use: int = 0
+    uses: int = 0                                   # Navigations served
+    retiring: bool = False                          # Recycle once in_use drops to 0
+    idle: Dict[bool, List[Page]] = field(default_factory=lambda: {False: [], True: []})  # by stealth_mode
+
+    def idle_count(self) -> int:
+        return len(self.idle[False]) + len(self.idle[True])
+
+
+@dataclass
+class PooledBrowser:
+    """One Chromium process"""
+    browser: Browser
+    contexts: List[PooledContext] = field(default_factory=list)
+
+    def live_contexts(self) -> List[PooledContext]:
+        return [c for c in self.contexts if not c.retiring]
+
+
+class BrowserPool:
+    """
+    Usage:
+        async with pool.page(stealth_mode=True) as page:
+            await page.goto(url)
+
+    Pages come back to their context after use (routes removed, about:blank)
+    and are handed out again. A context is closed and replaced after
+    `recycle_after` navigations; a disconnected browser is relaunched the
+    next time the pool is used.
+    """
+
+    def __init__(
+        self,
+        launch_options: dict,
+        page_factory: PageFactory,
+        browsers: int = 1,
+        contexts_per_browser: int = 2,
+        pages_per_context: int = 2,
+        recycle_after: int = 100,
+        acquire_timeout: float = 60.0,
+        context_options: Optional[dict] = None
+    ):
+        self.launch_options = launch_options
+        self.page_factory = page_factory
+        self.num_browsers = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.pages_per_context = max(1, pages_per_context)
+        self.recycle_after = max(1, recycle_after)
+        self.acquire_timeout = acquire_timeout
+        self.context_options = context_options or {}
+
+        self.capacity = self.num_browsers * self.contexts_per_browser * self.pages_per_context
+        self._slots = asyncio.Semaphore(self.capacity)
+        self._lock = asyncio.Lock()
+        self._playwright = None
+        self._browsers: List[PooledBrowser] = []
+        self._crashed: set = set()
+
+        self.stats = {
+            "pages_served": 0,
+            "pages_reused": 0,
+            "pages_created": 0,
+            "contexts_recycled": 0,
+            "browsers_relaunched": 0,
+            "page_crashes": 0,
+        }
+
+    # ========================================================================
+    # LIFECYCLE
+    # ========================================================================
+
+    async def _launch(self) -> PooledBrowser:
+        browser = await self._playwright.chromium.launch(**self.launch_options)
+        return PooledBrowser(browser=browser)
+
+    async def _ensure_started(self):
+        """Start Playwright and launch browsers (first use); relaunch crashed ones"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        if not self._browsers:
+            self._browsers = list(await asyncio.gather(*[self._launch() for _ in range(self.num_browsers)]))
+            logger.info(f"✅ Browser pool started: {self.num_browsers} browser(s) x "
+                        f"{self.contexts_per_browser} contexts x {self.pages_per_context} pages")
+            return
+
+        await self.health_check()
+
+    async def health_check(self) -> int:
+        """Relaunch disconnected browsers; returns how many were replaced"""
+        relaunched = 0
+        for i, pooled in enumerate(self._browsers):
+            if pooled.browser.is_connected():
+                continue
+            logger.warning(f"💥 Browser {i} disconnected, relaunching")
+            self._browsers[i] = await self._launch()
+            self.stats["browsers_relaunched"] += 1
+            relaunched += 1
+        return relaunched
+
+    async def close(self):
+        """Close every page, context and browser (call on shutdown)"""
+        async with self._lock:
+            for pooled in self._browsers:
+                try:
+                    await pooled.browser.close()
+                except Exception:
+                    pass
+            self._browsers = []
+            self._crashed.clear()
+
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+
+        logger.info("🧹 Browser pool closed")
+
+    # ========================================================================
+    # CHECKOUT / CHECKIN
+    # ========================================================================
+
+    async def _pick_context(self, stealth_mode: bool) -> PooledContext:
+        """Context with a free page slot: warm page first, then least loaded"""
+        candidates = [
+            (pooled, ctx)
+            for pooled in self._browsers
+            for ctx in pooled.live_contexts()
+            if ctx.in_use < self.pages_per_context
+        ]
+
+        warm = [c for c in candidates if c[1].idle[stealth_mode]]
+        if warm:
+            return min(warm, key=lambda c: c[1].in_use)[1]
+
+        # Room for another context? Spread across browsers first
+        growable = [p for p in self._browsers if len(p.live_contexts()) < self.contexts_per_browser]
+        if growable:
+            pooled = min(growable, key=lambda p: len(p.live_contexts()))
+            ctx = PooledContext(context=await pooled.browser.new_context(**self.context_options))
+            pooled.contexts.append(ctx)
+            return ctx
+
+        if candidates:
+            return min(candidates, key=lambda c: c[1].in_use)[1]
+
+        raise RuntimeError("Browser pool exhausted")
+
+    async def _checkout(self, stealth_mode: bool):
+        async with self._lock:
+            await self._ensure_started()
+            ctx = await self._pick_context(stealth_mode)
+            ctx.in_use += 1
+
+        idle = ctx.idle[stealth_mode]
+        while idle:
+            page = idle.pop()
+            if not page.is_closed() and page not in self._crashed:
+                self.stats["pages_reused"] += 1
+                return ctx, page
+
+        try:
+            page = await self.page_factory(ctx.context, stealth_mode)
+        except BaseException:
+            ctx.in_use -= 1
+            raise
+
+        page.on("crash", lambda _: self._on_crash(page))
+        self.stats["pages_created"] += 1
+        return ctx, page
+
+    def _on_crash(self, page: Page):
+        self.stats["page_crashes"] += 1
+        self._crashed.add(page)
+
+    async def _reset_page(self, page: Page) -> bool:
+        """Make a used page safe to hand out again"""
+        if page.is_closed() or page in self._crashed:
+            return False
+        try:
+            await page.unroute("**/*")
+            await page.goto("about:blank", timeout=5000)
+            return True
+        except Exception:
+            return False
+
+    async def _checkin(self, ctx: PooledContext, page: Page, stealth_mode: bool):
+        ctx.in_use -= 1
+        ctx.uses += 1
+
+        if ctx.uses >= self.recycle_after:
+            ctx.retiring = True
+
+        keep = (
+            not ctx.retiring
+            and len(ctx.idle[stealth_mode]) < self.pages_per_context
+            and await self._reset_page(page)
+        )
+
+        if keep:
+            ctx.idle[stealth_mode].append(page)
+        else:
+            self._crashed.discard(page)
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+        if ctx.retiring and ctx.in_use == 0:
+            await self._retire(ctx)
+
+    async def _retire(self, ctx: PooledContext):
+        """Close a context that served recycle_after pages (frees renderer memory)"""
+        for pooled in self._browsers:
+            if ctx in pooled.contexts:
+                pooled.contexts.remove(ctx)
+        try:
+            await ctx.context.close()
+        except Exception:
+            pass
+        self.stats["contexts_recycled"] += 1
+        logger.info(f"♻️ Recycled browser context after {ctx.uses} pages")
+
+    @asynccontextmanager
+    async def page(self, stealth_mode: bool = False):
+        """Borrow a warm page for one navigation"""
+        await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        try:
+            ctx, page = await self._checkout(stealth_mode)
+            self.stats["pages_served"] += 1
+            try:
+                yield page
+            finally:
+                await self._checkin(ctx, page, stealth_mode)
+        finally:
+            self._slots.release()
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def get_stats(self) -> dict:
+        contexts = [ctx for pooled in self._browsers for ctx in pooled.contexts]
+        return {
+            **self.stats,
+            "capacity": self.capacity,
+            "browsers": len(self._browsers),
+            "browsers_connected": sum(1 for p in self._browsers if p.browser.is_connected()),
+            "contexts": len(contexts),
+            "pages_in_use": sum(ctx.in_use for ctx in contexts),
+            "pages_idle": sum(ctx.idle_count() for ctx in contexts),
+        }
@@ -0,0 +1,228 @@
+"""
+Per-domain circuit breaker
+A domain that serves an unsolvable protection, or keeps failing, would
+otherwise cost a full render plus solve attempts for every remaining URL
+of a batch or crawl. After enough failures its circuit opens: fetches for
+the domain fail fast with CircuitOpenError (batch jobs defer them) until a
+cool-down passes. Then one probe request is let through (half-open); its
+outcome closes the circuit or reopens it for twice as long.
+"""
+
+import contextvars
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+
+from core.html_processing.host_scheduler import get_host_key
+from config.config import CIRCUIT_BREAKER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# (host, probe start) of the probe the current task is running: nested fetch
+# layers (batch -> fetch_html_js) pass the gate the outer layer opened
+_probe: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("circuit_probe", default=None)
+
+
+class CircuitOpenError(Exception):
+    """The domain's circuit is open: don't spend a fetch on it right now"""
+
+    def __init__(self, host: str, retry_after: float, reason: str = ""):
+        self.host = host
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"Circuit open for {host} ({reason or 'repeated failures'}), retry in {retry_after:.0f}s")
+
+
+@dataclass
+class CircuitState:
+    """Breaker state for one domain"""
+    state: str = CLOSED
+    failures: int = 0                   # Consecutive
+    opened_at: float = 0.0
+    open_for: float = 0.0               # Current cool-down (doubles on failed probes)
+    probe_started: Optional[float] = None
+    last_reason: str = ""
+    trips: int = 0
+    rejected: int = 0
+
+
+class DomainCircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures (at once
+    for unsolvable protections) -> half-open after the cool-down -> closed
+    on a successful probe
+
+    Usage:
+        breaker = get_circuit_breaker()
+        breaker.check(url)                 # Raises CircuitOpenError
+        try:
+            ...fetch...
+            breaker.record_success(url)  /  breaker.record_failure(url, "cf_turnstile_hard", fatal=True)
+        finally:
+            breaker.release_probe(url)     # Outcome neither: let the next request probe
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        open_seconds: float = 60.0,
+        max_open_seconds: float = 900.0,
+        probe_timeout: float = 120.0
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probe_timeout = probe_timeout
+        self._hosts: Dict[str, CircuitState] = {}
+
+    def _state(self, host: str) -> CircuitState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = CircuitState()
+        return state
+
+    # ========================================================================
+    # GATE
+    # ========================================================================
+
+    def check(self, url: str):
+        """Raise CircuitOpenError unless a request to url's domain may go out"""
+        if not CIRCUIT_BREAKER_CONFIG.get("enabled", True):
+            return
+
+        host = get_host_key(url)
+        state = self._hosts.get(host)
+        if state is None or state.state == CLOSED:
+            return
+        if state.state == HALF_OPEN and _probe.get() == (host, state.probe_started):
+            return
+
+        now = time.monotonic()
+        if state.state == OPEN:
+            remaining = state.opened_at + state.open_for - now
+            if remaining > 0:
+                state.rejected += 1
+                raise CircuitOpenError(host, remaining, state.last_reason)
+            state.state = HALF_OPEN
+            state.probe_started = None
+
+        # Half-open: one probe at a time (a probe that never reported is replaced)
+        if state.probe_started is not None and now - state.probe_started < self.probe_timeout:
+            state.rejected += 1
+            raise CircuitOpenError(host, self.probe_timeout - (now - state.probe_started), "probe in progress")
+
+        state.probe_started = now
+        _probe.set((host, now))
+        logger.info(f"🔌 {host}: half-open, sending a probe request")
+
+    # ========================================================================
+    # OUTCOMES
+    # ========================================================================
+
+    def record_success(self, url: str):
+        host = get_host_key(url)
+        state = self._hosts.get(host)
+        if state is None:
+            return
+        if state.state != CLOSED:
+            logger.info(f"✅ {host}: probe succeeded, circuit closed")
+        state.state = CLOSED
+        state.failures = 0
+        state.open_for = 0.0
+        state.probe_started = None
+
+    def release_probe(self, url: str):
+        """
+        End the current task's probe if no outcome settled it (e.g. a 404,
+        a non-HTML response, a cancelled fetch), so the next request to the
+        domain probes instead of waiting out probe_timeout
+        """
+        host = get_host_key(url)
+        probe = _probe.get()
+        if probe is None or probe[0] != host:
+            return
+        _probe.set(None)
+
+        state = self._hosts.get(host)
+        if state is not None and state.state == HALF_OPEN and state.probe_started == probe[1]:
+            state.probe_started = None
+            logger.debug(f"🔌 {host}: probe ended without an outcome, next request probes")
+
+    def record_failure(self, url: str, reason: str = "", fatal: bool = False):
+        """
+        A fetch to url's domain failed
+
+        fatal: no point retrying soon (unsolvable protection) - open at once.
+        """
+        host = get_host_key(url)
+        state = self._state(host)
+        state.failures += 1
+        state.last_reason = reason
+
+        if state.state == HALF_OPEN:
+            # Failed probe: back off twice as long
+            self._open(host, state, min(max(state.open_for, self.open_seconds) * 2, self.max_open_seconds))
+        elif state.state == CLOSED and (fatal or state.failures >= self.failure_threshold):
+            self._open(host, state, self.open_seconds)
+
+    def _open(self, host: str, state: CircuitState, open_for: float):
+        state.state = OPEN
+        state.opened_at = time.monotonic()
+        state.open_for = open_for
+        state.probe_started = None
+        state.trips += 1
+        logger.warning(f"⛔ {host}: circuit open for {open_for:.0f}s ({state.last_reason or 'repeated failures'})")
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def get_state(self, url: str) -> str:
+        state = self._hosts.get(get_host_key(url))
+        return state.state if state else CLOSED
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "open": sum(1 for s in self._hosts.values() if s.state == OPEN),
+            "half_open": sum(1 for s in self._hosts.values() if s.state == HALF_OPEN),
+            "hosts": {
+                host: {
+                    "state": state.state,
+                    "failures": state.failures,
+                    "trips": state.trips,
+                    "rejected": state.rejected,
+                    "reason": state.last_reason,
+                    "retry_in": round(max(0.0, state.opened_at + state.open_for - now), 1) if state.state == OPEN else 0.0
+                }
+                for host, state in self._hosts.items()
+                if state.state != CLOSED or state.trips
+            }
+        }
+
+
+# ============================================================================
+# GLOBAL BREAKER INSTANCE
+# ============================================================================
+
+_breaker: Optional[DomainCircuitBreaker] = None
+
+
+def get_circuit_breaker() -> DomainCircuitBreaker:
+    """Get or create the process-wide circuit breaker"""
+    global _breaker
+
+    if _breaker is None:
+        _breaker = DomainCircuitBreaker(
+            failure_threshold=CIRCUIT_BREAKER_CONFIG.get("failure_threshold", 5),
+            open_seconds=CIRCUIT_BREAKER_CONFIG.get("open_seconds", 60.0),
+            max_open_seconds=CIRCUIT_BREAKER_CONFIG.get("max_open_seconds", 900.0),
+            probe_timeout=CIRCUIT_BREAKER_CONFIG.get("probe_timeout", 120.0)
+        )
+
+    return _breaker
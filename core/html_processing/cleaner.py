@@ -1,10 +1,13 @@
-from typing import Dict
-from bs4 import BeautifulSoup
+from typing import Dict, Union
+from bs4 import BeautifulSoup, Tag
+from core.html_processing.parsed_document import ParsedDocument, as_document
 
-def clean_html_for_extraction(html: str) -> str:
+def clean_html_for_extraction(html: Union[str, ParsedDocument]) -> str:
     """Remove scripts, styles, navigation, and focus on main content"""
-    
-    soup = BeautifulSoup(html, 'html.parser')
+    return as_document(html).cleaned_html
+
+def clean_soup(soup: BeautifulSoup) -> Tag:
+    """Prune a (private) tree down to its main content; returns the content element"""
     
     # Step 1: Remove non-content tags completely
     for tag in soup(['script', 'style', 'noscript', 'iframe', 'svg', 'path']):
@@ -46,12 +49,12 @@ def clean_html_for_extraction(html: str) -> str:
         for element in main_content.find_all(class_=lambda x: x and 'related-posts' in str(x).lower()):
             element.decompose()
     
-    return str(main_content)
+    return main_content
 
-def extract_article_structure(html: str) -> str:
+def extract_article_structure(html: Union[str, ParsedDocument]) -> str:
     """Extract article content in a cleaner format for LLM"""
     
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = as_document(html).soup
     
     # DEBUG: See what elements we find
     all_headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
@@ -4,8 +4,11 @@ Optimized for Pakistani and global e-commerce sites
 """
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
+from core.html_processing.hydration import parse_hydration_state
+from core.html_processing.page_signals import register_patterns, get_page_signals
+from core.html_processing.js_classifier import get_needs_js_classifier
 
 
 # Domain-specific rules (Pakistan + Global)
@@ -45,158 +48,186 @@ def get_domain_info(url: str) -> Tuple[str, Dict]:
     return domain, {}
 
 
+# ============================================================================
+# PAGE SIGNALS (scanned once per page, see page_signals.py)
+# ============================================================================
+
+# ✅ JS framework signatures (first framework with a match wins)
+FRAMEWORK_SIGNATURES = {
+    "Next.js": [
+        'id="__next"',
+        '__NEXT_DATA__',
+        '/_next/static/',
+        'next-route-announcer'
+    ],
+    "React": [
+        'data-reactroot',
+        'data-react-helmet',
+        'react-dom',
+        'ReactDOM'
+    ],
+    "Vue": [
+        'data-vue-ssr',
+        '__NUXT__',
+        'data-v-',
+        'vue-router'
+    ],
+    "Angular": [
+        'ng-version',
+        'ng-app',
+        'ng-controller',
+        '<app-root'  # ✅ NEW - Angular root element
+    ],
+    "Svelte": [
+        'data-svelte'
+    ],
+}
+
+# ✅ NEW: Cookie/JavaScript requirement errors
+COOKIE_ERROR_SIGNS = [
+    'Cookies are disabled',
+    'Enable JavaScript and cookies',
+    'Please enable cookies',
+    'Cookie support is required',
+    'JavaScript is required',
+    'Please enable JavaScript'
+]
+
+# ✅ IMPROVED: Placeholder/skeleton HTML
+PLACEHOLDER_SIGNS = [
+    '<div id="root"></div>',
+    '<div id="app"></div>',
+    '<div id="__next"></div>',
+    '<div id="__nuxt"></div>',
+    '<app-root></app-root>',  # ✅ NEW - Empty Angular root
+    '<app-root><div',  # ✅ NEW - Angular with loading screen
+    'class="skeleton',
+    'class="loading',
+    'class="loader',  # ✅ NEW
+    'home-loader-screen',  # ✅ NEW - Unstop specific
+    'Loading...',
+    'Please wait',
+    'Please Wait'
+]
+
+# REAL content indicators (each worth 3 points, matched case-insensitively)
+STRONG_CONTENT_INDICATORS = [
+    '<article',
+    '<main',
+    'itemprop="name"',
+    'itemprop="description"',
+    'schema.org/Product',
+    'schema.org/Article',
+    '<table',  # Data tables usually mean real content
+    'class="product-detail',
+    'class="item-detail',
+    'class="post-content',
+    'class="article-body'
+]
+
+# Weak indicators (each worth 1 point)
+WEAK_CONTENT_INDICATORS = [
+    'class="content"',
+    'class="product',
+    'class="item"',
+    'class="listing"',
+    'class="card"',
+    '<h1',
+    '<h2',
+    '<p'
+]
+
+# ✅ NEW: Loading/error content (subtracts from the content score)
+LOADING_INDICATORS = [
+    'Please Wait',
+    'Loading...',
+    'Cookies are disabled',
+    'class="loader',
+    'class="loading'
+]
+
+# Bot protection
+PROTECTION_SIGNS = [
+    "cf-browser-verification",
+    "Just a moment",
+    "Checking your browser",
+    "DDoS protection",
+    "Verifying you are human",
+    "Please wait while we verify"
+]
+
+# Signs that stealth mode is needed (case-insensitive)
+BOT_DETECTION_SIGNS = [
+    "cloudflare", "imperva", "datadome",
+    "recaptcha", "hcaptcha", "turnstile"
+]
+
+register_patterns(["<script"])
+register_patterns([sig for sigs in FRAMEWORK_SIGNATURES.values() for sig in sigs], case_sensitive=True)
+register_patterns(COOKIE_ERROR_SIGNS + PLACEHOLDER_SIGNS + LOADING_INDICATORS + PROTECTION_SIGNS, case_sensitive=True)
+register_patterns(STRONG_CONTENT_INDICATORS + WEAK_CONTENT_INDICATORS + BOT_DETECTION_SIGNS)
+
+
 def analyze_html_structure(html: str) -> Dict[str, any]:
     """
     ✅ IMPROVED: Better framework and content detection
     Ignores loading screens and error messages
     """
+    signals = get_page_signals(html)
+    
     metrics = {
-        "length": len(html),
-        "script_count": html.count("<script"),
+        "length": signals.length,
+        "script_count": signals.count("<script"),
         "has_frameworks": False,
         "has_content": False,
         "text_ratio": 0.0,
         "has_protection": False,
         "framework_type": None,
         "is_placeholder": False,
-        "has_cookie_error": False  # ✅ NEW
+        "has_cookie_error": False,  # ✅ NEW
+        "hydration_state": None,    # __NEXT_DATA__ / __NUXT__ / ... found in the HTML
+        "hydration_rich": False     # ...and it carries the page's content
     }
     
     # ✅ Check for JS frameworks
-    frameworks = {
-        "Next.js": [
-            'id="__next"',
-            '__NEXT_DATA__',
-            '/_next/static/',
-            'next-route-announcer'
-        ],
-        "React": [
-            'data-reactroot',
-            'data-react-helmet',
-            'react-dom',
-            'ReactDOM'
-        ],
-        "Vue": [
-            'data-vue-ssr',
-            '__NUXT__',
-            'data-v-',
-            'vue-router'
-        ],
-        "Angular": [
-            'ng-version',
-            'ng-app',
-            'ng-controller',
-            '<app-root'  # ✅ NEW - Angular root element
-        ],
-        "Svelte": [
-            'data-svelte'
-        ],
-    }
-    
-    for framework, signatures in frameworks.items():
-        if any(sig in html for sig in signatures):
+    for framework, signatures in FRAMEWORK_SIGNATURES.items():
+        if signals.any(signatures, case_sensitive=True):
             metrics["has_frameworks"] = True
             metrics["framework_type"] = framework
             break
     
+    # ✅ NEW: SSR frameworks often ship the whole page's data as JSON
+    hydration = parse_hydration_state(html)
+    if hydration:
+        metrics["hydration_state"] = hydration["source"]
+        metrics["hydration_rich"] = hydration["rich"]
+    
     # ✅ NEW: Check for cookie/JavaScript requirement errors
-    cookie_error_signs = [
-        'Cookies are disabled',
-        'Enable JavaScript and cookies',
-        'Please enable cookies',
-        'Cookie support is required',
-        'JavaScript is required',
-        'Please enable JavaScript'
-    ]
-    metrics["has_cookie_error"] = any(sign in html for sign in cookie_error_signs)
+    metrics["has_cookie_error"] = signals.any(COOKIE_ERROR_SIGNS, case_sensitive=True)
     
     # ✅ IMPROVED: Check for placeholder/skeleton HTML
-    placeholder_signs = [
-        '',
-        '',
-        '',
-        '',
-        '',  # ✅ NEW - Empty Angular root
-        '<div',  # ✅ NEW - Angular with loading screen
-        'class="skeleton',
-        'class="loading',
-        'class="loader',  # ✅ NEW
-        'home-loader-screen',  # ✅ NEW - Unstop specific
-        'Loading...',
-        'Please wait',
-        'Please Wait'
-    ]
-    metrics["is_placeholder"] = any(sign in html for sign in placeholder_signs)
+    metrics["is_placeholder"] = signals.any(PLACEHOLDER_SIGNS, case_sensitive=True)
     
     # ✅ IMPROVED: Better content detection (excludes loading/error screens)
-    # First, check for REAL content indicators
-    strong_content_indicators = [
-        '<article',
-        '<main',
-        'itemprop="name"',
-        'itemprop="description"',
-        'schema.org/Product',
-        'schema.org/Article',
-        '<table',  # Data tables usually mean real content
-        'class="product-detail',
-        'class="item-detail',
-        'class="post-content',
-        'class="article-body'
-    ]
-    
-    weak_content_indicators = [
-        'class="content"',
-        'class="product',
-        'class="item"',
-        'class="listing"',
-        'class="card"',
-        '<h1',
-        '<h2',
-        '<p'
-    ]
-    
-    # Count strong indicators (each worth 3 points)
-    strong_count = sum(3 for indicator in strong_content_indicators if indicator in html.lower())
-    
-    # Count weak indicators (each worth 1 point)
-    weak_count = sum(1 for indicator in weak_content_indicators if indicator in html.lower())
-    
+    strong_count = 3 * signals.matched(STRONG_CONTENT_INDICATORS)
+    weak_count = signals.matched(WEAK_CONTENT_INDICATORS)
     total_score = strong_count + weak_count
     
     # ✅ NEW: Subtract points for loading/error content
-    loading_indicators = [
-        'Please Wait',
-        'Loading...',
-        'Cookies are disabled',
-        'class="loader',
-        'class="loading'
-    ]
-    loading_count = sum(1 for indicator in loading_indicators if indicator in html)
+    loading_count = signals.matched(LOADING_INDICATORS, case_sensitive=True)
     
     # Need at least 5 points AND no loading indicators
     metrics["has_content"] = (total_score >= 5) and (loading_count == 0)
     
     # Calculate text ratio (text vs tags)
-    import re
-    text_content = re.sub(r']+>', '', html)
-    if len(html) > 0:
-        metrics["text_ratio"] = len(text_content.strip()) / len(html)
+    metrics["text_ratio"] = signals.text_ratio
     
     # Check for bot protection
-    protection_signs = [
-        "cf-browser-verification",
-        "Just a moment",
-        "Checking your browser",
-        "DDoS protection",
-        "Verifying you are human",
-        "Please wait while we verify"
-    ]
-    
-    metrics["has_protection"] = any(sign in html for sign in protection_signs)
+    metrics["has_protection"] = signals.any(PROTECTION_SIGNS, case_sensitive=True)
     
     return metrics
 
-def needs_js(html: str, url: str) -> bool:
+def needs_js(html: str, url: str, metrics: Optional[Dict[str, any]] = None) -> bool:
     """
     ✅ FIXED: Proper decision logic with correct order
     
@@ -208,8 +239,9 @@ def needs_js(html: str, url: str) -> bool:
     # Get domain-specific rules
     domain, domain_config = get_domain_info(url)
     
-    # Analyze HTML structure
-    metrics = analyze_html_structure(html)
+    # Analyze HTML structure (unless the caller already did)
+    if metrics is None:
+        metrics = analyze_html_structure(html)
     
     # ========================================================================
     # DECISION TREE - ORDER IS CRITICAL!
@@ -220,6 +252,11 @@ def needs_js(html: str, url: str) -> bool:
         print(f"🔒 Bot protection detected → JS needed")
         return True
     
+    # 1b. Data embedded as hydration JSON: extraction reads it, no browser needed
+    if metrics["hydration_rich"]:
+        print(f"💧 {metrics['hydration_state']} carries the page data → static HTML sufficient")
+        return False
+    
     # 2. ✅ CRITICAL: Check domain-specific rules FIRST (before other checks)
     if domain_config:
         threshold = domain_config.get("threshold", 5000)
@@ -232,6 +269,13 @@ def needs_js(html: str, url: str) -> bool:
         print(f"📦 Placeholder HTML detected → JS needed")
         return True
     
+    # 3b. Trained model (when present) replaces the hand-tuned thresholds below
+    classifier = get_needs_js_classifier()
+    if classifier:
+        render, probability = classifier.predict(metrics)
+        print(f"🤖 Model: P(render helps) = {probability:.2f} → {'JS needed' if render else 'static HTML sufficient'}")
+        return render
+    
     # 4. Very short HTML = placeholder page
     if metrics["length"] < 1000:
         print(f"📏 HTML too short ({metrics['length']} chars) → JS needed")
@@ -261,7 +305,7 @@ def needs_js(html: str, url: str) -> bool:
     return False
 
 
-def get_wait_time(url: str, html: str) -> float:
+def get_wait_time(url: str, html: str, metrics: Optional[Dict[str, any]] = None) -> float:
     """
     Determine optimal wait time for lazy-loaded content
     
@@ -274,8 +318,9 @@ def get_wait_time(url: str, html: str) -> float:
     if domain_config and "wait_time" in domain_config:
         return domain_config["wait_time"]
     
-    # Analyze HTML for indicators
-    metrics = analyze_html_structure(html)
+    # Analyze HTML for indicators (unless the caller already did)
+    if metrics is None:
+        metrics = analyze_html_structure(html)
     
     # Framework-specific wait times
     if metrics["framework_type"]:
@@ -300,13 +345,7 @@ def should_use_stealth(url: str, html: str) -> bool:
     """
     
     # Check for bot detection signs
-    bot_detection_signs = [
-        "cloudflare", "imperva", "datadome",
-        "recaptcha", "hcaptcha", "turnstile"
-    ]
-    
-    html_lower = html.lower()
-    if any(sign in html_lower for sign in bot_detection_signs):
+    if get_page_signals(html).any(BOT_DETECTION_SIGNS):
         return True
     
     # Known protected domains
@@ -333,8 +372,8 @@ def get_rendering_strategy(url: str, html: str) -> Dict[str, any]:
     metrics = analyze_html_structure(html)
     
     strategy = {
-        "needs_js": needs_js(html, url),
-        "wait_time": get_wait_time(url, html),
+        "needs_js": needs_js(html, url, metrics),
+        "wait_time": get_wait_time(url, html, metrics),
         "stealth_mode": should_use_stealth(url, html),
         "block_resources": True,  # Always block for speed
         "use_cache": True,        # Always cache for efficiency
@@ -373,6 +412,7 @@ def explain_decision(url: str, html: str) -> str:
   - Has Content: {strategy['metrics']['has_content']}
   - Text Ratio: {strategy['metrics']['text_ratio']:.2%}
   - Protection: {strategy['metrics']['has_protection']}
+  - Hydration State: {strategy['metrics']['hydration_state'] or 'None'}{' (rich)' if strategy['metrics']['hydration_rich'] else ''}
 
 🎯 Decision:
   - Needs JS: {'✅ YES' if strategy['needs_js'] else '❌ NO'}
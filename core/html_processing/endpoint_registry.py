@@ -0,0 +1,258 @@
+"""
+Learned API endpoint replay
+Renders with capture_json show which XHR endpoint a page's listing data
+comes from. Once that endpoint has been seen on repeated renders and its
+data has extracted successfully, later fetches of the page (and its next
+pages) call the endpoint directly over httpx - no browser.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl
+import logging
+
+from core.html_processing.http_client import get_http_client
+from core.html_processing.json_capture import count_records
+from config.config import ENDPOINT_REPLAY_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Endpoint params that paginate, and which of them count items instead of pages
+PAGE_PARAMS = {"page", "p", "pg", "pagenum", "pagenumber", "pageindex", "currentpage",
+               "offset", "start", "from", "skip"}
+OFFSET_PARAMS = {"offset", "start", "from", "skip"}
+
+# Request headers worth replaying (never cookies / auth)
+_REPLAY_HEADERS = {"accept", "accept-language", "content-type", "x-requested-with"}
+_SKIP_HEADERS = {"x-csrf-token", "x-xsrf-token"}
+
+_PAGE_SUFFIX = re.compile(r"/(page|p|pg)/(\d+)/?$", re.IGNORECASE)
+
+
+@dataclass
+class EndpointTemplate:
+    """How a page fetches its listing data"""
+    method: str
+    endpoint: str                                 # scheme://host/path of the API
+    params: Dict[str, str]                        # Query (GET) or top-level JSON body fields (POST)
+    headers: Dict[str, str]
+    page_params: Dict[str, str] = field(default_factory=dict)  # Endpoint param -> page URL param
+    page_param: Optional[str] = None              # Endpoint param that paginates
+    page_value: int = 1                           # Its value on the observed page
+    page_size: int = 0                            # Records per response
+    observations: int = 1
+    extractions: int = 0
+    replays: int = 0
+    failures: int = 0                             # Consecutive
+
+
+def page_key(url: str) -> str:
+    """Pages sharing a listing endpoint: same host + path, page number / query ignored"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    path = _PAGE_SUFFIX.sub("", parts.path).rstrip("/") or "/"
+    return f"{host}{path}"
+
+
+def page_number_of(url: str) -> Optional[int]:
+    """Page number in a /page/N path suffix (the part page_key() ignores), if any"""
+    match = _PAGE_SUFFIX.search(urlsplit(url).path)
+    return int(match.group(2)) if match else None
+
+
+def _endpoint_of(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def _request_params(method: str, url: str, post_data: Optional[str]) -> Optional[Dict[str, str]]:
+    if method == "GET":
+        return dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+    try:
+        body = json.loads(post_data or "")
+    except ValueError:
+        return None  # Form / binary bodies aren't templated
+    return body if isinstance(body, dict) else None
+
+
+class EndpointRegistry:
+    """Per-page-key endpoint templates learned from renders"""
+
+    def __init__(self, min_observations: int = 2, max_failures: int = 3, timeout: float = 15.0):
+        self.min_observations = min_observations
+        self.max_failures = max_failures
+        self.timeout = timeout
+        self._templates: Dict[str, EndpointTemplate] = {}
+        self.stats = {"learned": 0, "replays": 0, "replay_failures": 0}
+
+    # ========================================================================
+    # LEARNING
+    # ========================================================================
+
+    def observe(self, page_url: str, payloads: List[dict]):
+        """Record the endpoint behind a render's biggest captured payload"""
+        candidates = [p for p in payloads if p.get("request")]
+        if not candidates:
+            return
+
+        best = max(candidates, key=lambda p: count_records(p["data"]))
+        request = best["request"]
+        method = request.get("method", "GET").upper()
+        params = _request_params(method, best["url"], request.get("post_data"))
+        if params is None or method not in ("GET", "POST"):
+            return
+
+        endpoint = _endpoint_of(best["url"])
+        key = page_key(page_url)
+        existing = self._templates.get(key)
+
+        if existing and existing.endpoint == endpoint and existing.method == method:
+            existing.observations += 1
+            existing.failures = 0
+            return
+
+        page_query = dict(parse_qsl(urlsplit(page_url).query))
+        template = EndpointTemplate(
+            method=method,
+            endpoint=endpoint,
+            params=params,
+            headers={
+                k: v for k, v in request.get("headers", {}).items()
+                if (k.lower() in _REPLAY_HEADERS or k.lower().startswith("x-")) and k.lower() not in _SKIP_HEADERS
+            },
+            # Endpoint params carrying the page URL's values (search terms, category ids, ...)
+            page_params={
+                ep: pq for ep, value in params.items() for pq, page_value in page_query.items()
+                if isinstance(value, (str, int)) and str(value) == page_value
+            },
+            page_size=count_records(best["data"])
+        )
+
+        for name, value in params.items():
+            if name.lower() in PAGE_PARAMS and str(value).isdigit():
+                template.page_param, template.page_value = name, int(value)
+                break
+
+        self._templates[key] = template
+        self.stats["learned"] += 1
+        logger.info(f"📡 Learned endpoint for {key}: {method} {endpoint}")
+
+    def mark_extracted(self, endpoint_url: str):
+        """Extraction got the requested fields out of this endpoint's data"""
+        endpoint = _endpoint_of(endpoint_url)
+        for template in self._templates.values():
+            if template.endpoint == endpoint:
+                template.extractions += 1
+
+    # ========================================================================
+    # REPLAY
+    # ========================================================================
+
+    def get_template(self, page_url: str) -> Optional[EndpointTemplate]:
+        """Template trusted enough to replay, if any"""
+        template = self._templates.get(page_key(page_url))
+        if template and template.observations >= self.min_observations and template.extractions > 0:
+            return template
+        return None
+
+    def _build_params(self, template: EndpointTemplate, page_url: str, page_number: Optional[int]) -> dict:
+        params = dict(template.params)
+        page_query = dict(parse_qsl(urlsplit(page_url).query))
+
+        for ep, pq in template.page_params.items():
+            if pq in page_query:
+                params[ep] = page_query[pq]
+
+        # Page number not carried over from the URL's query: derive it
+        mapped = template.page_params.get(template.page_param)
+        if page_number and template.page_param and (mapped is None or mapped not in page_query):
+            base = template.page_value if template.page_value in (0, 1) else 1
+            if template.page_param.lower() in OFFSET_PARAMS:
+                value = base + (page_number - 1) * template.page_size
+            else:
+                value = base + page_number - 1
+            params[template.page_param] = value if isinstance(template.params[template.page_param], int) else str(value)
+
+        return params
+
+    async def replay(self, page_url: str, page_number: Optional[int] = None) -> Optional[List[dict]]:
+        """
+        Fetch a page's data straight from its learned endpoint
+
+        page_number defaults to the URL's /page/N suffix. Returns
+        captured-payload-style dicts, or None (no template, no way to ask the
+        endpoint for that page, replay failed) so the caller falls back to
+        rendering.
+        """
+        template = self.get_template(page_url)
+        if template is None:
+            return None
+
+        if page_number is None:
+            page_number = page_number_of(page_url)
+        if page_number and page_number > 1 and not template.page_param:
+            # page_key() folds /page/N into the first page's key, but this endpoint has no page to set
+            logger.debug(f"📡 No page param to replay page {page_number} of {page_key(page_url)}, rendering")
+            return None
+
+        params = self._build_params(template, page_url, page_number)
+        headers = {**template.headers, "Referer": page_url}
+        client = await get_http_client()
+
+        try:
+            if template.method == "GET":
+                response = await client.get(template.endpoint, params=params, headers=headers, timeout=self.timeout)
+            else:
+                response = await client.post(template.endpoint, json=params, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            if count_records(data) == 0:
+                raise ValueError("no records in response")
+        except Exception as e:
+            template.failures += 1
+            self.stats["replay_failures"] += 1
+            logger.warning(f"⚠️ Endpoint replay failed for {page_url} ({e}), rendering instead")
+            if template.failures >= self.max_failures:
+                self._templates.pop(page_key(page_url), None)
+                logger.warning(f"🗑️ Dropped endpoint template for {page_key(page_url)}")
+            return None
+
+        template.failures = 0
+        template.replays += 1
+        self.stats["replays"] += 1
+        logger.info(f"🔁 Replayed {template.method} {template.endpoint} for {page_url} (no browser)")
+        return [{"url": str(response.url), "data": data}]
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "templates": len(self._templates),
+            "replayable": sum(
+                1 for t in self._templates.values()
+                if t.observations >= self.min_observations and t.extractions > 0
+            )
+        }
+
+
+# ============================================================================
+# GLOBAL REGISTRY INSTANCE
+# ============================================================================
+
+_registry: Optional[EndpointRegistry] = None
+
+
+def get_endpoint_registry() -> EndpointRegistry:
+    """Get or create the global endpoint registry"""
+    global _registry
+
+    if _registry is None:
+        _registry = EndpointRegistry(
+            min_observations=ENDPOINT_REPLAY_CONFIG.get("min_observations", 2),
+            max_failures=ENDPOINT_REPLAY_CONFIG.get("max_failures", 3),
+            timeout=ENDPOINT_REPLAY_CONFIG.get("timeout", 15.0)
+        )
+
+    return _registry
@@ -2,120 +2,270 @@
 HTML fetching with intelligent caching and JS rendering
 Main entry point for fetching web pages
 """
+from typing import Optional
 import httpx
 from fastapi import HTTPException
 from core.html_processing.detector import get_rendering_strategy
 from core.html_processing.renderer import fetch_html_js
-from storage.cache_manager import get_cached_html, cache_rendered_html
+from core.html_processing.http_client import fetch_static_html
+from core.html_processing.host_scheduler import get_host_scheduler
+from core.html_processing.single_flight import SingleFlight
+from storage.cache_manager import get_cached_html, cache_rendered_html, refresh_cached_html, cache_json_payloads, get_captured_json
+from core.html_processing.endpoint_registry import get_endpoint_registry, page_number_of
+from core.html_processing.render_decisions import get_render_decisions
+from core.html_processing.js_classifier import log_render_outcome
+from core.html_processing.circuit_breaker import get_circuit_breaker, CircuitOpenError
 from storage.analytics_db import track_cache_hit, track_cache_miss
 from config.settings import DEFAULT_HEADERS
+from config.config import JSON_CAPTURE_CONFIG, ENDPOINT_REPLAY_CONFIG
 from storage.analytics_db import analytics_db
 
+# Concurrent fetch_html calls for one URL share a single fetch/render
+_fetch_flight = SingleFlight("fetch")
+
 # HTML Fetching
-async def fetch_html(url: str) -> str:
+async def fetch_html(url: str, meta_only: bool = False) -> str:
     """
     Fetch HTML with intelligent caching and JS rendering
     
     Flow:
     1. Check cache first (instant if cached)
-    2. Try static HTML
-    3. Check if JS needed (detector.py)
+    2. Try static HTML (conditional GET if a stale copy has validators),
+       unless similar URLs are known to need rendering (render_decisions.py)
+    3. Check if JS needed (detector.py + learned decisions)
     4. Render with Playwright if needed (utils_js_renderer.py)
     5. Cache the result (cache_manager.py)
+    
+    meta_only: stop reading at </head> (title/meta/OG tags only, not cached)
     """
     
-    # Step 1: Check cache first
-    cached = await get_cached_html(url)
-    if cached:
+    # Step 1: Check cache first (stale entries are kept for revalidation)
+    cached = await get_cached_html(url, allow_stale=True)
+    if cached and cached.get("has_payloads") and await get_captured_json(url) is None:
+        # A replayed page's shell without its data: fetch (and replay) again
+        cached = None
+    if cached and not cached.get("stale"):
         print(f"📦 Cache HIT: {url}")
         analytics_db["cache_hits"] += 1
         return cached["html"]
     
     analytics_db["cache_misses"] += 1
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
+    # Callers arriving while this URL is being fetched wait for that result
+    key = ("head" if meta_only else "full", url)
+    return await _fetch_flight.do(key, lambda: _fetch_politely(url, cached, meta_only))
+
+
+async def _fetch_politely(url: str, stale: Optional[dict], meta_only: bool) -> str:
+    """Per-domain politeness: shared with every other job hitting this host"""
+    breaker = get_circuit_breaker()
+    try:
+        breaker.check(url)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after) + 1)})
     
-    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        try:
-            # Step 2: Fetch static HTML first
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            
-            if response.encoding is None or response.encoding == 'ISO-8859-1':
-                response.encoding = 'utf-8'
-            
-            html_content = response.text.replace('\x00', '')
-            
-            print(f"📄 Static HTML: {len(html_content):,} chars from {url}")
-            
-            # Step 3: Get intelligent rendering strategy
-            strategy = get_rendering_strategy(url, html_content)
-            
-            print(f"🎯 Strategy: {strategy['reason']}")
+    try:
+        async with get_host_scheduler().slot(url):
+            if meta_only:
+                return await _fetch_head(url)
+            return await _fetch_and_render(url, stale=stale)
+    finally:
+        breaker.release_probe(url)
+
+
+async def _fetch_head(url: str) -> str:
+    """Read only up to </head> for meta-tag requests (no rendering, no caching)"""
+    try:
+        page = await fetch_static_html(url, stop_at_head=True)
+        print(f"🏷️ Head only: {len(page.html):,} chars from {url}")
+        return page.html
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"HTTP {e.response.status_code}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to fetch: {str(e)}")
+
+
+def _conditional_headers(stale: Optional[dict]) -> dict:
+    """If-None-Match / If-Modified-Since from a stale cache entry"""
+    headers = {}
+    if stale:
+        if stale.get("etag"):
+            headers["If-None-Match"] = stale["etag"]
+        if stale.get("last_modified"):
+            headers["If-Modified-Since"] = stale["last_modified"]
+    return headers
+
+
+async def _render_directly(url: str, decision: dict) -> Optional[str]:
+    """
+    Render without the static GET (similar URLs always needed rendering)
+    
+    Returns None if the render fails, so the caller takes the normal path.
+    """
+    wait_strategy = decision["wait_strategy"] or "smart"
+    print(f"🧠 Learned: {decision['scope']} needs rendering ({decision['confidence']:.0%}) → skipping static fetch")
+    
+    try:
+        rendered_html, final_url = await fetch_html_js(
+            url=url,
+            wait_time=decision["wait_time"] or 1.5,
+            timeout=45000,
+            block_resources=True,
+            use_cache=False,
+            stealth_mode=bool(decision["stealth_mode"]),
+            wait_strategy=wait_strategy,
+            capture_json=JSON_CAPTURE_CONFIG.get("enabled", True)
+        )
+    except Exception as e:
+        print(f"⚠️ Direct render failed: {e} → static fetch")
+        return None
+    
+    print(f"✅ Rendered: {len(rendered_html):,} chars")
+    analytics_db["strategies_used"]["playwright_renders"] += 1
+    analytics_db["strategies_used"]["learned_direct_renders"] = analytics_db["strategies_used"].get("learned_direct_renders", 0) + 1
+    
+    # Nothing to compare against: only the wait strategy's outcome is learned
+    get_render_decisions().record(url, None, wait_strategy)
+    await cache_rendered_html(url, rendered_html, final_url)
+    return rendered_html
+
+
+async def _fetch_and_render(url: str, stale: Optional[dict] = None) -> str:
+    """Static fetch, rendering decision and caching (cache miss path)"""
+    
+    decisions = get_render_decisions()
+    decision = decisions.decide(url)
+    
+    # Known render-only template: the static GET would be thrown away
+    # (not when a stale copy can be revalidated, or a learned endpoint can be replayed)
+    if (decision and decision["render"] and not _conditional_headers(stale)
+            and get_endpoint_registry().get_template(url) is None):
+        rendered_html = await _render_directly(url, decision)
+        if rendered_html is not None:
+            return rendered_html
+    
+    try:
+        # Step 2: Fetch static HTML first (streamed, size-capped)
+        response = await fetch_static_html(url, headers=_conditional_headers(stale))
+        
+        # 304: page unchanged, keep the cached result (no body, no re-analysis)
+        if response.status_code == 304 and stale:
+            print(f"♻️ Not modified, revalidated cache: {url}")
+            analytics_db["cache_revalidations"] += 1
+            await refresh_cached_html(url, stale)
+            return stale["html"]
+        
+        # Validators describe the static response: only cached with the static body
+        # (a 304 on an unchanged SPA shell says nothing about the data it loads)
+        validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        
+        html_content = response.html
+        
+        print(f"📄 Static HTML: {len(html_content):,} chars from {url}")
+        
+        # Step 3: Get intelligent rendering strategy
+        strategy = get_rendering_strategy(url, html_content)
+        
+        print(f"🎯 Strategy: {strategy['reason']}")
+        
+        needs_js = strategy['needs_js']
+        if needs_js and decision and not decision["render"]:
+            # Rendering never added content on similar URLs
+            print(f"🧠 Learned: rendering doesn't help on this {decision['scope']} ({decision['confidence']:.0%}) → static")
+            analytics_db["strategies_used"]["learned_static"] = analytics_db["strategies_used"].get("learned_static", 0) + 1
+            needs_js = False
+        
+        # Step 4: Decide if JS rendering needed
+        if needs_js and ENDPOINT_REPLAY_CONFIG.get("enabled", True):
+            # Learned data endpoint: fetch the data directly, skip the browser
+            payloads = await get_endpoint_registry().replay(url, page_number=page_number_of(url))
+            if payloads:
+                analytics_db["strategies_used"]["api_replays"] = analytics_db["strategies_used"].get("api_replays", 0) + 1
+                await cache_json_payloads(url, payloads)
+                # No validators: a 304 on the shell says nothing about the endpoint's data
+                await cache_rendered_html(url, html_content, url, has_payloads=True)
+                return html_content
+        
+        if needs_js:
+            wait_strategy = decisions.wait_strategy_for(url, strategy.get('wait_strategy', 'smart'))
+            print(f"⚡ JS Rendering (wait: {strategy['wait_time']}s, {wait_strategy}, stealth: {strategy['stealth_mode']})")
             
-            # Step 4: Decide if JS rendering needed
-            if strategy['needs_js']:
-                print(f"⚡ JS Rendering (wait: {strategy['wait_time']}s, stealth: {strategy['stealth_mode']})")
+            try:
+                rendered_html, final_url = await fetch_html_js(
+                    url=url,
+                    wait_time=strategy['wait_time'],
+                    timeout=45000,
+                    block_resources=strategy['block_resources'],
+                    use_cache=False,  # We handle caching here
+                    stealth_mode=strategy['stealth_mode'],
+                    wait_strategy=wait_strategy,
+                    capture_json=JSON_CAPTURE_CONFIG.get("enabled", True)
+                )
+                
+                print(f"✅ Rendered: {len(rendered_html):,} chars")
                 
-                try:
-                    rendered_html, final_url = await fetch_html_js(
-                        url=url,
-                        wait_time=strategy['wait_time'],
-                        timeout=45000,
-                        block_resources=strategy['block_resources'],
-                        use_cache=False,  # We handle caching here
-                        stealth_mode=strategy['stealth_mode'],
-                        wait_strategy=strategy.get('wait_strategy', 'smart')
-                    )
-                    
-                    print(f"✅ Rendered: {len(rendered_html):,} chars")
-                    
-                    analytics_db["strategies_used"]["playwright_renders"] += 1
-                    
-                    # Only use rendered if significantly better
-                    if len(rendered_html) > len(html_content) + 500:
-                        # Step 5: Cache the rendered result
-                        await cache_rendered_html(url, rendered_html, final_url)
-                        return rendered_html
-                    else:
-                        print("⚠️ Rendered not better, using static")
-                        await cache_rendered_html(url, html_content, url)
-                        return html_content
+                analytics_db["strategies_used"]["playwright_renders"] += 1
                 
-                except Exception as e:
-                    print(f"⚠️ Playwright failed: {e} → Using static HTML")
-                    analytics_db["strategies_used"]["playwright_failed"] = analytics_db["strategies_used"].get("playwright_failed", 0) + 1
-                    await cache_rendered_html(url, html_content, url)
+                # Only use rendered if significantly better
+                render_better = len(rendered_html) > len(html_content) + 500
+                decisions.record(url, render_better, wait_strategy, strategy['wait_time'], strategy['stealth_mode'])
+                await log_render_outcome(url, strategy['metrics'], render_better)
+                
+                if render_better:
+                    # Step 5: Cache the rendered result (no validators: expires, never revalidated)
+                    await cache_rendered_html(url, rendered_html, final_url)
+                    return rendered_html
+                else:
+                    print("⚠️ Rendered not better, using static")
+                    await cache_rendered_html(url, html_content, url, **validators)
                     return html_content
-            else:
-                print("✅ Static HTML sufficient")
-                # Cache static HTML too
-                await cache_rendered_html(url, html_content, url)
-                return html_content
             
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 403:
-                # Last resort: Try Playwright with stealth
-                print("🔒 403 error, trying stealth mode...")
-                try:
-                    rendered_html, _ = await fetch_html_js(
-                        url=url,
-                        wait_time=3.0,
-                        stealth_mode=True,
-                        block_resources=True
-                    )
-                    await cache_rendered_html(url, rendered_html, url)
-                    return rendered_html
-                except:
-                    raise HTTPException(status_code=403, detail="Access denied by website")
-            raise HTTPException(status_code=e.response.status_code, detail=f"HTTP {e.response.status_code}")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to fetch: {str(e)}")
+            except Exception as e:
+                print(f"⚠️ Playwright failed: {e} → Using static HTML")
+                analytics_db["strategies_used"]["playwright_failed"] = analytics_db["strategies_used"].get("playwright_failed", 0) + 1
+                await cache_rendered_html(url, html_content, url, **validators)
+                return html_content
+        else:
+            print("✅ Static HTML sufficient")
+            get_circuit_breaker().record_success(url)
+            # Cache static HTML too
+            await cache_rendered_html(url, html_content, url, **validators)
+            return html_content
         
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 429 or e.response.status_code >= 500:
+            get_circuit_breaker().record_failure(url, f"HTTP {e.response.status_code}")
+        elif e.response.status_code not in (401, 403):
+            # 404 and friends: the host answered, only this URL is bad
+            get_circuit_breaker().record_success(url)
+        if e.response.status_code == 403:
+            # Last resort: Try Playwright with stealth
+            print("🔒 403 error, trying stealth mode...")
+            try:
+                rendered_html, _ = await fetch_html_js(
+                    url=url,
+                    wait_time=3.0,
+                    stealth_mode=True,
+                    block_resources=True
+                )
+                await cache_rendered_html(url, rendered_html, url)
+                return rendered_html
+            except:
+                raise HTTPException(status_code=403, detail="Access denied by website")
+        raise HTTPException(status_code=e.response.status_code, detail=f"HTTP {e.response.status_code}")
+    except Exception as e:
+        if isinstance(e, httpx.TransportError):
+            get_circuit_breaker().record_failure(url, f"network: {type(e).__name__}")
+        raise HTTPException(status_code=400, detail=f"Failed to fetch: {str(e)}")
+    
+def get_fetch_flight_stats() -> dict:
+    """Coalescing statistics for fetch_html"""
+    return _fetch_flight.get_stats()
+
+
 def get_domain(url: str) -> str:
     """Extract domain from URL for caching"""
     from urllib.parse import urlparse
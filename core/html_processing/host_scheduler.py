@@ -0,0 +1,313 @@
+"""
+Per-host politeness scheduler
+One process-wide gate that every fetch path (static, render, crawl, pagination)
+goes through: a token bucket per domain plus a max in-flight cap per domain.
+Jobs hitting the same domain share its budget; different domains never wait
+on each other.
+
+Slower paces requested by jobs (crawler delay, robots.txt Crawl-delay) are
+leases: they last until the job releases them or their TTL runs out, and
+the strictest active one wins. Domains that have gone idle are forgotten.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+from config.config import POLITENESS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def get_host_key(url: str) -> str:
+    """Scheduling key for a URL: hostname without www. so both spellings share a budget"""
+    host = (urlparse(url).hostname or url).lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+@dataclass
+class HostState:
+    """Pacing state for one domain"""
+    interval: float                     # Seconds between request starts
+    burst: int                          # Requests allowed back-to-back
+    max_in_flight: int                  # Concurrent requests allowed
+    in_flight: int = 0
+    tat: float = 0.0                    # Theoretical arrival time (GCRA token bucket)
+    total_requests: int = 0
+    total_wait: float = 0.0
+    waiters: deque = field(default_factory=deque)
+    leases: Dict[Hashable, Tuple[float, Optional[float]]] = field(default_factory=dict)  # key -> (interval, expires)
+
+
+class HostScheduler:
+    """
+    Token bucket + in-flight limit per domain
+
+    Usage:
+        async with get_host_scheduler().slot(url):
+            response = await client.get(url)
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 2.0,
+        burst: int = 2,
+        max_in_flight: int = 4,
+        idle_seconds: float = 300.0
+    ):
+        self.default_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.default_burst = max(1, burst)
+        self.default_max_in_flight = max(1, max_in_flight)
+        self.idle_seconds = idle_seconds
+        self._hosts: Dict[str, HostState] = {}
+        self._lease_ids = itertools.count(1)
+        self._last_sweep = time.monotonic()
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            self._evict_idle()
+            state = HostState(
+                interval=self.default_interval,
+                burst=self.default_burst,
+                max_in_flight=self.default_max_in_flight
+            )
+            self._hosts[host] = state
+        return state
+
+    def _evict_idle(self):
+        """Forget domains with nothing running, queued, paced or leased for idle_seconds"""
+        now = time.monotonic()
+        if now - self._last_sweep < self.idle_seconds:
+            return
+        self._last_sweep = now
+
+        for host, state in list(self._hosts.items()):
+            self._refresh_interval(state, now)
+            if state.in_flight or state.waiters or state.leases:
+                continue
+            # tat is in the future while the host is paced or paused
+            if now - state.tat >= self.idle_seconds:
+                del self._hosts[host]
+
+    def _refresh_interval(self, state: HostState, now: float):
+        """Drop expired leases; the strictest remaining one (or the default) applies"""
+        expired = [key for key, (_, expires) in state.leases.items() if expires is not None and expires <= now]
+        for key in expired:
+            del state.leases[key]
+        state.interval = max([self.default_interval] + [seconds for seconds, _ in state.leases.values()])
+
+    # ========================================================================
+    # CONFIGURATION
+    # ========================================================================
+
+    def set_min_interval(
+        self,
+        url_or_host: str,
+        seconds: float,
+        ttl: Optional[float] = None,
+        key: Optional[Hashable] = None
+    ) -> Hashable:
+        """
+        Require at least `seconds` between requests to a domain
+        (crawler/pagination delay, robots.txt crawl-delay) until
+        release_min_interval(key) or, with a ttl, until it expires. The
+        strictest active setting wins so one job can't relax another job's
+        politeness. Setting an existing key again replaces it.
+
+        Returns the lease key.
+        """
+        host = get_host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        state = self._state(host)
+        key = key if key is not None else next(self._lease_ids)
+        now = time.monotonic()
+
+        previous = state.interval
+        state.leases[key] = (seconds, now + ttl if ttl is not None else None)
+        self._refresh_interval(state, now)
+        if state.interval > previous:
+            logger.info(f"🐢 {host}: min interval set to {state.interval:.2f}s")
+        return key
+
+    def release_min_interval(self, url_or_host: str, key: Hashable):
+        """End a set_min_interval lease (the job that set it is done)"""
+        host = get_host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        state = self._hosts.get(host)
+        if state is None or state.leases.pop(key, None) is None:
+            return
+        self._refresh_interval(state, time.monotonic())
+
+    @contextmanager
+    def min_interval(self, url_or_host: str, seconds: float):
+        """Hold a min interval for the duration of a job"""
+        key = self.set_min_interval(url_or_host, seconds)
+        try:
+            yield key
+        finally:
+            self.release_min_interval(url_or_host, key)
+
+    def set_max_in_flight(self, url_or_host: str, limit: int):
+        """Change how many requests may run at once against a domain"""
+        host = get_host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        state = self._state(host)
+        state.max_in_flight = max(1, limit)
+        self._wake(state)
+
+    def get_max_in_flight(self, url_or_host: str) -> int:
+        host = get_host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        state = self._hosts.get(host)
+        return state.max_in_flight if state else self.default_max_in_flight
+
+    def is_saturated(self, url_or_host: str) -> bool:
+        """All of the domain's slots are taken (or requests are queued for one)"""
+        host = get_host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        state = self._hosts.get(host)
+        return state is not None and (state.in_flight >= state.max_in_flight or bool(state.waiters))
+
+    def pause(self, url_or_host: str, seconds: float):
+        """Start no request to a domain for `seconds` (Retry-After / backoff)"""
+        host = get_host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        state = self._state(host)
+        # Push the bucket's next start time out, keeping the burst allowance from refilling it early
+        resume = time.monotonic() + seconds + (state.burst - 1) * state.interval
+        if resume > state.tat:
+            state.tat = resume
+            logger.info(f"⏸️ {host}: paused for {seconds:.1f}s")
+
+    # ========================================================================
+    # ACQUIRE / RELEASE
+    # ========================================================================
+
+    async def acquire(self, url: str) -> str:
+        """Wait for an in-flight slot and a rate token; returns the host key"""
+        host = get_host_key(url)
+        state = self._state(host)
+        started = time.monotonic()
+
+        while state.in_flight >= state.max_in_flight:
+            waiter = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                state.waiters.remove(waiter)
+                # We were handed a slot but won't use it: pass it on
+                if waiter.done() and not waiter.cancelled():
+                    self._wake(state)
+                raise
+            # Woken waiters stay queued until here, so nobody else takes the slot meanwhile
+            state.waiters.remove(waiter)
+        state.in_flight += 1
+
+        try:
+            # GCRA: reserve the next start time synchronously, then sleep until it
+            now = time.monotonic()
+            if state.leases:
+                self._refresh_interval(state, now)
+            tat = max(state.tat, now)
+            wait = tat - (state.burst - 1) * state.interval - now
+            state.tat = tat + state.interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self.release(host)
+            raise
+
+        state.total_requests += 1
+        state.total_wait += time.monotonic() - started
+        return host
+
+    def try_acquire(self, url: str) -> Optional[str]:
+        """Take a slot only if one is free and a rate token is available now; returns the host key or None"""
+        host = get_host_key(url)
+        state = self._state(host)
+        if state.in_flight >= state.max_in_flight or state.waiters:
+            return None
+
+        now = time.monotonic()
+        if state.leases:
+            self._refresh_interval(state, now)
+        tat = max(state.tat, now)
+        if tat - (state.burst - 1) * state.interval > now:
+            return None
+
+        state.tat = tat + state.interval
+        state.in_flight += 1
+        state.total_requests += 1
+        return host
+
+    def release(self, host: str):
+        """Free an in-flight slot"""
+        state = self._hosts.get(host)
+        if state is None:
+            return
+        state.in_flight = max(0, state.in_flight - 1)
+        self._wake(state)
+
+    def _wake(self, state: HostState):
+        """Wake as many waiters as there are free slots (they re-check on wake)"""
+        free = state.max_in_flight - state.in_flight
+        for waiter in state.waiters:
+            if free <= 0:
+                break
+            # Already-woken waiters that haven't run yet hold a claim on a slot too
+            if not waiter.done():
+                waiter.set_result(None)
+            free -= 1
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold a politeness slot for the duration of a fetch"""
+        host = await self.acquire(url)
+        try:
+            yield host
+        finally:
+            self.release(host)
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def get_stats(self) -> dict:
+        """Per-domain pacing statistics"""
+        return {
+            "domains": len(self._hosts),
+            "in_flight": sum(s.in_flight for s in self._hosts.values()),
+            "hosts": {
+                host: {
+                    "in_flight": state.in_flight,
+                    "max_in_flight": state.max_in_flight,
+                    "interval": round(state.interval, 3),
+                    "requests": state.total_requests,
+                    "avg_wait": round(state.total_wait / state.total_requests, 3) if state.total_requests else 0.0
+                }
+                for host, state in list(self._hosts.items())[:50]
+            }
+        }
+
+
+# ============================================================================
+# GLOBAL SCHEDULER INSTANCE
+# ============================================================================
+
+_scheduler: Optional[HostScheduler] = None
+
+
+def get_host_scheduler() -> HostScheduler:
+    """Get or create the process-wide scheduler"""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = HostScheduler(
+            requests_per_second=POLITENESS_CONFIG.get("requests_per_second", 2.0),
+            burst=POLITENESS_CONFIG.get("burst", 2),
+            max_in_flight=POLITENESS_CONFIG.get("max_in_flight_per_host", 4),
+            idle_seconds=POLITENESS_CONFIG.get("idle_host_seconds", 300.0)
+        )
+
+    return _scheduler
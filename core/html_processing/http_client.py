@@ -0,0 +1,334 @@
+"""
+Shared HTTP client for all static fetches
+One pooled httpx.AsyncClient per process: HTTP/2, keep-alive, per-host
+connection limits and DNS caching, so repeated hosts skip DNS/TCP/TLS setup
+"""
+import asyncio
+import re
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import httpx
+import httpcore
+import logging
+
+from config.config import HTTP_CLIENT_CONFIG
+from config.settings import DEFAULT_HEADERS
+from core.html_processing.page_signals import PageSignals, get_page_signals
+from core.html_processing.adaptive_concurrency import get_concurrency_controller, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.warning("⚠️ h2 not installed. Shared HTTP client will use HTTP/1.1 only.")
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_lock = asyncio.Lock()
+
+
+# ============================================================================
+# DNS CACHE
+# ============================================================================
+
+class DNSCachingBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that resolves each host once per TTL
+
+    TLS still uses the original hostname for SNI/verification, because
+    httpcore passes server_hostname separately when it starts TLS.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._backend = httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[str, float]] = {}
+
+    async def _resolve(self, host: str, port: int) -> str:
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._cache[key] = (address, time.monotonic() + self.ttl)
+        return address
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            address = await self._resolve(host, port)
+        except OSError:
+            # Let the real backend raise a proper httpcore.ConnectError
+            address = host
+        return await self._backend.connect_tcp(
+            address, port,
+            timeout=timeout,
+            local_address=local_address,
+            socket_options=socket_options
+        )
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    def clear(self):
+        self._cache.clear()
+
+
+# ============================================================================
+# PER-HOST CONNECTION LIMITS
+# ============================================================================
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees the host slot once the body is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Caps concurrent requests per host on top of the global pool limits"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self._max_per_host)
+        return self._semaphores[host]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        semaphore = self._semaphore(request.url.host)
+        await semaphore.acquire()
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# ============================================================================
+# STREAMED HTML READS
+# ============================================================================
+
+# End of <head> (or start of <body> when </head> is omitted)
+_HEAD_END = re.compile(rb"</head\s*>|<body[\s>]", re.IGNORECASE)
+
+# Content types that are never HTML: bail out before reading the body
+_BINARY_TYPES = ("image/", "audio/", "video/", "font/")
+_BINARY_APPLICATION_TYPES = {
+    "application/octet-stream", "application/pdf", "application/zip",
+    "application/gzip", "application/x-gzip", "application/x-tar",
+    "application/vnd.ms-excel", "application/msword",
+}
+
+
+@dataclass
+class StaticPage:
+    """Result of a streamed static fetch"""
+    url: str                 # Final URL after redirects
+    status_code: int
+    headers: httpx.Headers
+    html: str
+    truncated: bool = False  # Stopped early (size cap or end of <head>)
+
+    @property
+    def signals(self) -> PageSignals:
+        """Detector/protection signals, scanned once and shared with every module"""
+        return get_page_signals(self.html)
+
+
+def _is_binary(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    return content_type.startswith(_BINARY_TYPES) or content_type in _BINARY_APPLICATION_TYPES
+
+
+def _decode(body: bytes, charset: Optional[str]) -> str:
+    # Servers often send no charset or a bogus Latin-1 default
+    if not charset or charset.lower() in ("iso-8859-1", "latin-1"):
+        charset = "utf-8"
+    try:
+        html = body.decode(charset, errors="replace")
+    except LookupError:
+        html = body.decode("utf-8", errors="replace")
+    return html.replace("\x00", "") if "\x00" in html else html
+
+
+async def fetch_static_html(
+    url: str,
+    headers: Optional[dict] = None,
+    max_bytes: Optional[int] = None,
+    stop_at_head: bool = False,
+    raise_for_status: bool = True
+) -> StaticPage:
+    """
+    Stream a page through the shared client instead of buffering the whole body
+
+    Reading stops at `max_bytes` (HTTP_CLIENT_CONFIG["max_body_bytes"] by
+    default) and, with stop_at_head, as soon as </head> has arrived - enough
+    for title/meta/OG tags. Raises httpx.HTTPStatusError on 4xx/5xx (unless
+    raise_for_status=False: the error page is returned, e.g. a block page a
+    render may get past) and ValueError for binary content types.
+    Time to headers and the status feed the domain's adaptive concurrency.
+    """
+    client = await get_http_client()
+    max_bytes = max_bytes or HTTP_CLIENT_CONFIG.get("max_body_bytes", 5_000_000)
+    controller = get_concurrency_controller()
+    started = time.monotonic()
+
+    try:
+        async with client.stream("GET", url, headers=headers) as response:
+            controller.on_response(
+                url,
+                response.status_code,
+                time.monotonic() - started,
+                retry_after=parse_retry_after(response.headers.get("retry-after"))
+            )
+            # 304 before raise_for_status: httpx treats it as an error status
+            if response.status_code == 304:
+                return StaticPage(str(response.url), 304, response.headers, "")
+
+            if raise_for_status:
+                response.raise_for_status()
+
+            content_type = response.headers.get("content-type", "")
+            if _is_binary(content_type):
+                raise ValueError(f"Not an HTML page ({content_type})")
+
+            body = bytearray()
+            truncated = False
+
+            async for chunk in response.aiter_bytes():
+                scan_from = max(0, len(body) - 16)
+                body += chunk
+
+                if len(body) >= max_bytes:
+                    del body[max_bytes:]
+                    truncated = True
+                    logger.warning(f"✂️ Body capped at {max_bytes:,} bytes: {url}")
+                    break
+
+                if stop_at_head:
+                    match = _HEAD_END.search(body, scan_from)
+                    if match:
+                        del body[match.end():]
+                        truncated = True
+                        break
+
+            # Leaving the block early closes the stream, so the rest is never downloaded
+            return StaticPage(
+                url=str(response.url),
+                status_code=response.status_code,
+                headers=response.headers,
+                html=_decode(bytes(body), response.charset_encoding),
+                truncated=truncated
+            )
+    except httpx.TimeoutException:
+        controller.on_timing_anomaly(url, "timeout")
+        raise
+
+
+# ============================================================================
+# CLIENT LIFECYCLE
+# ============================================================================
+
+def _build_client() -> httpx.AsyncClient:
+    """Create the pooled client from HTTP_CLIENT_CONFIG"""
+    config = HTTP_CLIENT_CONFIG
+    http2 = config.get("http2", True) and HTTP2_AVAILABLE
+
+    limits = httpx.Limits(
+        max_connections=config.get("max_connections", 200),
+        max_keepalive_connections=config.get("max_keepalive_connections", 50),
+        keepalive_expiry=config.get("keepalive_expiry", 30.0),
+    )
+
+    transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits, retries=0)
+
+    # httpx doesn't expose the network backend, so swap it on the pool
+    pool = getattr(transport, "_pool", None)
+    if pool is not None and hasattr(pool, "_network_backend"):
+        pool._network_backend = DNSCachingBackend(ttl=config.get("dns_cache_ttl", 300))
+    else:
+        logger.warning("⚠️ Could not install DNS cache on httpx transport")
+
+    timeout = httpx.Timeout(
+        config.get("timeout", 30.0),
+        connect=config.get("connect_timeout", 10.0),
+    )
+
+    return httpx.AsyncClient(
+        transport=HostLimitedTransport(transport, config.get("max_connections_per_host", 6)),
+        timeout=timeout,
+        headers=DEFAULT_HEADERS,
+        follow_redirects=True,
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Create the shared client (call on startup)"""
+    global _client
+
+    async with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = _build_client()
+            logger.info(f"✅ HTTP client pool initialized (HTTP/2: {HTTP_CLIENT_CONFIG.get('http2', True) and HTTP2_AVAILABLE})")
+
+    return _client
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client, creating it lazily outside the API lifespan (CLI, scripts)"""
+    if _client is None or _client.is_closed:
+        return await init_http_client()
+    return _client
+
+
+async def close_http_client():
+    """Close pooled connections (call on shutdown)"""
+    global _client
+
+    async with _client_lock:
+        if _client is not None:
+            await _client.aclose()
+            _client = None
+            logger.info("👋 HTTP client pool closed")
@@ -0,0 +1,169 @@
+"""
+Hydration-state parser
+SSR frameworks embed the page's data as JSON in the static HTML so the
+client can hydrate: Next.js (__NEXT_DATA__), Nuxt (__NUXT__ /
+__NUXT_DATA__), Redux-style stores (__INITIAL_STATE__, __PRELOADED_STATE__)
+and Apollo (__APOLLO_STATE__). When that JSON carries the content, the
+page doesn't need a browser at all.
+"""
+
+import json
+import re
+from typing import Any, Optional
+import logging
+
+from core.html_processing.json_capture import has_records
+from config.config import HYDRATION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# <script id="__NEXT_DATA__" type="application/json">{...}</script> (also Nuxt 3)
+_JSON_SCRIPT = re.compile(
+    r'<script[^>]*\bid=["\'](__NEXT_DATA__|__NUXT_DATA__)["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# window.__X__ = {...}  /  window.__X__ = JSON.parse("...")
+_WINDOW_STATE = re.compile(
+    r'window\.(__NUXT__|__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__)\s*=\s*'
+)
+
+
+def _balanced_literal(text: str, start: int) -> Optional[str]:
+    """The {...} / [...] literal starting at text[start], honouring strings"""
+    if start >= len(text) or text[start] not in "{[":
+        return None
+
+    depth, quote, escaped = 0, None, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'`":
+            quote = ch
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _parse_js_value(text: str, start: int) -> Any:
+    """JSON object literal or JSON.parse("...") assigned at text[start]"""
+    if text.startswith("JSON.parse(", start):
+        match = re.match(r'JSON\.parse\(\s*("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')\s*\)', text[start:start + 5_000_000], re.DOTALL)
+        if not match:
+            return None
+        literal = match.group(1)
+        if literal.startswith("'"):
+            literal = '"' + literal[1:-1].replace('\\\'', "'").replace('"', '\\"') + '"'
+        return json.loads(json.loads(literal))
+
+    literal = _balanced_literal(text, start)
+    if literal is None:
+        return None
+    try:
+        return json.loads(literal)
+    except ValueError:
+        # Plain JS literals: undefined isn't JSON
+        return json.loads(re.sub(r'(?<=[:\[,])\s*undefined\b', 'null', literal))
+
+
+def _unflatten_devalue(flat: list) -> Any:
+    """Nuxt 3 __NUXT_DATA__ (devalue): values reference other array indices"""
+    memo = {}
+
+    def resolve(index):
+        if not isinstance(index, int) or index < 0:
+            return None  # Negative indices encode undefined / NaN / ...
+        if index in memo:
+            return memo[index]
+        value = flat[index]
+        if isinstance(value, list):
+            if value and isinstance(value[0], str):
+                # ["Reactive", i], ["Ref", i], ["Date", "..."], ["Set", ...], ...
+                kind, args = value[0], value[1:]
+                if kind in ("Reactive", "ShallowReactive", "Ref", "ShallowRef", "EmptyRef"):
+                    memo[index] = resolve(args[0]) if args else None
+                elif kind in ("Set", "Map"):
+                    memo[index] = [resolve(a) for a in args]
+                else:
+                    memo[index] = args[0] if args else None
+                return memo[index]
+            memo[index] = result = []
+            result.extend(resolve(i) for i in value)
+            return result
+        if isinstance(value, dict):
+            memo[index] = result = {}
+            for k, i in value.items():
+                result[k] = resolve(i)
+            return result
+        memo[index] = value
+        return value
+
+    return resolve(0) if flat else None
+
+
+def _text_chars(data: Any, depth: int = 0) -> int:
+    """Characters of human-readable text in a JSON document"""
+    if depth > 12:
+        return 0
+    if isinstance(data, str):
+        # Skip ids, hashes, urls: prose has spaces
+        return len(data) if " " in data else 0
+    if isinstance(data, dict):
+        return sum(_text_chars(v, depth + 1) for v in data.values())
+    if isinstance(data, list):
+        return sum(_text_chars(v, depth + 1) for v in data)
+    return 0
+
+
+def parse_hydration_state(html: str) -> Optional[dict]:
+    """
+    Find and parse the page's hydration state
+
+    Returns {"source": "__NEXT_DATA__", "data": ..., "rich": bool} or None.
+    "rich" means it holds enough content to skip rendering. Not cached: each
+    call returns its own data; use ParsedDocument.hydration to share one parse.
+    """
+    if not HYDRATION_CONFIG.get("enabled", True):
+        return None
+
+    found = []
+    for match in _JSON_SCRIPT.finditer(html):
+        try:
+            data = json.loads(match.group(2))
+        except ValueError:
+            continue
+        if match.group(1) == "__NUXT_DATA__" and isinstance(data, list):
+            try:
+                data = _unflatten_devalue(data)
+            except (IndexError, TypeError, RecursionError):
+                continue  # Out-of-range or cyclic references: the page's JSON, not our bug
+        found.append((match.group(1), data))
+
+    for match in _WINDOW_STATE.finditer(html):
+        try:
+            data = _parse_js_value(html, match.end())
+        except (ValueError, RecursionError):
+            data = None  # e.g. Nuxt 2's window.__NUXT__=(function(a,b){...}) needs a JS engine
+        if data is not None:
+            found.append((match.group(1), data))
+
+    if not found:
+        return None
+
+    # Several states on one page: the one with the most text wins
+    source, data = max(found, key=lambda item: _text_chars(item[1]))
+    rich = (
+        _text_chars(data) >= HYDRATION_CONFIG.get("min_text_chars", 500)
+        or has_records(data, HYDRATION_CONFIG.get("min_records", 3))
+    )
+    return {"source": source, "data": data, "rich": rich}
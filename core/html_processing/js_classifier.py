@@ -0,0 +1,311 @@
+"""
+Learned needs-JS classifier
+Logistic regression over the detector's HTML metrics, trained offline on
+logged render outcomes ("did rendering add content?"). When a trained
+model is present it replaces the detector's hand-tuned thresholds (length,
+script count, text ratio); bot protection, hydration state and domain
+rules still decide first.
+
+Prediction is a dot product over a dozen features in plain Python (a few
+microseconds); NumPy is only needed to train.
+
+Train / evaluate with train_needs_js_model.py (see there).
+
+Outcomes are only logged for pages that were rendered, so the training data
+covers pages the detector (or model) already sent to the browser.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from config.config import NEEDS_JS_MODEL_CONFIG
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FRAMEWORKS = ("Next.js", "React", "Vue", "Angular", "Svelte")
+
+FEATURES = [
+    "log_length",
+    "log_script_count",
+    "text_ratio",
+    "has_content",
+    "has_frameworks",
+    *[f"framework_{name}" for name in FRAMEWORKS],
+    "is_placeholder",
+    "has_cookie_error",
+    "has_hydration_state",
+]
+
+
+def feature_vector(metrics: Dict) -> List[float]:
+    """Numeric features from analyze_html_structure() metrics (order of FEATURES)"""
+    framework = metrics.get("framework_type")
+    return [
+        math.log1p(metrics.get("length", 0)),
+        math.log1p(metrics.get("script_count", 0)),
+        float(metrics.get("text_ratio", 0.0)),
+        float(bool(metrics.get("has_content"))),
+        float(bool(metrics.get("has_frameworks"))),
+        *[float(framework == name) for name in FRAMEWORKS],
+        float(bool(metrics.get("is_placeholder"))),
+        float(bool(metrics.get("has_cookie_error"))),
+        float(bool(metrics.get("hydration_state"))),
+    ]
+
+
+class NeedsJsClassifier:
+    """Standardized logistic regression: P(rendering adds content)"""
+
+    def __init__(self, weights: List[float], bias: float, mean: List[float], scale: List[float],
+                 threshold: float = 0.5, metadata: Optional[dict] = None):
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.scale = scale
+        self.threshold = threshold
+        self.metadata = metadata or {}
+
+    def proba_from_features(self, features: List[float]) -> float:
+        z = self.bias
+        for x, w, m, s in zip(features, self.weights, self.mean, self.scale):
+            z += w * (x - m) / s
+        if z < -35:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def predict_proba(self, metrics: Dict) -> float:
+        return self.proba_from_features(feature_vector(metrics))
+
+    def predict(self, metrics: Dict) -> Tuple[bool, float]:
+        """(needs JS, probability)"""
+        p = self.predict_proba(metrics)
+        return p >= self.threshold, p
+
+    # ========================================================================
+    # PERSISTENCE
+    # ========================================================================
+
+    def to_dict(self) -> dict:
+        return {
+            "features": FEATURES,
+            "weights": self.weights,
+            "bias": self.bias,
+            "mean": self.mean,
+            "scale": self.scale,
+            "threshold": self.threshold,
+            "metadata": self.metadata,
+        }
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "NeedsJsClassifier":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("features") != FEATURES:
+            raise ValueError("model was trained on a different feature set, retrain it")
+        return cls(data["weights"], data["bias"], data["mean"], data["scale"],
+                   data.get("threshold", 0.5), data.get("metadata"))
+
+
+# ============================================================================
+# GLOBAL MODEL INSTANCE
+# ============================================================================
+
+_classifier: Optional[NeedsJsClassifier] = None
+_loaded = False
+
+
+def get_needs_js_classifier() -> Optional[NeedsJsClassifier]:
+    """The trained model, or None (disabled / not trained yet)"""
+    global _classifier, _loaded
+
+    if not NEEDS_JS_MODEL_CONFIG.get("enabled", True):
+        return None
+
+    if not _loaded:
+        _loaded = True
+        path = NEEDS_JS_MODEL_CONFIG.get("model_path", "config/needs_js_model.json")
+        if os.path.exists(path):
+            try:
+                _classifier = NeedsJsClassifier.load(path)
+                logger.info(f"🤖 Loaded needs-JS model from {path}")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Could not load needs-JS model {path}: {e}")
+
+    return _classifier
+
+
+# ============================================================================
+# OUTCOME LOG
+# ============================================================================
+
+def _append_outcome(path: str, line: str, max_bytes: Optional[int]) -> bool:
+    """Append unless the log is already full; returns whether it was written"""
+    if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+        return False
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+    return True
+
+
+_log_full_warned = False
+
+
+async def log_render_outcome(url: str, metrics: Dict, render_better: bool):
+    """
+    Append a training example: the static page's metrics + whether rendering helped
+
+    Opt-in (NEEDS_JS_MODEL_CONFIG["outcome_log"]) and capped at
+    outcome_log_max_bytes, so a long-running API doesn't fill the disk.
+    """
+    global _log_full_warned
+
+    path = NEEDS_JS_MODEL_CONFIG.get("outcome_log")
+    if not path:
+        return
+
+    line = json.dumps({
+        "url": url,
+        "features": feature_vector(metrics),
+        "render_better": render_better,
+        "ts": time.time()
+    }) + "\n"
+    try:
+        written = await asyncio.to_thread(_append_outcome, path, line, NEEDS_JS_MODEL_CONFIG.get("outcome_log_max_bytes"))
+    except OSError as e:
+        logger.warning(f"⚠️ Could not log render outcome: {e}")
+        return
+
+    if not written and not _log_full_warned:
+        _log_full_warned = True
+        logger.warning(f"⚠️ Render outcome log {path} is full, no longer logging")
+
+
+def load_outcomes(path: str) -> Tuple[List[List[float]], List[int]]:
+    X, y = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if len(row.get("features", [])) == len(FEATURES):
+                X.append(row["features"])
+                y.append(int(bool(row["render_better"])))
+    return X, y
+
+
+# ============================================================================
+# TRAINING (offline, NumPy)
+# ============================================================================
+
+def train(X: List[List[float]], y: List[int], l2: float = 0.01, epochs: int = 2000,
+          learning_rate: float = 0.1, threshold: float = 0.5) -> NeedsJsClassifier:
+    """Batch gradient descent on the L2-regularized log loss"""
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("NumPy is required to train (pip install numpy)")
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Xs = (X - mean) / scale
+
+    w = np.zeros(Xs.shape[1])
+    b = 0.0
+    n = len(y)
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-np.clip(Xs @ w + b, -35, 35)))
+        error = p - y
+        w -= learning_rate * (Xs.T @ error / n + l2 * w)
+        b -= learning_rate * error.mean()
+
+    return NeedsJsClassifier(w.tolist(), float(b), mean.tolist(), scale.tolist(), threshold)
+
+
+def evaluate(model: NeedsJsClassifier, X: List[List[float]], y: List[int]) -> dict:
+    """Accuracy, precision/recall of "render", and renders the model would avoid or cause"""
+    tp = fp = tn = fn = 0
+    for features, label in zip(X, y):
+        predicted = model.proba_from_features(features) >= model.threshold
+        if predicted and label:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif label:
+            fn += 1
+        else:
+            tn += 1
+
+    total = tp + fp + tn + fn
+    return {
+        "examples": total,
+        "accuracy": round((tp + tn) / total, 4) if total else 0.0,
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 0.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 0.0,
+        "false_positive_renders": fp,   # Browser started, nothing gained
+        "missed_renders": fn,           # Static HTML kept although rendering helped
+    }
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Train / evaluate the needs-JS classifier")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--log", default=NEEDS_JS_MODEL_CONFIG.get("outcome_log") or "render_outcomes.jsonl")
+    parser.add_argument("--model", default=NEEDS_JS_MODEL_CONFIG.get("model_path", "config/needs_js_model.json"))
+    parser.add_argument("--threshold", type=float, default=0.5, help="P(render helps) needed to render")
+    parser.add_argument("--l2", type=float, default=0.01)
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--test-split", type=float, default=0.2, help="Held-out share when training")
+    args = parser.parse_args(argv)
+
+    X, y = load_outcomes(args.log)
+    if not X:
+        print(f"❌ No outcomes in {args.log}")
+        return 1
+    print(f"📊 {len(X)} outcomes ({sum(y)} where rendering helped)")
+
+    if args.command == "evaluate":
+        model = NeedsJsClassifier.load(args.model)
+        print(json.dumps(evaluate(model, X, y), indent=2))
+        return 0
+
+    # Hold out a test split, report on it, then fit the saved model on everything
+    rows = list(zip(X, y))
+    random.Random(0).shuffle(rows)
+    cut = int(len(rows) * (1 - args.test_split))
+    train_rows, test_rows = rows[:cut], rows[cut:]
+
+    if test_rows and train_rows:
+        model = train([r[0] for r in train_rows], [r[1] for r in train_rows], args.l2, args.epochs, threshold=args.threshold)
+        print("🧪 Held-out:", json.dumps(evaluate(model, [r[0] for r in test_rows], [r[1] for r in test_rows]), indent=2))
+
+    model = train(X, y, args.l2, args.epochs, threshold=args.threshold)
+    model.metadata = {"examples": len(X), "trained_at": time.time()}
+    model.save(args.model)
+    print(f"✅ Saved model to {args.model}")
+    print("📈 Training set:", json.dumps(evaluate(model, X, y), indent=2))
+    return 0
+
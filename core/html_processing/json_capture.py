@@ -0,0 +1,138 @@
+"""
+Capture JSON API responses while a page renders
+SPAs load their data through XHR/fetch JSON endpoints; recording those
+responses gives extraction structured data without going through the HTML.
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, List
+import logging
+
+from playwright.async_api import Page, Response
+
+from config.config import JSON_CAPTURE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Telemetry / config endpoints that are JSON but never page data
+NOISE_URL = re.compile(
+    r"/(collect|analytics|track|tracking|beacon|log|logs|metrics|telemetry|events?|"
+    r"pixel|config|settings|i18n|translations?|locales?|manifest|experiments?|flags?)(/|\?|$|\.json)",
+    re.IGNORECASE
+)
+
+stats = {
+    "renders": 0,
+    "responses_seen": 0,
+    "payloads_kept": 0,
+}
+
+
+def has_records(data: Any, min_records: int = 2, depth: int = 0) -> bool:
+    """Does this JSON contain something record-like (a list of objects, or a rich object)?"""
+    if depth > 5:
+        return False
+    if isinstance(data, list):
+        if sum(1 for item in data[:50] if isinstance(item, dict)) >= min_records:
+            return True
+        return any(has_records(item, min_records, depth + 1) for item in data[:20])
+    if isinstance(data, dict):
+        scalars = sum(1 for v in data.values() if isinstance(v, (str, int, float)) and not isinstance(v, bool))
+        if depth > 0 and scalars >= 5:
+            return True
+        return any(has_records(v, min_records, depth + 1) for v in data.values() if isinstance(v, (dict, list)))
+    return False
+
+
+def count_records(data: Any, depth: int = 0) -> int:
+    """Size of the largest list of objects in a JSON document"""
+    if depth > 5:
+        return 0
+    if isinstance(data, list):
+        own = sum(1 for item in data if isinstance(item, dict))
+        return max([own] + [count_records(item, depth + 1) for item in data[:20]])
+    if isinstance(data, dict):
+        return max([0] + [count_records(v, depth + 1) for v in data.values() if isinstance(v, (dict, list))])
+    return 0
+
+
+class JsonResponseCapture:
+    """
+    Records data-looking JSON responses of one render
+
+    Usage:
+        capture = JsonResponseCapture(page)
+        capture.start()
+        ... navigate / wait ...
+        payloads = await capture.collect()   # [{"url": ..., "data": ..., "request": {...}}]
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.max_payloads = JSON_CAPTURE_CONFIG.get("max_payloads", 20)
+        self.max_bytes = JSON_CAPTURE_CONFIG.get("max_payload_bytes", 2 * 1024 * 1024)
+        self.min_records = JSON_CAPTURE_CONFIG.get("min_records", 2)
+        self._responses: List[Response] = []
+
+    def start(self):
+        self.page.on("response", self._on_response)
+
+    def stop(self):
+        self.page.remove_listener("response", self._on_response)
+
+    def _on_response(self, response: Response):
+        stats["responses_seen"] += 1
+        if len(self._responses) < self.max_payloads * 2 and self._looks_like_data(response):
+            self._responses.append(response)
+
+    def _looks_like_data(self, response: Response) -> bool:
+        if response.request.resource_type not in ("xhr", "fetch") or response.status != 200:
+            return False
+        if "json" not in response.headers.get("content-type", "").lower():
+            return False
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            return False
+        return not NOISE_URL.search(response.url)
+
+    async def _read(self, response: Response):
+        try:
+            body = await asyncio.wait_for(response.body(), timeout=5)
+            if len(body) > self.max_bytes:
+                return None
+            data = json.loads(body)
+        except Exception:
+            return None  # Evicted from the browser cache, not JSON after all, ...
+        if not has_records(data, self.min_records):
+            return None
+
+        # How the page asked for it (endpoint replay learns from this)
+        request = response.request
+        return {
+            "url": response.url,
+            "data": data,
+            "request": {
+                "method": request.method,
+                "headers": request.headers,
+                "post_data": request.post_data
+            }
+        }
+
+    async def collect(self) -> List[dict]:
+        """Stop listening and read the recorded bodies (call before the page is reused)"""
+        self.stop()
+        stats["renders"] += 1
+
+        results = await asyncio.gather(*(self._read(r) for r in self._responses))
+        payloads = [p for p in results if p is not None][:self.max_payloads]
+        stats["payloads_kept"] += len(payloads)
+
+        if payloads:
+            logger.info(f"🧾 Captured {len(payloads)} JSON payloads from {self.page.url}")
+        return payloads
+
+
+def get_capture_stats() -> dict:
+    return dict(stats)
@@ -0,0 +1,112 @@
+"""
+Process-wide knowledge service
+One AdaptiveLearner and one MultiSignalDetector shared by every crawler,
+fetch_html_js and batch job, so what one job learns (success rates, best
+techniques, timing baselines, protection history) is used by all of them
+and memory doesn't grow per crawl.
+"""
+
+import threading
+from typing import Dict, Optional
+import logging
+
+from core.html_processing.adaptive_learning_sytem import AdaptiveLearner
+from core.html_processing.advance_stealth_mode import MultiSignalDetector, DetectionSignal, ProtectionType
+from config.config import ADAPTIVE_LEARNING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeService:
+    """
+    Shared learner + detector behind one lock
+
+    Every method is synchronous and short (no awaits inside), so the lock
+    only ever contends between threads (e.g. render workers run in-process).
+    """
+
+    def __init__(self, learner: AdaptiveLearner, detector: MultiSignalDetector):
+        self.learner = learner
+        self.detector = detector
+        self._lock = threading.RLock()
+
+    def detect_protection(
+        self,
+        url: str,
+        html: str,
+        status_code: int = 200,
+        headers: Optional[Dict] = None,
+        cookies: Optional[Dict] = None,
+        response_time: float = 0.0
+    ) -> DetectionSignal:
+        with self._lock:
+            return self.detector.detect_protection(
+                url=url,
+                html=html,
+                status_code=status_code,
+                headers=headers or {},
+                cookies=cookies or {},
+                response_time=response_time
+            )
+
+    def record_attempt(
+        self,
+        domain: str,
+        protection_type: ProtectionType,
+        technique_used: str,
+        success: bool,
+        response_time: float,
+        error_type: Optional[str] = None
+    ):
+        """Feed one outcome to both the learner and the detector's history"""
+        with self._lock:
+            self.learner.record_attempt(
+                domain=domain,
+                protection_type=protection_type.value,
+                technique_used=technique_used,
+                success=success,
+                response_time=response_time,
+                error_type=error_type
+            )
+            self.detector.record_attempt(domain, protection_type, success)
+
+    def get_recommended_wait_time(self, domain: str, protection_type: str = "unknown", attempt_number: int = 1) -> float:
+        with self._lock:
+            return self.learner.get_recommended_wait_time(domain, protection_type, attempt_number)
+
+    def get_learned_success_rate(self, domain: str, protection_type: ProtectionType) -> float:
+        with self._lock:
+            return self.detector.get_learned_success_rate(domain, protection_type)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "domains_learned": len(self.learner.domain_stats),
+                "domains_tracked": len(self.detector.domain_history),
+                "timing_baselines": len(self.detector.timing_baseline),
+            }
+
+
+# ============================================================================
+# GLOBAL SERVICE INSTANCE
+# ============================================================================
+
+_service: Optional[KnowledgeService] = None
+_service_lock = threading.Lock()
+
+
+def get_knowledge_service() -> KnowledgeService:
+    """Get or create the process-wide knowledge service"""
+    global _service
+
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = KnowledgeService(
+                    learner=AdaptiveLearner(),
+                    detector=MultiSignalDetector(
+                        history_size=ADAPTIVE_LEARNING_CONFIG.get("detector_history_size", 50)
+                    )
+                )
+
+    return _service
@@ -0,0 +1,211 @@
+"""
+Shared page signal scanner
+The detector, the stealth/protection detector and extraction all look for
+fixed strings in the same HTML (framework markers, placeholders, content
+indicators, bot-protection text). Each module registers its patterns here;
+a page is then scanned once for all of them and every module reads its
+answers from the shared result.
+
+With pyahocorasick installed (optional: pip install pyahocorasick) the scan
+is a single pass of a multi-pattern automaton; otherwise each pattern is
+counted with str.count, still once per page instead of once per module.
+Both count non-overlapping occurrences, like str.count.
+
+Scans are cached by (length, hash) of the HTML and hold only counts, so
+the cache doesn't keep pages alive.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_TAG = re.compile(r"<[^>]+>")
+
+# (lowercased text, case_sensitive) -> original text; insertion-ordered
+_patterns: Dict[Tuple[str, bool], str] = {}
+_matcher = None
+_lock = threading.Lock()
+
+# Recent scans: (len(html), hash(html)) -> _Scan
+_SCAN_CACHE_SIZE = 8
+_scans: "OrderedDict[Tuple[int, int], _Scan]" = OrderedDict()
+
+
+def register_patterns(patterns: Iterable[str], case_sensitive: bool = False) -> List[str]:
+    """
+    Add patterns to the shared scan; returns them (so modules can keep their lists)
+
+    Case-insensitive patterns match the lowercased page, case-sensitive ones
+    the page as-is.
+    """
+    global _matcher
+
+    patterns = list(patterns)
+    with _lock:
+        for pattern in patterns:
+            if not pattern:
+                continue
+            key = (pattern if case_sensitive else pattern.lower(), case_sensitive)
+            if key not in _patterns:
+                _patterns[key] = pattern
+                _matcher = None  # Rebuilt on the next scan
+        _scans.clear()
+    return patterns
+
+
+# ============================================================================
+# MATCHER
+# ============================================================================
+
+class _AhoCorasickMatcher:
+    def __init__(self, needles: List[str]):
+        self.automaton = ahocorasick.Automaton()
+        for needle in needles:
+            self.automaton.add_word(needle, needle)
+        self.automaton.make_automaton()
+
+    def matches(self, text: str):
+        """(start, needle) for every occurrence"""
+        for end, needle in self.automaton.iter(text):
+            yield end - len(needle) + 1, needle
+
+
+def _get_matcher():
+    global _matcher
+
+    with _lock:
+        if _matcher is None and AHOCORASICK_AVAILABLE and _patterns:
+            _matcher = _AhoCorasickMatcher(sorted({text.lower() for text, _ in _patterns}))
+        return _matcher, dict(_patterns)
+
+
+# ============================================================================
+# SCAN RESULT
+# ============================================================================
+
+class _Scan:
+    """Counts for one page (no reference to the HTML itself)"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.counts: Dict[Tuple[str, bool], int] = {}
+        self.text_ratio: Optional[float] = None
+
+
+def _scan(html: str) -> _Scan:
+    scan = _Scan(len(html))
+    counts = scan.counts
+    matcher, patterns = _get_matcher()
+    lower = html.lower()
+
+    if matcher is None:
+        for text, case_sensitive in patterns:
+            counts[(text, case_sensitive)] = (html if case_sensitive else lower).count(text)
+        return scan
+
+    cased = {}
+    for text, case_sensitive in patterns:
+        counts[(text, case_sensitive)] = 0
+        if case_sensitive:
+            cased.setdefault(text.lower(), []).append(text)
+
+    # Offsets line up only if lowercasing kept the length (it does for ASCII)
+    aligned = len(lower) == len(html)
+
+    # The automaton reports overlapping matches; count like str.count, which
+    # skips occurrences that start inside the previous one of the same pattern
+    next_free: Dict[Tuple[str, bool], int] = {}
+    for start, needle in matcher.matches(lower):
+        key = (needle, False)
+        if key in counts and start >= next_free.get(key, 0):
+            counts[key] += 1
+            next_free[key] = start + len(needle)
+        if not aligned:
+            continue
+        for original in cased.get(needle, ()):
+            key = (original, True)
+            if start >= next_free.get(key, 0) and html.startswith(original, start):
+                counts[key] += 1
+                next_free[key] = start + len(original)
+
+    if not aligned:
+        for original_list in cased.values():
+            for original in original_list:
+                counts[(original, True)] = html.count(original)
+
+    return scan
+
+
+class PageSignals:
+    """Occurrence counts of every registered pattern in one page"""
+
+    def __init__(self, html: str, scan: Optional[_Scan] = None):
+        self._html = html
+        self._lower: Optional[str] = None
+        self._scan = scan or _scan(html)
+        self._counts = self._scan.counts
+        self.length = self._scan.length
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self._html.lower()
+        return self._lower
+
+    def count(self, pattern: str, case_sensitive: bool = False) -> int:
+        key = (pattern if case_sensitive else pattern.lower(), case_sensitive)
+        if key not in self._counts:
+            # Not a registered pattern: count directly (shared with later lookups on this page)
+            self._counts[key] = (self._html if case_sensitive else self.lower).count(key[0])
+        return self._counts[key]
+
+    def has(self, pattern: str, case_sensitive: bool = False) -> bool:
+        return self.count(pattern, case_sensitive) > 0
+
+    def any(self, patterns: Iterable[str], case_sensitive: bool = False) -> bool:
+        return any(self.has(p, case_sensitive) for p in patterns)
+
+    def first(self, patterns: Iterable[str], case_sensitive: bool = False) -> Optional[str]:
+        """First pattern of the list (in list order) that occurs"""
+        return next((p for p in patterns if self.has(p, case_sensitive)), None)
+
+    def matched(self, patterns: Iterable[str], case_sensitive: bool = False) -> int:
+        """How many of the patterns occur"""
+        return sum(1 for p in patterns if self.has(p, case_sensitive))
+
+    @property
+    def text_ratio(self) -> float:
+        """Share of the page that is text rather than tags"""
+        if self._scan.text_ratio is None:
+            text = _TAG.sub("", self._html)
+            self._scan.text_ratio = len(text.strip()) / self.length if self.length else 0.0
+        return self._scan.text_ratio
+
+
+def get_page_signals(html: str) -> PageSignals:
+    """
+    Scan a page (the counts are cached for the last few documents, so every
+    module that looks at the same HTML shares one scan)
+    """
+    key = (len(html), hash(html))
+    with _lock:
+        scan = _scans.get(key)
+        if scan is not None:
+            _scans.move_to_end(key)
+    if scan is None:
+        scan = _scan(html)
+        with _lock:
+            _scans[key] = scan
+            while len(_scans) > _SCAN_CACHE_SIZE:
+                _scans.popitem(last=False)
+    return PageSignals(html, scan)
@@ -0,0 +1,79 @@
+"""
+Parse-once page document
+One smart_extract call used to run BeautifulSoup over the same HTML in every
+step (list detection, meta tags, multi-layer extraction, selector generation,
+selector extraction, cleaning) and the crawler parsed it twice more for its
+links. A ParsedDocument is created once per fetched page and handed to all of
+them; the tree and the views derived from it (full text, links, cleaned main
+content) are built on first use and then shared.
+
+The shared tree is read-only. Steps that prune it (cleaning, selector
+generation) work on mutable_soup(), a copy, which is about twice as fast as
+parsing again.
+"""
+
+import copy
+from functools import cached_property
+from typing import List, Optional, Union
+
+from bs4 import BeautifulSoup, Tag
+
+from core.html_processing.page_signals import PageSignals, get_page_signals
+
+
+class ParsedDocument:
+    """HTML of one page + lazily built, cached views"""
+
+    def __init__(self, html: str, url: Optional[str] = None):
+        self.html = html
+        self.url = url
+
+    def __len__(self) -> int:
+        return len(self.html)
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        """The parsed tree (shared: don't decompose/extract from it)"""
+        return BeautifulSoup(self.html, 'html.parser')
+
+    def mutable_soup(self) -> BeautifulSoup:
+        """A private copy of the tree for callers that remove elements"""
+        return copy.copy(self.soup)
+
+    @cached_property
+    def text(self) -> str:
+        """All text of the page"""
+        return self.soup.get_text()
+
+    @cached_property
+    def links(self) -> List[Tag]:
+        """Every <a href> in document order"""
+        return self.soup.find_all('a', href=True)
+
+    @cached_property
+    def cleaned(self) -> Tag:
+        """Main content without scripts, navigation, sidebars (see cleaner.clean_soup)"""
+        from core.html_processing.cleaner import clean_soup  # Avoid circular import
+        return clean_soup(self.mutable_soup())
+
+    @cached_property
+    def cleaned_html(self) -> str:
+        return str(self.cleaned)
+
+    @cached_property
+    def hydration(self) -> Optional[dict]:
+        """SSR hydration state embedded in the page (see hydration.parse_hydration_state)"""
+        from core.html_processing.hydration import parse_hydration_state  # Pulls in playwright via json_capture
+        return parse_hydration_state(self.html)
+
+    @property
+    def signals(self) -> PageSignals:
+        """Detector/protection signals (scanned once per HTML, shared with every module)"""
+        return get_page_signals(self.html)
+
+
+def as_document(html: Union[str, ParsedDocument], url: Optional[str] = None) -> ParsedDocument:
+    """Use an existing document, or wrap raw HTML (callers that only have a string)"""
+    if isinstance(html, ParsedDocument):
+        return html
+    return ParsedDocument(html, url)
@@ -0,0 +1,214 @@
+"""
+DOM-quiescence wait for renders
+Instead of sleeping a fixed wait_time after navigation, watch the page from
+the inside (MutationObserver + resource PerformanceObserver) and return as
+soon as it has been quiet for a short window. wait_time stays the upper
+bound, so a page that never settles costs exactly what it did before.
+
+For pages whose extraction selectors are already known (same domain and
+URL path template), the render also finishes as soon as those selectors
+match elements with content, whichever of the two comes first.
+"""
+
+import asyncio
+import secrets
+from typing import Dict, List, Optional
+import logging
+
+from playwright.async_api import Page
+
+from config.config import RENDER_WAIT_CONFIG
+from config.settings import domain_selector_cache
+from core.html_processing.render_decisions import path_template
+
+logger = logging.getLogger(__name__)
+
+# Symbol.for() key of the probe state, random per process
+PROBE_KEY = f"sg-{secrets.token_hex(8)}"
+
+# Installs the activity probe once per document. Observers only (no
+# fetch/XHR monkey-patching), and the state sits under a non-enumerable
+# Symbol-keyed property, so scripts that scan window for unknown globals
+# don't find it. Not undetectable: Object.getOwnPropertySymbols(window)
+# still lists the key, and the observers themselves can be noticed.
+PROBE_SCRIPT = """
+(() => {
+    const key = Symbol.for('PROBE_KEY');
+    if (Object.prototype.hasOwnProperty.call(window, key)) return;
+    const probe = { last: performance.now(), mutations: 0 };
+    Object.defineProperty(window, key, { value: probe, enumerable: false });
+    const bump = () => { probe.last = performance.now(); };
+    new MutationObserver((records) => { probe.mutations += records.length; bump(); })
+        .observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    try {
+        new PerformanceObserver(bump).observe({ type: 'resource', buffered: false });
+    } catch (e) {}
+})();
+""".replace("PROBE_KEY", PROBE_KEY)
+
+# Resolves once the page has been quiet for quietMs (after minMs), or at maxMs
+WAIT_SCRIPT = """
+async ([quietMs, minMs, maxMs]) => {
+    PROBE;
+    const probe = window[Symbol.for('PROBE_KEY')];
+    const start = performance.now();
+    while (true) {
+        const now = performance.now();
+        const elapsed = now - start;
+        if (elapsed >= maxMs) return { settled: false, elapsed, mutations: probe.mutations };
+        if (elapsed >= minMs && now - probe.last >= quietMs && document.readyState !== 'loading') {
+            return { settled: true, elapsed, mutations: probe.mutations };
+        }
+        await new Promise((r) => setTimeout(r, 50));
+    }
+}
+""".replace("PROBE;", PROBE_SCRIPT).replace("PROBE_KEY", PROBE_KEY)
+
+# Resolves once the first selector and at least minRatio of all selectors
+# match an element with text (or src), or at maxMs
+SELECTOR_SCRIPT = """
+async ([selectors, minRatio, maxMs]) => {
+    const hasContent = (sel) => {
+        let nodes;
+        try { nodes = document.querySelectorAll(sel); } catch (e) { return false; }
+        for (const n of nodes) {
+            if ((n.textContent || '').trim() || n.getAttribute('src') || n.getAttribute('content')) return true;
+        }
+        return false;
+    };
+    const start = performance.now();
+    while (true) {
+        const elapsed = performance.now() - start;
+        const matched = selectors.filter(hasContent);
+        if (matched.includes(selectors[0]) && matched.length >= Math.ceil(selectors.length * minRatio)) {
+            return { settled: true, elapsed, matched: matched.length };
+        }
+        if (elapsed >= maxMs) return { settled: false, elapsed, matched: matched.length };
+        await new Promise((r) => setTimeout(r, 50));
+    }
+}
+"""
+
+stats = {
+    "waits": 0,
+    "settled": 0,           # Returned before the upper bound
+    "selector_waits": 0,    # Waits that used ready selectors
+    "time_waited": 0.0,
+    "time_saved": 0.0,      # Sum of (wait_time - actual wait)
+}
+
+
+# ============================================================================
+# READY SELECTORS
+# ============================================================================
+
+def remember_ready_selectors(url: str, selectors: Dict[str, str]):
+    """
+    Record selectors that extracted real data, so renders of pages like this
+    one can finish on them
+
+    Keyed by path template: a product page's selectors say nothing about
+    when the same domain's listing or search pages are ready.
+    """
+    if url and selectors:
+        domain_selector_cache[path_template(url)] = list(selectors.values())
+
+
+def get_ready_selectors(url: str) -> List[str]:
+    return domain_selector_cache.get(path_template(url), [])
+
+
+# ============================================================================
+# WAITS
+# ============================================================================
+
+async def install_probe(page: Page):
+    """Observe from document start on every navigation of this page"""
+    await page.add_init_script(PROBE_SCRIPT)
+
+
+async def wait_for_quiescence(page: Page, max_wait: float) -> Dict:
+    """
+    Wait until the DOM and network have been quiet for
+    RENDER_WAIT_CONFIG["quiet_window"] seconds, at most max_wait seconds
+    """
+    quiet = RENDER_WAIT_CONFIG.get("quiet_window", 0.5)
+    min_wait = min(RENDER_WAIT_CONFIG.get("min_wait", 0.25), max_wait)
+    return await _timed_wait(page, WAIT_SCRIPT, [quiet * 1000, min_wait * 1000, max_wait * 1000], max_wait)
+
+
+async def wait_for_selectors(page: Page, selectors: List[str], max_wait: float) -> Dict:
+    """Wait until the ready selectors match elements with content, at most max_wait seconds"""
+    stats["selector_waits"] += 1
+    min_ratio = RENDER_WAIT_CONFIG.get("ready_selector_ratio", 0.5)
+    return await _timed_wait(page, SELECTOR_SCRIPT, [selectors, min_ratio, max_wait * 1000], max_wait)
+
+
+async def _timed_wait(page: Page, script: str, args: list, max_wait: float) -> Dict:
+    """Run an in-page wait script with max_wait as the budget, and record stats"""
+    # Small margin so the in-page timer, not ours, normally ends the wait
+    deadline = max_wait + 1.0
+
+    start = asyncio.get_event_loop().time()
+    try:
+        result = await asyncio.wait_for(page.evaluate(script, args), timeout=deadline)
+    except Exception as e:
+        # Navigation (e.g. challenge redirect) destroyed the context: spend the rest of the budget
+        remaining = max_wait - (asyncio.get_event_loop().time() - start)
+        logger.debug(f"⏳ Wait probe interrupted ({e}), sleeping {max(remaining, 0):.2f}s")
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        result = {"settled": False}
+
+    waited = asyncio.get_event_loop().time() - start
+    stats["waits"] += 1
+    stats["time_waited"] += waited
+    stats["time_saved"] += max(max_wait - waited, 0.0)
+    if result.get("settled"):
+        stats["settled"] += 1
+
+    logger.debug(f"⏱️ Page {'ready' if result.get('settled') else 'still busy'} after {waited:.2f}s (cap {max_wait}s)")
+    return {**result, "waited": waited}
+
+
+async def wait_for_render(
+    page: Page,
+    wait_time: float,
+    wait_strategy: str = "smart",
+    ready_selectors: Optional[List[str]] = None
+):
+    """
+    Post-navigation wait: "fixed" sleeps wait_time; otherwise finish on DOM
+    quiescence, or on the ready selectors if they match first
+    """
+    if wait_strategy == "fixed" or wait_time <= 0:
+        await asyncio.sleep(max(wait_time, 0))
+        return
+    if not ready_selectors:
+        await wait_for_quiescence(page, wait_time)
+        return
+
+    # Selectors that stopped matching (redesign, A/B variant) must not cost the full wait_time
+    waits = [
+        asyncio.ensure_future(wait_for_selectors(page, ready_selectors, wait_time)),
+        asyncio.ensure_future(wait_for_quiescence(page, wait_time)),
+    ]
+    try:
+        for finished in asyncio.as_completed(waits):
+            if (await finished).get("settled"):
+                return
+    finally:
+        for wait in waits:
+            wait.cancel()
+
+
+def get_wait_stats() -> dict:
+    waits = stats["waits"]
+    return {
+        "waits": waits,
+        "settled_early": stats["settled"],
+        "selector_waits": stats["selector_waits"],
+        "settled_rate": round(stats["settled"] / waits * 100, 1) if waits else 0.0,
+        "avg_wait": round(stats["time_waited"] / waits, 3) if waits else 0.0,
+        "total_time_saved": round(stats["time_saved"], 1),
+    }
@@ -0,0 +1,143 @@
+"""
+Client for out-of-process render workers (render_worker.py)
+Keeps Chromium control and HTML serialization off the API's event loop.
+Requests go to the worker with the fewest outstanding renders; workers that
+refuse the connection are skipped for a cooldown period. Once a worker has
+accepted a render, its failures (including read timeouts) are final: the
+render is not sent to another worker.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import logging
+
+import httpx
+
+from core.html_processing.circuit_breaker import CircuitOpenError
+from config.config import RENDER_SERVICE_CONFIG
+from config.settings import RENDER_WORKER_URLS
+
+logger = logging.getLogger(__name__)
+
+
+class RenderWorkersUnavailable(Exception):
+    """No render worker could be reached"""
+
+
+class RemoteRenderError(Exception):
+    """A worker was reached but the render itself failed"""
+
+
+@dataclass
+class WorkerEndpoint:
+    url: str
+    outstanding: int = 0
+    down_until: float = 0.0
+    renders: int = 0
+    failures: int = 0
+
+    def is_up(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class RenderServiceClient:
+    """Least-outstanding-requests load balancer over render workers"""
+
+    def __init__(self, endpoints: List[str], timeout: float = 120.0, cooldown: float = 15.0):
+        self.endpoints = [WorkerEndpoint(url.rstrip("/")) for url in endpoints]
+        self.cooldown = cooldown
+        # Own client: worker calls are long-polls to a few local hosts
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50)
+        )
+
+    def _candidates(self) -> List[WorkerEndpoint]:
+        up = [e for e in self.endpoints if e.is_up()]
+        return sorted(up, key=lambda e: e.outstanding)
+
+    async def render(self, url: str, **options) -> Tuple[str, str, list]:
+        """
+        Render on a worker; returns (html, final_url, json_payloads)
+        (payloads only when rendered with capture_json)
+
+        Raises RenderWorkersUnavailable if no worker could be reached,
+        CircuitOpenError if the worker's breaker refused the domain, and
+        RemoteRenderError if the render failed or timed out on the worker.
+        """
+        for endpoint in self._candidates():
+            endpoint.outstanding += 1
+            try:
+                response = await self._client.post(f"{endpoint.url}/render", json={"url": url, **options})
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                endpoint.failures += 1
+                endpoint.down_until = time.monotonic() + self.cooldown
+                logger.warning(f"⚠️ Render worker {endpoint.url} unreachable ({e}), trying next")
+                continue
+            except httpx.HTTPError as e:
+                # Accepted but slow or dropped: rendering it again elsewhere would only repeat the cost
+                raise RemoteRenderError(f"Worker {endpoint.url}: {type(e).__name__} {e}") from e
+            finally:
+                endpoint.outstanding -= 1
+
+            if response.status_code != 200:
+                is_json = response.headers.get("content-type", "").startswith("application/json")
+                detail = response.json().get("detail", response.text) if is_json else response.text
+                if isinstance(detail, dict) and detail.get("error") == "circuit_open":
+                    raise CircuitOpenError(detail.get("host", ""), float(detail.get("retry_after", 0.0)), detail.get("reason", ""))
+                raise RemoteRenderError(f"Worker {endpoint.url}: {detail}")
+
+            endpoint.renders += 1
+            data = response.json()
+            return data["html"], data["final_url"], data.get("json_payloads") or []
+
+        raise RenderWorkersUnavailable("No render worker reachable")
+
+    async def close(self):
+        await self._client.aclose()
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": [
+                {
+                    "url": e.url,
+                    "up": e.is_up(),
+                    "outstanding": e.outstanding,
+                    "renders": e.renders,
+                    "failures": e.failures
+                }
+                for e in self.endpoints
+            ]
+        }
+
+
+# ============================================================================
+# GLOBAL CLIENT INSTANCE
+# ============================================================================
+
+_render_client: Optional[RenderServiceClient] = None
+
+
+def get_render_client() -> Optional[RenderServiceClient]:
+    """Client for the configured workers, or None when rendering in-process"""
+    global _render_client
+
+    if _render_client is None and RENDER_WORKER_URLS:
+        _render_client = RenderServiceClient(
+            RENDER_WORKER_URLS,
+            timeout=RENDER_SERVICE_CONFIG.get("timeout", 120.0),
+            cooldown=RENDER_SERVICE_CONFIG.get("cooldown", 15.0)
+        )
+        logger.info(f"✅ Render workers: {', '.join(RENDER_WORKER_URLS)}")
+
+    return _render_client
+
+
+async def close_render_client():
+    """Close worker connections (call on shutdown)"""
+    global _render_client
+
+    if _render_client is not None:
+        await _render_client.close()
+        _render_client = None
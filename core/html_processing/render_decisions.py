@@ -0,0 +1,232 @@
+"""
+Learned rendering decisions
+Remembers, per domain and URL path template, whether rendering was needed
+(the rendered HTML was actually better than the static HTML) and which
+wait strategy worked. Once the evidence agrees, fetch_html goes straight
+to the right path: render without the throwaway static GET, or keep the
+static HTML without starting a browser.
+
+Evidence decays (RENDER_DECISION_CONFIG["half_life_hours"]), so a decision
+expires unless renders keep confirming it and sites that change are
+re-checked.
+"""
+
+import re
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+import logging
+
+from storage.knowledge_store import get_knowledge_store
+from config.config import RENDER_DECISION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "render_decisions"
+
+WAIT_STRATEGIES = ("smart", "fixed")
+
+_HEX_ID = re.compile(r"^[0-9a-f-]{8,}$", re.IGNORECASE)
+_DIGIT = re.compile(r"\d")
+
+
+def path_template(url: str) -> str:
+    """
+    host + path with the variable parts replaced
+
+    /item/123 -> /item/{n}, /p/3f2a9c1e-... -> /p/{id},
+    /iphone-13-pro-iid-1099 -> /{slug}
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    host = host[4:] if host.startswith("www.") else host
+
+    segments = []
+    for segment in parts.path.strip("/").split("/"):
+        if not segment:
+            continue
+        if segment.isdigit():
+            segments.append("{n}")
+        elif _HEX_ID.match(segment) and _DIGIT.search(segment):
+            segments.append("{id}")
+        elif (len(segment) > 12 and _DIGIT.search(segment)) or segment.count("-") >= 3:
+            segments.append("{slug}")
+        else:
+            segments.append(segment.lower())
+
+    return f"{host}/{'/'.join(segments)}"
+
+
+def _domain(template: str) -> str:
+    return template.split("/", 1)[0]
+
+
+class RenderDecisions:
+    """Decayed render / static evidence per path template and per domain"""
+
+    def __init__(self, half_life_hours: float = 72, min_weight: float = 3.0, min_agreement: float = 0.8):
+        self.half_life = half_life_hours * 3600
+        self.min_weight = min_weight
+        self.min_agreement = min_agreement
+        self.store = get_knowledge_store()
+        self.stats = {"decided_render": 0, "decided_static": 0, "undecided": 0, "recorded": 0}
+
+    def _decay(self, entry: dict, now: float) -> float:
+        return 0.5 ** (max(0.0, now - entry["updated"]) / self.half_life)
+
+    def _decayed(self, entry: dict, now: float) -> dict:
+        """Copy of an entry with its weights decayed to now"""
+        factor = self._decay(entry, now)
+        return {
+            **entry,
+            "render": entry["render"] * factor,
+            "static": entry["static"] * factor,
+            "wait": {
+                name: {"ok": w["ok"] * factor, "total": w["total"] * factor}
+                for name, w in entry["wait"].items()
+            },
+            "updated": now
+        }
+
+    # ========================================================================
+    # LEARNING
+    # ========================================================================
+
+    def record(
+        self,
+        url: str,
+        render_better: Optional[bool],
+        wait_strategy: Optional[str] = None,
+        wait_time: Optional[float] = None,
+        stealth_mode: Optional[bool] = None
+    ):
+        """
+        Record a render's outcome
+
+        render_better: the rendered HTML beat the static HTML (True), didn't
+        (False), or wasn't compared (None, e.g. a direct render).
+        """
+        now = time.time()
+        template = path_template(url)
+        rendered_ok = render_better is not False
+
+        for key in (template, _domain(template)):
+            entry = self.store.get(NAMESPACE, key)
+            entry = self._decayed(entry, now) if entry else {
+                "render": 0.0, "static": 0.0, "wait": {}, "updated": now
+            }
+
+            if render_better is True:
+                entry["render"] += 1
+            elif render_better is False:
+                entry["static"] += 1
+
+            if wait_strategy:
+                wait = entry["wait"].setdefault(wait_strategy, {"ok": 0.0, "total": 0.0})
+                wait["total"] += 1
+                wait["ok"] += 1 if rendered_ok else 0
+            if wait_time is not None:
+                entry["wait_time"] = wait_time
+            if stealth_mode is not None:
+                entry["stealth_mode"] = stealth_mode
+
+            self.store.put(NAMESPACE, key, entry)
+
+        self.stats["recorded"] += 1
+
+    # ========================================================================
+    # DECISIONS
+    # ========================================================================
+
+    def _best_wait_strategy(self, entry: dict) -> Optional[str]:
+        waits = entry["wait"]
+        if not waits:
+            return None
+        name, w = max(waits.items(), key=lambda item: (item[1]["ok"] + 1) / (item[1]["total"] + 2))
+        if w["total"] >= 1 and w["ok"] / w["total"] < 0.5:
+            # The strategy we used keeps failing: try one we haven't
+            untried = [s for s in WAIT_STRATEGIES if s not in waits]
+            if untried:
+                return untried[0]
+        return name
+
+    def decide(self, url: str) -> Optional[dict]:
+        """
+        What previous fetches of similar URLs found out
+
+        Returns {"render": bool, "confidence", "wait_strategy", "wait_time",
+        "stealth_mode", "scope"} once the decayed evidence is strong and
+        agrees, else None (use the detector).
+        """
+        if not RENDER_DECISION_CONFIG.get("enabled", True):
+            return None
+
+        now = time.time()
+        template = path_template(url)
+
+        # The path template is more specific; the domain covers unseen templates
+        for scope, key in (("template", template), ("domain", _domain(template))):
+            entry = self.store.get(NAMESPACE, key)
+            if not entry:
+                continue
+            entry = self._decayed(entry, now)
+            total = entry["render"] + entry["static"]
+            if total < self.min_weight:
+                continue
+
+            render_share = entry["render"] / total
+            if render_share >= self.min_agreement:
+                render = True
+            elif render_share <= 1 - self.min_agreement:
+                render = False
+            else:
+                self.stats["undecided"] += 1
+                return None  # Evidence disagrees: let the detector look at the page
+
+            self.stats["decided_render" if render else "decided_static"] += 1
+            return {
+                "render": render,
+                "confidence": round(max(render_share, 1 - render_share), 3),
+                "wait_strategy": self._best_wait_strategy(entry),
+                "wait_time": entry.get("wait_time"),
+                "stealth_mode": entry.get("stealth_mode"),
+                "scope": scope
+            }
+
+        return None
+
+    def wait_strategy_for(self, url: str, default: str = "smart") -> str:
+        """Wait strategy that has worked for this URL's template (or domain)"""
+        template = path_template(url)
+        for key in (template, _domain(template)):
+            entry = self.store.get(NAMESPACE, key)
+            if entry:
+                return self._best_wait_strategy(entry) or default
+        return default
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "entries": len(self.store.namespace(NAMESPACE))
+        }
+
+
+# ============================================================================
+# GLOBAL INSTANCE
+# ============================================================================
+
+_decisions: Optional[RenderDecisions] = None
+
+
+def get_render_decisions() -> RenderDecisions:
+    """Get or create the global render decision cache"""
+    global _decisions
+
+    if _decisions is None:
+        _decisions = RenderDecisions(
+            half_life_hours=RENDER_DECISION_CONFIG.get("half_life_hours", 72),
+            min_weight=RENDER_DECISION_CONFIG.get("min_weight", 3.0),
+            min_agreement=RENDER_DECISION_CONFIG.get("min_agreement", 0.8)
+        )
+
+    return _decisions
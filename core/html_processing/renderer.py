@@ -1,18 +1,29 @@
 import asyncio
 import hashlib
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Page
 import logging
+from core.html_processing.single_flight import SingleFlight
+from core.html_processing.browser_pool import BrowserPool
+from core.html_processing.render_client import get_render_client, RenderWorkersUnavailable
+from core.html_processing.request_blocking import apply_request_blocking, get_blocking_stats
+from core.html_processing.quiescence import install_probe, wait_for_render, get_wait_stats, get_ready_selectors
+from core.html_processing.json_capture import JsonResponseCapture, get_capture_stats
+from core.html_processing.endpoint_registry import get_endpoint_registry
+from core.html_processing.storage_state import (
+    restored_storage_state, save_storage_state, drop_storage_state, get_storage_state_stats, CLEARANCE_COOKIES
+)
+from config.config import RENDER_SERVICE_CONFIG
+from config.config import BROWSER_POOL_CONFIG, RENDER_CACHE_CONFIG, ADAPTIVE_CONCURRENCY_CONFIG
+from storage.lru_cache import ByteBudgetLRU
+from storage.cache_manager import cache_json_payloads, get_captured_json
 
 logger = logging.getLogger(__name__)
-# Global browser instance and cache
-_browser: Optional[Browser] = None
-_playwright = None
-_render_cache = {}  # Simple in-memory cache (use Redis in production)
-_cache_ttl = 3600  # 1 hour cache
-_context = None
-_context_lock = asyncio.Lock()
+# Global browser pool and cache
+_pool: Optional[BrowserPool] = None
+_render_cache = ByteBudgetLRU(**RENDER_CACHE_CONFIG)  # Bounded by bytes, LRU + TTL
+_render_flight = SingleFlight("render")
 
 # Configuration
 BROWSER_CONFIG = {
@@ -38,82 +49,19 @@ BLOCKED_RESOURCES = [
 # Alternative: Only block non-essential (keep CSS for some sites)
 MINIMAL_BLOCK = ["image", "media", "font", "beacon", "csp_report"]
 
-async def init_browser() -> Browser:
-    """Initialize browser once and reuse"""
-    global _browser, _playwright
-    
-    if _browser is None or not _browser.is_connected():
-        try:
-            _playwright = await async_playwright().start()
-            _browser = await _playwright.chromium.launch(**BROWSER_CONFIG)
-            logger.info("✅ Browser initialized")
-        except Exception as e:
-            logger.error(f"❌ Browser init failed: {e}")
-            raise
-    
-    return _browser
-
-
-# async def get_or_create_context(browser: Browser) -> BrowserContext:
-#     """Reuse browser context to save ~2 seconds per request"""
-#     global _context
-    
-#     if _context is None or _context._impl_obj._is_closed_or_closing:
-#         _context = await browser.new_context(
-#             viewport={"width": 1920, "height": 1080},
-#             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-#             locale="en-US",
-#             timezone_id="America/New_York",
-            
-#             # 🔥 SPEED OPTIMIZATIONS
-#             java_script_enabled=True,
-#             bypass_csp=True,  # Bypass Content Security Policy
-#             ignore_https_errors=True,  # Skip SSL verification
-#         )
-#         logger.info("✅ Browser context created")
-    
-#     return _context
-
-async def get_or_create_context(browser):
-    # ...existing code...
-    global _context, _browser
-    _browser = browser
-    # ensure only one coroutine races to create a context
-    async with _context_lock:
-        if _context is None:
-            _context = await browser.new_context()
-            return _context
-
-        # safe attribute checks instead of direct attribute access
-        try:
-            impl = getattr(_context, "_impl_obj", None)
-            closed_flag = False
-            if impl is not None:
-                closed_flag = bool(getattr(impl, "_is_closed_or_closing", False))
-        except Exception:
-            closed_flag = True
-
-        if _context is None or closed_flag:
-            # create a new context if closed or missing
-            try:
-                _context = await browser.new_context()
-            except Exception:
-                # fallback: ensure we clear broken context and re-raise
-                _context = None
-                raise
-        return _context
-
-
 async def create_fast_page(context: BrowserContext, stealth_mode: bool = False) -> Page:
     """Create optimized page with minimal overhead"""
     page = await context.new_page()
     
+    # Activity probe for the quiescence wait (observers only, stealth-safe)
+    await install_probe(page)
+    
     # Only add stealth if needed (saves ~1 second)
     if stealth_mode:
         print("🕵️ Enhanced stealth mode activated")
         
-        # ✅ Add more realistic headers
-        await context.set_extra_http_headers({
+        # ✅ Add more realistic headers (per page: contexts are shared in the pool)
+        await page.set_extra_http_headers({
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
             "Accept-Encoding": "gzip, deflate, br",
@@ -175,172 +123,30 @@ async def create_fast_page(context: BrowserContext, stealth_mode: bool = False)
     return page
 
 
-def get_cache_key(url: str, wait_time: float) -> str:
-    """Generate cache key"""
-    key = f"{url}:{wait_time}"
-    return hashlib.md5(key.encode()).hexdigest()
-
-
-def is_cache_valid(cache_entry: dict) -> bool:
-    """Check cache validity"""
-    if not cache_entry:
-        return False
-    cached_time = datetime.fromisoformat(cache_entry.get("timestamp", "2000-01-01"))
-    return datetime.now() - cached_time < timedelta(seconds=_cache_ttl)
-
-
-
-async def create_stealth_page(browser: Browser) -> Page:
-    """Create a page with stealth settings to avoid detection"""
-    context = await browser.new_context(
-        viewport={"width": 1920, "height": 1080},
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        locale="en-US",
-        timezone_id="America/New_York",
-    )
+def get_browser_pool() -> BrowserPool:
+    """Get or create the process-wide browser pool (browsers launch on first render)"""
+    global _pool
     
-    page = await context.new_page()
-    
-    # Inject stealth scripts to avoid detection
-    await page.add_init_script("""
-        // Remove webdriver flag
-        Object.defineProperty(navigator, 'webdriver', {
-            get: () => false
-        });
-        
-        // Mock plugins
-        Object.defineProperty(navigator, 'plugins', {
-            get: () => [1, 2, 3, 4, 5]
-        });
-        
-        // Mock languages
-        Object.defineProperty(navigator, 'languages', {
-            get: () => ['en-US', 'en']
-        });
-        
-        // Chrome runtime
-        window.chrome = { runtime: {} };
-        
-        // Permissions
-        const originalQuery = window.navigator.permissions.query;
-        window.navigator.permissions.query = (parameters) => (
-            parameters.name === 'notifications' ?
-                Promise.resolve({ state: Notification.permission }) :
-                originalQuery(parameters)
-        );
-    """)
+    if _pool is None:
+        _pool = BrowserPool(
+            launch_options=BROWSER_CONFIG,
+            page_factory=create_fast_page,
+            **BROWSER_POOL_CONFIG
+        )
     
-    return page
+    return _pool
 
 
-async def fetch_html_js(
-    url: str,
-    wait_time: float = 1.5,  # 🔥 Reduced from 2.0s
-    timeout: int = 20000,    # 🔥 Reduced from 30s (fail fast)
-    block_resources: bool = True,
-    use_cache: bool = True,
-    stealth_mode: bool = False,
-    wait_strategy: str = "smart"  # 🔥 NEW: smart, fast, thorough
-) -> Tuple[str, str]:
-    """
-    Optimized HTML fetching with Playwright
-    
-    wait_strategy options:
-    - "smart": Try domcontentloaded, fallback to networkidle (default)
-    - "fast": Only domcontentloaded (~3-5s faster, might miss lazy content)
-    - "thorough": Use networkidle (~5-8s slower, gets everything)
-    """
-    
-    # Check cache
-    if use_cache:
-        cache_key = get_cache_key(url, wait_time)
-        cached = _render_cache.get(cache_key)
-        if cached and is_cache_valid(cached):
-            logger.info(f"📦 Cache HIT: {url}")
-            return cached["html"], cached["final_url"]
-    
-    logger.info(f"🌐 Rendering: {url} (strategy: {wait_strategy})")
-    start_time = asyncio.get_event_loop().time()
-    
-    browser = await init_browser()
-    context = await get_or_create_context(browser)  # 🔥 Reuse context
-    page = await create_fast_page(context, stealth_mode)
-    
-    try:
-        # Block resources (saves 60-70% time)
-        if block_resources:
-            await page.route("**/*", lambda route: (
-                route.abort() if route.request.resource_type in BLOCKED_RESOURCES
-                else route.continue_()
-            ))
-        
-        # 🔥 SMART WAIT STRATEGY
-        if wait_strategy == "fast":
-            # Fastest: Just wait for DOM (3-5s)
-            await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-        
-        elif wait_strategy == "thorough":
-            # Slowest but most complete (10-15s)
-            await page.goto(url, timeout=timeout, wait_until="networkidle")
-        
-        else:  # "smart" (default)
-            # Try fast first, fallback to thorough if needed
-            try:
-                await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-                
-                # Quick check: Did we get content?
-                content_check = await page.evaluate("""
-                    () => {
-                        const body = document.body.innerText;
-                        return body.length > 1000;  // Has meaningful content?
-                    }
-                """)
-                
-                if not content_check:
-                    # Not enough content, wait for networkidle
-                    logger.info("⏳ Waiting for more content...")
-                    await page.wait_for_load_state("networkidle", timeout=10000)
-                
-            except Exception:
-                # Fallback to networkidle
-                await page.goto(url, timeout=timeout, wait_until="networkidle")
-        
-        # Reduced wait time for lazy content
-        await asyncio.sleep(wait_time)
-        
-        # 🔥 PARALLEL EXTRACTION - Get URL while getting content
-        html_task = page.content()
-        url_task = page.evaluate("window.location.href")
-        
-        html, final_url = await asyncio.gather(html_task, url_task)
-        
-        # Cache result
-        if use_cache:
-            cache_key = get_cache_key(url, wait_time)
-            _render_cache[cache_key] = {
-                "html": html,
-                "final_url": final_url,
-                "timestamp": datetime.now().isoformat()
-            }
-        
-        elapsed = asyncio.get_event_loop().time() - start_time
-        logger.info(f"✅ Rendered in {elapsed:.2f}s: {len(html):,} chars")
-        
-        return html, final_url
-    
-    except Exception as e:
-        logger.error(f"❌ Rendering failed: {e}")
-        raise
-    
-    finally:
-        # Only close page, keep context alive
-        await page.close()
+def get_cache_key(url: str, wait_time: float) -> str:
+    """Generate cache key"""
+    key = f"{url}:{wait_time}"
+    return hashlib.md5(key.encode()).hexdigest()
 
 
 async def fetch_multiple_urls(
     urls: list[str],
     wait_time: float = 1.5,
-    max_concurrent: int = 3,  # 🔥 Process 3 pages simultaneously
+    max_concurrent: Optional[int] = None,  # Defaults to the pool's page capacity
     **kwargs
 ) -> list[dict]:
     """
@@ -356,7 +162,8 @@ async def fetch_multiple_urls(
         except Exception as e:
             return {"url": url, "html": None, "final_url": None, "error": str(e)}
     
-    # Create semaphore to limit concurrency
+    # Create semaphore to limit concurrency (the pool caps pages anyway)
+    max_concurrent = max_concurrent or get_browser_pool().capacity
     semaphore = asyncio.Semaphore(max_concurrent)
     
     async def fetch_with_limit(url: str) -> dict:
@@ -369,58 +176,44 @@ async def fetch_multiple_urls(
     
     return results
 
-# async def cleanup_browser():
-#     """Cleanup browser resources (call on shutdown)"""
-#     global _browser, _playwright
-    
-#     if _browser:
-#         await _browser.close()
-#         _browser = None
-    
-#     if _playwright:
-#         await _playwright.stop()
-#         _playwright = None
-
 async def cleanup_browser():
-    """Close context and browser safely (call on shutdown)."""
-    global _context, _browser
-    try:
-        if _context is not None:
-            try:
-                await _context.close()
-            except Exception:
-                pass
-            _context = None
-    finally:
-        if _browser is not None:
-            try:
-                await _browser.close()
-            except Exception:
-                pass
-            _browser = None    
+    """Close the browser pool (call on shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
     logger.info("🧹 Browser cleanup completed")
 
 
 async def clear_cache():
     """Clear render cache (useful for testing)"""
-    global _render_cache
-    _render_cache = {}
+    _render_cache.clear()
     logger.info("🗑️ Cache cleared")
 
 
 
-from core.html_processing.advance_stealth_mode import MultiSignalDetector, CostFreeSolver, ProtectionType
+from core.html_processing.advance_stealth_mode import CostFreeSolver, ProtectionType
+from core.html_processing.knowledge_service import get_knowledge_service
+from core.html_processing.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from core.html_processing.adaptive_concurrency import get_concurrency_controller, parse_retry_after, BACKOFF_STATUSES
 
 # Performance monitoring
 async def get_cache_stats() -> dict:
     """Get cache statistics"""
-    valid_entries = sum(1 for entry in _render_cache.values() if is_cache_valid(entry))
+    lru_stats = _render_cache.get_stats()
     
     return {
-        "total_cached": len(_render_cache),
-        "valid_entries": valid_entries,
-        "expired_entries": len(_render_cache) - valid_entries,
-        "cache_ttl": _cache_ttl
+        "total_cached": lru_stats["entries"],
+        "cache_ttl": lru_stats["ttl"],
+        "lru": lru_stats,
+        "single_flight": _render_flight.get_stats(),
+        "browser_pool": _pool.get_stats() if _pool else None,
+        "render_workers": get_render_client().get_stats() if get_render_client() else None,
+        "request_blocking": get_blocking_stats(),
+        "render_wait": get_wait_stats(),
+        "json_capture": get_capture_stats(),
+        "endpoint_replay": get_endpoint_registry().get_stats(),
+        "storage_state": get_storage_state_stats()
     }
 
 
@@ -432,60 +225,203 @@ async def fetch_html_js(
     use_cache: bool = True,
     stealth_mode: bool = False,
     wait_strategy: str = "smart",
-    try_auto_solve: bool = True  # 🔥 New parameter
+    try_auto_solve: bool = True,  # 🔥 New parameter
+    allow_remote: bool = True,    # Use render workers when RENDER_WORKER_URLS is set
+    ready_selectors: Optional[List[str]] = None,
+    capture_json: bool = False
 ) -> Tuple[str, str]:
     """
     Optimized HTML fetching with Playwright + Auto-Solving
+
+    wait_strategy "smart" returns as soon as the DOM has settled (wait_time
+    is the upper bound); "fixed" always sleeps wait_time.
+    ready_selectors finish a "smart" render as soon as they match elements
+    with content, if the DOM hasn't settled first. None uses the selectors
+    that already extracted data on pages with this URL's path template;
+    pass [] to opt out.
+    capture_json records the page's JSON API responses while it renders;
+    read them afterwards with storage.cache_manager.get_captured_json(url).
+    Raises CircuitOpenError while the domain's circuit is open.
     """
     
-    # Check cache
+    # Check cache (a capture render also needs the payloads from last time)
     if use_cache:
         cache_key = get_cache_key(url, wait_time)
         cached = _render_cache.get(cache_key)
-        if cached and is_cache_valid(cached):
+        if cached and capture_json and await get_captured_json(url) is None:
+            cached = None
+        if cached:
             logger.info(f"📦 Cache HIT: {url}")
             return cached["html"], cached["final_url"]
     
+    # Blocked / failing domain: don't spend a browser on it
+    breaker = get_circuit_breaker()
+    breaker.check(url)
+    
+    if ready_selectors is None:
+        ready_selectors = get_ready_selectors(url)
+    
+    # Concurrent renders of the same page share one browser tab
+    key = (url, wait_time, block_resources, stealth_mode, wait_strategy, try_auto_solve, tuple(ready_selectors), capture_json)
+    render = _render_page
+    if allow_remote and get_render_client() is not None:
+        render = _render_remote
+    
+    async def render_and_report():
+        try:
+            return await render(
+                url, wait_time, timeout, block_resources, use_cache,
+                stealth_mode, wait_strategy, try_auto_solve, ready_selectors, capture_json
+            )
+        except CircuitOpenError:
+            # A worker's breaker refused it: nothing was fetched, nothing to count
+            raise
+        except Exception as e:
+            breaker.record_failure(url, f"render error: {type(e).__name__}")
+            raise
+    
+    try:
+        return await _render_flight.do(key, render_and_report)
+    finally:
+        breaker.release_probe(url)
+
+
+async def _render_remote(
+    url: str,
+    wait_time: float,
+    timeout: int,
+    block_resources: bool,
+    use_cache: bool,
+    stealth_mode: bool,
+    wait_strategy: str,
+    try_auto_solve: bool,
+    ready_selectors: List[str],
+    capture_json: bool
+) -> Tuple[str, str]:
+    """Render on an out-of-process worker (keeps Chromium off this event loop)"""
+    
+    try:
+        html, final_url, payloads = await get_render_client().render(
+            url,
+            wait_time=wait_time,
+            timeout=timeout,
+            block_resources=block_resources,
+            stealth_mode=stealth_mode,
+            wait_strategy=wait_strategy,
+            try_auto_solve=try_auto_solve,
+            ready_selectors=ready_selectors,
+            capture_json=capture_json
+        )
+    except RenderWorkersUnavailable:
+        if not RENDER_SERVICE_CONFIG.get("fallback_local", True):
+            raise
+        logger.warning("⚠️ No render worker reachable, rendering in-process")
+        return await _render_page(
+            url, wait_time, timeout, block_resources, use_cache,
+            stealth_mode, wait_strategy, try_auto_solve, ready_selectors, capture_json
+        )
+    
+    # The worker handled protections; a returned page counts as reachable
+    get_circuit_breaker().record_success(url)
+    
+    if capture_json:
+        await cache_json_payloads(url, payloads)
+        get_endpoint_registry().observe(url, payloads)
+    
+    if use_cache:
+        _render_cache.set(get_cache_key(url, wait_time), html, final_url=final_url)
+    
+    return html, final_url
+
+
+async def _render_page(
+    url: str,
+    wait_time: float,
+    timeout: int,
+    block_resources: bool,
+    use_cache: bool,
+    stealth_mode: bool,
+    wait_strategy: str,
+    try_auto_solve: bool,
+    ready_selectors: List[str],
+    capture_json: bool
+) -> Tuple[str, str]:
+    """Render one page (cache miss path of fetch_html_js)"""
+    
     logger.info(f"🌐 Rendering: {url} (strategy: {wait_strategy})")
     start_time = asyncio.get_event_loop().time()
     
-    browser = await init_browser()
-    context = await get_or_create_context(browser)
-    page = await create_fast_page(context, stealth_mode)
+    # Warm page from the pool (returned, not closed, when done)
+    async with get_browser_pool().page(stealth_mode) as page:
+        return await _render_on_page(
+            page, url, wait_time, timeout, block_resources, use_cache,
+            wait_strategy, try_auto_solve, ready_selectors, capture_json, start_time
+        )
+
+
+async def _render_on_page(
+    page: Page,
+    url: str,
+    wait_time: float,
+    timeout: int,
+    block_resources: bool,
+    use_cache: bool,
+    wait_strategy: str,
+    try_auto_solve: bool,
+    ready_selectors: List[str],
+    capture_json: bool,
+    start_time: float
+) -> Tuple[str, str]:
+    """Navigate, wait, solve protections and capture HTML on a pooled page"""
+    
+    context = page.context
+    capture = JsonResponseCapture(page) if capture_json else None
     
     try:
-        # Block resources
-        if block_resources:
-            await page.route("**/*", lambda route: (
-                route.abort() if route.request.resource_type in BLOCKED_RESOURCES
-                else route.continue_()
-            ))
+        # Block third-party hosts (always) + heavy resource types (optional)
+        await apply_request_blocking(page, url, block_resources, BLOCKED_RESOURCES)
         
-        # Navigate
-        try:
-            response = await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-            status_code = response.status if response else 0
-        except Exception as e:
-            logger.warning(f"⚠️ Navigation warning: {e}")
-            status_code = 0
-
-        # Wait
-        await asyncio.sleep(wait_time)
+        if capture:
+            capture.start()
         
-        # DETECT PROTECTIONS
-        detector = MultiSignalDetector()
+        # Navigate (with the domain's saved clearance cookies / localStorage)
+        rate_limit_headers = {}
+        nav_started = asyncio.get_event_loop().time()
+        async with restored_storage_state(page, url) as state_restored:
+            try:
+                response = await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+                status_code = response.status if response else 0
+                if status_code in BACKOFF_STATUSES:
+                    rate_limit_headers = {k: v for k, v in response.headers.items() if k == "retry-after"}
+            except Exception as e:
+                logger.warning(f"⚠️ Navigation warning: {e}")
+                status_code = 0
+        
+        # Navigation latency and 429/503s drive the domain's concurrency
+        controller = get_concurrency_controller()
+        retry_after = parse_retry_after(rate_limit_headers.get("retry-after"))
+        if status_code:
+            controller.on_response(
+                url, status_code, asyncio.get_event_loop().time() - nav_started,
+                kind="render", retry_after=retry_after
+            )
+
+        # Wait until the data is there / the DOM settles (wait_time is the upper bound)
+        await wait_for_render(page, wait_time, wait_strategy, ready_selectors)
+        
+        # DETECT PROTECTIONS (shared detector: timing baselines + history across jobs)
+        knowledge = get_knowledge_service()
         html = await page.content()
         final_url = page.url
         
-        # Get headers/cookies for detection
+        # Get headers/cookies for detection (only a rate-limited response's Retry-After:
+        # rate-limit headers on normal responses are informational)
         cookies = {c['name']: c['value'] for c in await context.cookies()}
-        # Note: We don't easily get response headers here without response interception, 
-        # but we can pass empty headers to detector for now or improve this later.
-        headers = {} 
+        headers = rate_limit_headers
         
         elapsed_nav = asyncio.get_event_loop().time() - start_time
         
-        signal = detector.detect_protection(
+        signal = knowledge.detect_protection(
             url=final_url,
             html=html,
             status_code=status_code,
@@ -494,16 +430,24 @@ async def fetch_html_js(
             response_time=elapsed_nav
         )
         
+        timing_signals = [s for s in signal.signals if s.startswith("timing_")]
+        if timing_signals:
+            controller.on_timing_anomaly(url, timing_signals[0])
+        
+        solved = False
         if signal.protection_type != ProtectionType.NONE:
             logger.info(f"🛡️ Protection detected: {signal.protection_type.value} (Confidence: {signal.confidence})")
             
+            # Saved clearance didn't get us through: don't keep loading it
+            if state_restored:
+                await drop_storage_state(url)
+            
             if try_auto_solve:
                 solver = CostFreeSolver()
                 
                 if not solver.should_give_up(signal.protection_type):
                     logger.info(f"🔧 Attempting to solve {signal.protection_type.value}...")
                     
-                    solved = False
                     if signal.protection_type == ProtectionType.CF_BROWSER_CHECK:
                         solved = await solver.solve_cf_browser_check(page)
                     elif signal.protection_type == ProtectionType.CF_TURNSTILE_INVISIBLE:
@@ -513,28 +457,59 @@ async def fetch_html_js(
                     elif signal.protection_type in [ProtectionType.DATADOME_COOKIE, ProtectionType.PX_COOKIE]:
                         solved = await solver.solve_with_cookies(page, url)
                     elif signal.protection_type == ProtectionType.BASIC_RATE_LIMIT:
-                        logger.info("⏳ Rate limit detected, waiting...")
-                        await asyncio.sleep(5)
-                        solved = True
+                        # Concurrency was already cut; wait out the backoff once if it's short
+                        delay = controller.on_rate_limited(url, retry_after)
+                        if delay <= ADAPTIVE_CONCURRENCY_CONFIG.get("max_inline_backoff", 10.0):
+                            logger.info(f"⏳ Rate limit detected, retrying in {delay:.1f}s...")
+                            await asyncio.sleep(delay)
+                            try:
+                                response = await page.reload(timeout=timeout, wait_until="domcontentloaded")
+                                solved = response is not None and response.status not in BACKOFF_STATUSES
+                            except Exception as e:
+                                logger.warning(f"⚠️ Reload after rate limit failed: {e}")
+                        else:
+                            logger.warning(f"⏳ Rate limited for {delay:.0f}s, not waiting in the browser")
                     
                     if solved:
                         logger.info("✅ Protection solved! Refreshing content...")
                         await asyncio.sleep(1)
                         html = await page.content()
                         final_url = page.url
+                        # Solve once per clearance lifetime, not once per render
+                        await save_storage_state(page, url, force=True)
                     else:
                         logger.warning("❌ Failed to solve protection.")
                 else:
                     logger.warning("⛔ Protection considered unsolvable free.")
         
+        elif any(name.startswith(CLEARANCE_COOKIES) for name in cookies):
+            # Passed a silent check during the wait: keep its cookies if new
+            await save_storage_state(page, url)
+        
+        # Outcome shared with every crawler / batch job (success rates, best technique)
+        knowledge.record_attempt(
+            domain=urlparse(url).netloc,
+            protection_type=signal.protection_type,
+            technique_used="playwright_auto" if try_auto_solve else "playwright",
+            success=signal.protection_type == ProtectionType.NONE or solved,
+            response_time=elapsed_nav
+        )
+        
+        # Unsolvable protection opens the domain's circuit at once; unsolved ones count
+        if signal.protection_type == ProtectionType.NONE or solved:
+            get_circuit_breaker().record_success(url)
+        else:
+            get_circuit_breaker().record_failure(url, signal.protection_type.value, fatal=CostFreeSolver.should_give_up(signal.protection_type))
+        
+        # JSON bodies must be read before the page goes back to the pool
+        if capture:
+            payloads = await capture.collect()
+            await cache_json_payloads(url, payloads)
+            get_endpoint_registry().observe(url, payloads)
+        
         # Cache result
         if use_cache:
-            cache_key = get_cache_key(url, wait_time)
-            _render_cache[cache_key] = {
-                "html": html,
-                "final_url": final_url,
-                "timestamp": datetime.now().isoformat()
-            }
+            _render_cache.set(get_cache_key(url, wait_time), html, final_url=final_url)
         
         elapsed = asyncio.get_event_loop().time() - start_time
         logger.info(f"✅ Rendered in {elapsed:.2f}s: {len(html):,} chars")
@@ -543,7 +518,6 @@ async def fetch_html_js(
     
     except Exception as e:
         logger.error(f"❌ Rendering failed: {e}")
+        if capture:
+            capture.stop()
         raise
-    
-    finally:
-        await page.close()
@@ -0,0 +1,186 @@
+"""
+Native request blocking for renders
+Blocking rules are handed to Chromium as Fetch interception patterns (URL
+wildcards + resource types), so allowed requests never leave the browser.
+Only requests that match a rule come back to us, and they are failed
+immediately. Third-party hosts (ads, analytics, tag managers) come from
+config/blocklist.txt and can be updated at runtime.
+"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+import logging
+
+from playwright.async_api import CDPSession, Page
+
+from config.settings import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+BLOCKLIST_PATH = os.path.join(BASE_DIR, "config", "blocklist.txt")
+
+# Playwright resource types -> CDP Fetch resource types
+RESOURCE_TYPES = {
+    "image": "Image",
+    "imageset": "Image",
+    "media": "Media",
+    "font": "Font",
+    "stylesheet": "Stylesheet",
+    "beacon": "Ping",
+    "csp_report": "CSPViolationReport",
+}
+
+_blocked_hosts: Set[str] = set()
+_sessions: Dict[Page, CDPSession] = {}
+
+stats = {
+    "pages_native": 0,        # Pages using CDP patterns
+    "pages_fallback": 0,      # Pages using page.route (non-Chromium)
+    "requests_blocked": 0,
+}
+
+
+# ============================================================================
+# BLOCKLIST
+# ============================================================================
+
+def _normalize_host(host: str) -> str:
+    host = host.strip().lower()
+    if "://" in host:
+        host = urlparse(host).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def load_blocklist(path: str = BLOCKLIST_PATH) -> int:
+    """(Re)load the curated host list; returns the number of hosts"""
+    hosts = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    hosts.add(_normalize_host(line))
+    except FileNotFoundError:
+        logger.warning(f"⚠️ Blocklist not found: {path}")
+
+    _blocked_hosts.clear()
+    _blocked_hosts.update(hosts)
+    logger.info(f"🚫 Blocklist loaded: {len(hosts)} hosts")
+    return len(hosts)
+
+
+def add_blocked_hosts(hosts: Iterable[str]):
+    _blocked_hosts.update(_normalize_host(h) for h in hosts if h.strip())
+
+
+def remove_blocked_hosts(hosts: Iterable[str]):
+    _blocked_hosts.difference_update(_normalize_host(h) for h in hosts)
+
+
+def get_blocked_hosts() -> List[str]:
+    return sorted(_blocked_hosts)
+
+
+def _is_first_party(host: str, page_host: str) -> bool:
+    return page_host == host or page_host.endswith("." + host) or host.endswith("." + page_host)
+
+
+def build_patterns(url: str, block_resources: bool, blocked_types: Iterable[str]) -> List[dict]:
+    """
+    Fetch.RequestPattern list for one render
+
+    Hosts belonging to the page being rendered are never blocked, so
+    scraping e.g. hubspot.com itself still works.
+    """
+    page_host = _normalize_host(urlparse(url).hostname or "")
+    patterns = []
+
+    for host in _blocked_hosts:
+        if _is_first_party(host, page_host):
+            continue
+        patterns.append({"urlPattern": f"*://{host}/*"})
+        patterns.append({"urlPattern": f"*.{host}/*"})
+
+    if block_resources:
+        for resource_type in sorted({RESOURCE_TYPES[t] for t in blocked_types if t in RESOURCE_TYPES}):
+            patterns.append({"urlPattern": "*", "resourceType": resource_type})
+
+    return patterns
+
+
+# ============================================================================
+# APPLY TO PAGES
+# ============================================================================
+
+async def get_cdp_session(page: Page) -> Optional[CDPSession]:
+    """One CDP session per (pooled) page; None outside Chromium"""
+    session = _sessions.get(page)
+    if session is not None:
+        return session
+
+    try:
+        session = await page.context.new_cdp_session(page)
+    except Exception:
+        return None
+
+    def on_paused(event):
+        stats["requests_blocked"] += 1
+        asyncio.ensure_future(_fail(session, event["requestId"]))
+
+    session.on("Fetch.requestPaused", on_paused)
+    page.once("close", lambda _: _sessions.pop(page, None))
+    _sessions[page] = session
+    return session
+
+
+async def _fail(session: CDPSession, request_id: str):
+    try:
+        await session.send("Fetch.failRequest", {"requestId": request_id, "errorReason": "BlockedByClient"})
+    except Exception:
+        pass  # Page navigated away / closed
+
+
+async def apply_request_blocking(page: Page, url: str, block_resources: bool, blocked_types: Iterable[str]):
+    """
+    Install this render's blocking rules on a page (replaces the previous
+    render's rules on a reused page)
+    """
+    patterns = build_patterns(url, block_resources, blocked_types)
+    session = await get_cdp_session(page)
+
+    if session is not None:
+        if patterns:
+            await session.send("Fetch.enable", {"patterns": patterns})
+        else:
+            await session.send("Fetch.disable")
+        stats["pages_native"] += 1
+        return
+
+    # Non-Chromium fallback: Python callback per request
+    if not patterns:
+        return
+    types = set(blocked_types) if block_resources else set()
+    page_host = _normalize_host(urlparse(url).hostname or "")
+
+    def should_block(request) -> bool:
+        if request.resource_type in types:
+            return True
+        host = _normalize_host(urlparse(request.url).hostname or "")
+        return any(
+            (host == h or host.endswith("." + h)) and not _is_first_party(h, page_host)
+            for h in _blocked_hosts
+        )
+
+    await page.route("**/*", lambda route: (
+        route.abort() if should_block(route.request) else route.continue_()
+    ))
+    stats["pages_fallback"] += 1
+
+
+def get_blocking_stats() -> dict:
+    return {**stats, "blocked_hosts": len(_blocked_hosts)}
+
+
+load_blocklist()
@@ -0,0 +1,61 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight fetch/render
+instead of each missing the cache and doing the work again.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    In-flight map: key -> shared task
+
+    Usage:
+        html = await flight.do(url, lambda: expensive_fetch(url))
+
+    The first caller (leader) starts the task; callers arriving while it runs
+    await the same task. Each caller is shielded, so one caller being
+    cancelled (client disconnect, timeout) never cancels the work for the
+    others. The key is dropped once the task finishes, so later callers go
+    back through the cache.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.leaders += 1
+        else:
+            self.shared += 1
+            logger.info(f"🔗 Joined in-flight {self.name}: {key}")
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> dict:
+        total = self.leaders + self.shared
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.leaders,
+            "coalesced": self.shared,
+            "coalesce_rate": round(self.shared / total * 100, 2) if total else 0.0
+        }
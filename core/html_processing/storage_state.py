@@ -0,0 +1,165 @@
+"""
+Per-domain storage state (clearance cookies + localStorage)
+Once a Cloudflare/DataDome/PerimeterX challenge is solved, the cookies it
+set are saved per domain and loaded into the (pooled) context before the
+next navigation, so a domain is solved once per clearance lifetime instead
+of once per render.
+"""
+
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from urllib.parse import urlparse
+import logging
+
+from playwright.async_api import Page
+
+from core.html_processing.request_blocking import get_cdp_session
+from storage.cache_manager import get_cache_manager
+from config.config import STORAGE_STATE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Cookies that prove a passed bot check
+CLEARANCE_COOKIES = (
+    "cf_clearance", "__cf_bm", "datadome", "_px", "_pxhd", "_px2", "_px3", "_pxvid",
+    "ak_bmsc", "bm_sv", "_abck", "incap_ses", "visid_incap", "reese84"
+)
+
+stats = {
+    "loaded": 0,
+    "saved": 0,
+    "invalidated": 0,
+}
+
+
+def _site(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _same_site(domain: str, site: str) -> bool:
+    domain = domain.lstrip(".").lower()
+    domain = domain[4:] if domain.startswith("www.") else domain
+    return domain == site or site.endswith("." + domain) or domain.endswith("." + site)
+
+
+def _is_clearance(cookie: dict) -> bool:
+    return cookie["name"].startswith(CLEARANCE_COOKIES)
+
+
+async def get_storage_state(url: str) -> Optional[dict]:
+    """Saved state for url's domain, without cookies that have expired since"""
+    state = await get_cache_manager().get("storage_state", _site(url))
+    if not state:
+        return None
+
+    now = time.time()
+    cookies = [c for c in state["cookies"] if c.get("expires", -1) <= 0 or c["expires"] > now]
+    return {**state, "cookies": cookies}
+
+
+async def save_storage_state(page: Page, url: str, force: bool = False) -> bool:
+    """
+    Save the domain's cookies + localStorage from the page's context
+
+    Without force, only saves when clearance cookies are present and differ
+    from what's stored.
+    """
+    site = _site(url)
+    state = await page.context.storage_state()
+
+    cookies = [c for c in state.get("cookies", []) if _same_site(c.get("domain", ""), site)]
+    clearance = {c["name"]: c["value"] for c in cookies if _is_clearance(c)}
+    if not clearance and not force:
+        return False
+
+    if not force:
+        saved = await get_storage_state(url)
+        if saved and clearance == {c["name"]: c["value"] for c in saved["cookies"] if _is_clearance(c)}:
+            return False
+
+    origins = [o for o in state.get("origins", []) if _same_site(urlparse(o["origin"]).hostname or "", site)]
+
+    # Live as long as the shortest clearance cookie (session cookies: default TTL)
+    now = time.time()
+    expiries = [c["expires"] - now for c in cookies if _is_clearance(c) and c.get("expires", -1) > 0]
+    ttl = min(expiries) if expiries else STORAGE_STATE_CONFIG.get("default_ttl", 1800)
+    ttl = int(min(ttl, STORAGE_STATE_CONFIG.get("max_ttl", 86400)))
+    if ttl <= 0:
+        return False
+
+    await get_cache_manager().set("storage_state", site, {
+        "cookies": cookies,
+        "origins": origins,
+        "saved_at": now
+    }, ttl=ttl)
+    stats["saved"] += 1
+    logger.info(f"🍪 Saved storage state for {site}: {len(cookies)} cookies, {list(clearance)} (ttl {ttl}s)")
+    return True
+
+
+async def drop_storage_state(url: str):
+    """Forget a domain's state (it no longer gets us past the challenge)"""
+    await get_cache_manager().delete("storage_state", _site(url))
+    stats["invalidated"] += 1
+
+
+async def _restore_local_storage(page: Page, origins: List[dict]) -> List[str]:
+    """Seed localStorage on matching documents of the next navigation (Chromium only)"""
+    session = await get_cdp_session(page)
+    if session is None:
+        return []
+
+    script_ids = []
+    for origin in origins:
+        items = [[i["name"], i["value"]] for i in origin.get("localStorage", [])]
+        if not items:
+            continue
+        source = (
+            f"(() => {{ if (location.origin !== {json.dumps(origin['origin'])}) return;"
+            f" try {{ for (const [k, v] of {json.dumps(items)}) localStorage.setItem(k, v); }} catch (e) {{}} }})();"
+        )
+        result = await session.send("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        script_ids.append(result["identifier"])
+    return script_ids
+
+
+@asynccontextmanager
+async def restored_storage_state(page: Page, url: str):
+    """
+    Load the domain's saved cookies + localStorage for a navigation
+
+    Usage:
+        async with restored_storage_state(page, url) as restored:
+            await page.goto(url)
+    """
+    state = await get_storage_state(url) if STORAGE_STATE_CONFIG.get("enabled", True) else None
+    script_ids = []
+
+    if state and state["cookies"]:
+        try:
+            await page.context.add_cookies(state["cookies"])
+            script_ids = await _restore_local_storage(page, state.get("origins", []))
+            stats["loaded"] += 1
+            logger.info(f"🍪 Loaded storage state for {_site(url)}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load storage state for {_site(url)}: {e}")
+            state = None
+
+    try:
+        yield bool(state and state["cookies"])
+    finally:
+        # Seeding scripts are for this navigation only (the page is pooled)
+        if script_ids:
+            session = await get_cdp_session(page)
+            for script_id in script_ids:
+                try:
+                    await session.send("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+                except Exception:
+                    pass
+
+
+def get_storage_state_stats() -> dict:
+    return dict(stats)
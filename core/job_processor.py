@@ -6,6 +6,7 @@ from typing import List
 from datetime import datetime
 from core.html_processing.fetcher import fetch_html, get_domain
 from core.extraction.smart_extractor import smart_extract
+from core.extraction.meta_extractor import is_meta_request
 from storage.jobs_db import update_job
 from storage.analytics_db import track_request, track_prompt
 
@@ -19,6 +20,9 @@ async def process_scraping_job(job_id: str, urls: List[str], prompt: str):
     # Track prompt
     track_prompt(prompt)
     
+    # SEO/meta prompts only need the <head>
+    meta_only = is_meta_request(prompt)
+    
     # Group URLs by domain
     domain_map = {}
     for url in urls:
@@ -35,7 +39,7 @@ async def process_scraping_job(job_id: str, urls: List[str], prompt: str):
         for idx, url in enumerate(domain_urls):
             try:
                 # Fetch HTML
-                html = await fetch_html(url)
+                html = await fetch_html(url, meta_only=meta_only)
                 
                 # Extract data
                 extracted = await smart_extract(
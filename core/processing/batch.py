@@ -5,16 +5,25 @@ Includes: Progress tracking, resume capability, parallel processing
 
 import asyncio
 import json
+import time
 import csv
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
-import httpx
 from tqdm import tqdm
 import logging
 from core.html_processing.renderer import fetch_html_js, fetch_multiple_urls
 from core.html_processing.detector import get_rendering_strategy
-from config.config import BATCH_CONFIG
+from core.html_processing.http_client import fetch_static_html
+from core.html_processing.host_scheduler import get_host_scheduler, get_host_key
+from core.html_processing.circuit_breaker import get_circuit_breaker, CircuitOpenError
+from core.processing.retry import (
+    RetryPolicy, DeferredRetryQueue, LatencyTracker, RetryItem,
+    classify_error, get_retry_after, hedged,
+    PROTECTION, RATE_LIMITED, SERVER_ERROR, NETWORK, CLIENT_ERROR, NOT_HTML
+)
+from config.config import BATCH_CONFIG, JSON_CAPTURE_CONFIG
+from storage.cache_manager import get_captured_json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,10 +50,28 @@ class BatchProcessor:
         self.results_file = self.output_dir / f"{job_id}_results.jsonl"
         self.failed_file = self.output_dir / f"{job_id}_failed.json"
         
+        # Retries: failed URLs are deferred, not retried inside their chunk
+        self.retry_failed = BATCH_CONFIG.get("retry_failed", True)
+        self.retry_policy = RetryPolicy(
+            max_retries=BATCH_CONFIG.get("max_retries", 2),
+            base_delay=BATCH_CONFIG.get("retry_base_delay", 1.0),
+            max_delay=BATCH_CONFIG.get("retry_max_delay", 30.0),
+            max_deferrals=BATCH_CONFIG.get("max_circuit_deferrals", 10)
+        )
+        self.retry_queue = DeferredRetryQueue()
+        
+        # Hedging: second GET for static fetches slower than the host's p95
+        self.hedge_requests = BATCH_CONFIG.get("hedge_requests", False)
+        self.latency = LatencyTracker()
+        
         self.stats = {
             "total": 0,
             "completed": 0,
             "failed": 0,
+            "retried": 0,
+            "deferred": 0,          # Waited for a domain's circuit to close
+            "recovered": 0,
+            "hedged": 0,
             "js_rendered": 0,
             "static_only": 0,
             "start_time": None,
@@ -92,18 +119,22 @@ class BatchProcessor:
                 
                 results = await self._process_batch_chunk(batch, prompt)
                 
-                # Save results incrementally
-                self._save_results(results)
-                self._save_progress([r["url"] for r in results])
-                
-                # Update stats
-                self.stats["completed"] += len([r for r in results if not r.get("error")])
-                self.stats["failed"] += len([r for r in results if r.get("error")])
+                # Retries whose backoff elapsed ride along with the next chunk
+                due = self.retry_queue.pop_due()
+                if due:
+                    results += await self._process_retries(due, prompt)
                 
-                pbar.update(len(batch))
+                pbar.update(self._record_results(results))
                 
                 # Small delay between batches
                 await asyncio.sleep(0.5)
+            
+            # Drain the deferred retries
+            while len(self.retry_queue):
+                await self.retry_queue.wait_next()
+                due = self.retry_queue.pop_due()
+                results = await self._process_retries(due, prompt)
+                pbar.update(self._record_results(results))
         
         # Final cleanup
         self.stats["end_time"] = datetime.now().isoformat()
@@ -115,13 +146,77 @@ class BatchProcessor:
         return self.stats
     
     
-    async def _process_batch_chunk(self, urls: List[str], prompt: str) -> List[Dict]:
+    def _record_results(self, results: List[Dict]) -> int:
+        """Defer retryable failures, save the rest; returns how many URLs finished"""
+        
+        final = []
+        for result in results:
+            attempt = result.get("attempt", 0)
+            error_kind = result.get("error_kind")
+            deferrals = result.get("deferrals", 0)
+            
+            if result.get("error") and self.retry_failed and self.retry_policy.should_defer(error_kind, deferrals):
+                # No request went out: same attempt again once the cool-down has passed
+                delay = result.get("retry_after") or self.retry_policy.backoff(attempt, error_kind)
+                self.retry_queue.push(result["url"], attempt, delay, error_kind, result["error"], deferrals + 1)
+                self.stats["deferred"] += 1
+                logger.info(f"⏸️ Deferred {delay:.1f}s (circuit open): {result['url']}")
+                continue
+            
+            if result.get("error") and self.retry_failed and self.retry_policy.should_retry(error_kind, attempt):
+                delay = self.retry_policy.backoff(attempt, error_kind, result.get("retry_after"))
+                self.retry_queue.push(result["url"], attempt + 1, delay, error_kind, result["error"])
+                self.stats["retried"] += 1
+                logger.info(f"🔁 Retry {attempt + 1} in {delay:.1f}s ({error_kind}): {result['url']}")
+                continue
+            
+            if result.get("error"):
+                self.failed_urls.append({
+                    "url": result["url"],
+                    "error": result["error"],
+                    "error_kind": error_kind,
+                    "attempts": attempt + 1
+                })
+            elif attempt > 0:
+                self.stats["recovered"] += 1
+            
+            result.pop("retry_after", None)
+            final.append(result)
+        
+        if final:
+            # Save results incrementally
+            self._save_results(final)
+            self._save_progress([r["url"] for r in final])
+            
+            # Update stats
+            self.stats["completed"] += len([r for r in final if not r.get("error")])
+            self.stats["failed"] += len([r for r in final if r.get("error")])
+        
+        return len(final)
+    
+    
+    async def _process_retries(self, items: List[RetryItem], prompt: str) -> List[Dict]:
+        """Re-run deferred URLs"""
+        return await self._process_batch_chunk(
+            [item.url for item in items],
+            prompt,
+            retries={item.url: item for item in items}
+        )
+    
+    
+    async def _process_batch_chunk(
+        self,
+        urls: List[str],
+        prompt: str,
+        retries: Optional[Dict[str, RetryItem]] = None
+    ) -> List[Dict]:
         """Process a chunk of URLs"""
         
         results = []
+        retries = retries or {}
         
         # Step 1: Fetch all HTML (static first)
-        html_results = await self._fetch_all_html(urls)
+        html_results = await self._fetch_all_html(urls, retries)
         
         # Step 2: Extract data from each
         for html_result in html_results:
@@ -130,6 +225,10 @@ class BatchProcessor:
                     results.append({
                         "url": html_result["url"],
                         "error": html_result["error"],
+                        "error_kind": html_result["error_kind"],
+                        "retry_after": html_result.get("retry_after"),
+                        "attempt": html_result["attempt"],
+                        "deferrals": html_result.get("deferrals", 0),
                         "data": None
                     })
                     continue
@@ -140,7 +239,8 @@ class BatchProcessor:
                 extracted = await smart_extract(
                     html=html_result["html"],
                     prompt=prompt,
-                    cache_key=None  # No caching in batch mode
+                    cache_key=None,  # No caching in batch mode
+                    json_payloads=await get_captured_json(html_result["url"])
                 )
                 
                 results.append({
@@ -148,6 +248,7 @@ class BatchProcessor:
                     "final_url": html_result["final_url"],
                     "data": extracted.get("data", []),
                     "strategy": extracted.get("strategy"),
+                    "attempt": html_result["attempt"],
                     "error": None
                 })
                 
@@ -155,14 +256,19 @@ class BatchProcessor:
                 results.append({
                     "url": html_result["url"],
                     "error": str(e),
+                    "error_kind": "extraction",
+                    "attempt": html_result["attempt"],
                     "data": None
                 })
-                self.failed_urls.append({"url": html_result["url"], "error": str(e)})
         
         return results
     
     
-    async def _fetch_all_html(self, urls: List[str]) -> List[Dict]:
+    async def _fetch_all_html(
+        self,
+        urls: List[str],
+        retries: Optional[Dict[str, RetryItem]] = None
+    ) -> List[Dict]:
         """Efficiently fetch HTML for all URLs"""
         
         results = []
@@ -177,45 +283,116 @@ class BatchProcessor:
             static_urls.append(url)
         
         # Fetch static HTML in parallel
+        retries = retries or {}
+        breaker = get_circuit_breaker()
+        
+        def failed(url: str, e: Exception, error_kind: str) -> Dict:
+            retry = retries.get(url)
+            return {
+                "url": url,
+                "html": None,
+                "final_url": None,
+                "attempt": retry.attempt if retry else 0,
+                "deferrals": retry.deferrals if retry else 0,
+                "error": str(e) or type(e).__name__,
+                "error_kind": error_kind,
+                "retry_after": get_retry_after(e)
+            }
+        
         async def fetch_static(url: str) -> Dict:
+            retry = retries.get(url)
+            attempt = retry.attempt if retry else 0
+            
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(url)
-                    html = response.text
-                    
-                    # Check if JS needed
-                    from core.html_processing.detector import get_rendering_strategy
-                    strategy = get_rendering_strategy(url, html)
+                # Blocked last time: go straight to a stealth render
+                if retry and retry.error_kind == PROTECTION:
+                    rendered_html, final_url = await fetch_html_js(url=url, wait_time=3.0, stealth_mode=True)
+                    self.stats["js_rendered"] += 1
+                    return {"url": url, "html": rendered_html, "final_url": final_url, "attempt": attempt, "error": None}
+                
+                # Shared pooled client, streamed with a size cap
+                page = await self._fetch_static_page(url)
+                html = page.html
+                
+                # Check if JS needed
+                strategy = get_rendering_strategy(url, html)
+                
+                if strategy["needs_js"]:
+                    # Need to re-fetch with Playwright
+                    rendered_html, final_url = await fetch_html_js(
+                        url=url,
+                        wait_time=strategy["wait_time"],
+                        wait_strategy=strategy.get("wait_strategy", "smart"),
+                        stealth_mode=strategy["stealth_mode"],
+                        capture_json=JSON_CAPTURE_CONFIG.get("enabled", True)
+                    )
+                    self.stats["js_rendered"] += 1
+                    return {"url": url, "html": rendered_html, "final_url": final_url, "attempt": attempt, "error": None}
+                else:
+                    self.stats["static_only"] += 1
+                    breaker.record_success(url)
+                    return {"url": url, "html": html, "final_url": page.url, "attempt": attempt, "error": None}
                     
-                    if strategy["needs_js"]:
-                        # Need to re-fetch with Playwright
-                        rendered_html, final_url = await fetch_html_js(
-                            url=url,
-                            wait_time=strategy["wait_time"],
-                            wait_strategy=strategy.get("wait_strategy", "smart"),
-                            stealth_mode=strategy["stealth_mode"]
-                        )
-                        self.stats["js_rendered"] += 1
-                        return {"url": url, "html": rendered_html, "final_url": final_url, "error": None}
-                    else:
-                        self.stats["static_only"] += 1
-                        return {"url": url, "html": html, "final_url": url, "error": None}
-                        
             except Exception as e:
-                return {"url": url, "html": None, "final_url": None, "error": str(e)}
+                error_kind = classify_error(e)
+                if error_kind in (RATE_LIMITED, SERVER_ERROR, NETWORK):
+                    breaker.record_failure(url, error_kind)
+                elif error_kind in (CLIENT_ERROR, NOT_HTML):
+                    # The host answered: the URL is bad, the domain isn't
+                    breaker.record_success(url)
+                return failed(url, e, error_kind)
         
         # Process with concurrency limit
+        # Per-domain slot first so URLs waiting on a busy host don't hold global slots
         semaphore = asyncio.Semaphore(self.max_concurrent)
+        scheduler = get_host_scheduler()
         
         async def fetch_with_limit(url: str):
-            async with semaphore:
-                return await fetch_static(url)
+            # Domain blocked / failing: defer without waiting for (or spending) a host slot
+            try:
+                breaker.check(url)
+            except CircuitOpenError as e:
+                return failed(url, e, classify_error(e))
+            
+            try:
+                async with scheduler.slot(url):
+                    async with semaphore:
+                        return await fetch_static(url)
+            finally:
+                breaker.release_probe(url)
         
         results = await asyncio.gather(*[fetch_with_limit(url) for url in urls])
         
         return results
     
     
+    async def _fetch_static_page(self, url: str):
+        """Static GET, hedged with a second request when it runs past the host's p95"""
+        
+        if not self.hedge_requests:
+            return await fetch_static_html(url)
+        
+        host = get_host_key(url)
+        hedge_after = self.latency.percentile(host, BATCH_CONFIG.get("hedge_percentile", 95))
+        if hedge_after is None:
+            hedge_after = BATCH_CONFIG.get("hedge_after", 3.0)
+        
+        # The hedge is a request of its own: it needs a free slot of the host's politeness budget
+        scheduler = get_host_scheduler()
+        
+        def try_hedge_slot():
+            slot = scheduler.try_acquire(url)
+            if slot is None:
+                return None
+            self.stats["hedged"] += 1
+            return lambda: scheduler.release(slot)
+        
+        started = time.monotonic()
+        page = await hedged(lambda: fetch_static_html(url), hedge_after, try_hedge_slot)
+        self.latency.record(host, time.monotonic() - started)
+        return page
+    
+    
     def _save_results(self, results: List[Dict]):
         """Save results to JSONL file (append mode)"""
         with open(self.results_file, "a", encoding="utf-8") as f:
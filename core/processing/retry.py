@@ -0,0 +1,247 @@
+"""
+Retry engine for batch processing
+Error classification, exponential backoff with jitter, a deferred retry
+queue (failed URLs retry later instead of blocking their chunk) and hedged
+requests for tail-latency URLs.
+"""
+
+import asyncio
+import heapq
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+import httpx
+
+from core.html_processing.circuit_breaker import CircuitOpenError
+from core.html_processing.adaptive_concurrency import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# ERROR CLASSIFICATION
+# ============================================================================
+
+TIMEOUT = "timeout"
+RATE_LIMITED = "rate_limited"
+SERVER_ERROR = "server_error"
+PROTECTION = "protection"
+NETWORK = "network"
+CLIENT_ERROR = "client_error"
+NOT_HTML = "not_html"
+CIRCUIT_OPEN = "circuit_open"
+UNKNOWN = "unknown"
+
+# Worth another attempt; client errors and non-HTML responses won't change
+RETRYABLE_ERRORS = {TIMEOUT, RATE_LIMITED, SERVER_ERROR, PROTECTION, NETWORK, UNKNOWN}
+
+# Bot-protection markers in error messages (Playwright/solver failures)
+_PROTECTION_MARKERS = ("cloudflare", "captcha", "challenge", "access denied", "datadome", "perimeterx")
+
+
+def classify_error(error: BaseException) -> str:
+    """Map an exception from a fetch/render to an error kind"""
+    if isinstance(error, CircuitOpenError):
+        return CIRCUIT_OPEN
+
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return TIMEOUT
+
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status == 429:
+            return RATE_LIMITED
+        if status in (403, 401) or (status == 503 and "cf-ray" in error.response.headers):
+            return PROTECTION
+        if status >= 500:
+            return SERVER_ERROR
+        return CLIENT_ERROR
+
+    if isinstance(error, httpx.TransportError):
+        return NETWORK
+
+    if isinstance(error, ValueError) and "Not an HTML page" in str(error):
+        return NOT_HTML
+
+    message = str(error).lower()
+    # Playwright raises its own TimeoutError type
+    if type(error).__name__ == "TimeoutError" or "timeout" in message:
+        return TIMEOUT
+    if any(marker in message for marker in _PROTECTION_MARKERS):
+        return PROTECTION
+
+    return UNKNOWN
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header (429/503), if the server sent one"""
+    if isinstance(error, CircuitOpenError):
+        return error.retry_after
+
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+
+    return parse_retry_after(error.response.headers.get("retry-after"))
+
+
+# ============================================================================
+# BACKOFF POLICY
+# ============================================================================
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped, honoring Retry-After"""
+
+    # Protection and rate limits need the host to cool down longer
+    SLOW_ERRORS = {RATE_LIMITED, PROTECTION}
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 1.0, max_delay: float = 30.0,
+                 max_deferrals: int = 10):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_deferrals = max_deferrals
+
+    def should_retry(self, error_kind: str, attempt: int) -> bool:
+        """attempt: number of attempts already made (0-based index of the failed one)"""
+        return error_kind in RETRYABLE_ERRORS and attempt < self.max_retries
+
+    def should_defer(self, error_kind: str, deferrals: int) -> bool:
+        """
+        Circuit-open URLs never sent a request, so they wait out the domain's
+        cool-down without spending an attempt (bounded, in case it never closes)
+        """
+        return error_kind == CIRCUIT_OPEN and deferrals < self.max_deferrals
+
+    def backoff(self, attempt: int, error_kind: str, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 4)
+
+        base = self.base_delay * (4 if error_kind in self.SLOW_ERRORS else 1)
+        ceiling = min(self.max_delay, base * (2 ** attempt))
+        # Full jitter: spread retries so failed URLs don't come back in lockstep
+        return random.uniform(ceiling / 2, ceiling)
+
+
+# ============================================================================
+# DEFERRED RETRY QUEUE
+# ============================================================================
+
+@dataclass(order=True)
+class RetryItem:
+    """A URL waiting for its next attempt"""
+    ready_at: float
+    url: str = field(compare=False)
+    attempt: int = field(compare=False)          # Index of the upcoming attempt
+    error_kind: str = field(compare=False)
+    last_error: str = field(compare=False, default="")
+    deferrals: int = field(compare=False, default=0)    # Times skipped because the circuit was open
+
+
+class DeferredRetryQueue:
+    """Min-heap of failed URLs ordered by when they may be retried"""
+
+    def __init__(self):
+        self._heap: List[RetryItem] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, attempt: int, delay: float, error_kind: str, last_error: str = "", deferrals: int = 0):
+        heapq.heappush(self._heap, RetryItem(time.monotonic() + delay, url, attempt, error_kind, last_error, deferrals))
+
+    def pop_due(self) -> List[RetryItem]:
+        """All items whose backoff has elapsed"""
+        now = time.monotonic()
+        due = []
+        while self._heap and self._heap[0].ready_at <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
+
+    async def wait_next(self):
+        """Sleep until the earliest item is due"""
+        if self._heap:
+            delay = self._heap[0].ready_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+# ============================================================================
+# HEDGED REQUESTS
+# ============================================================================
+
+class LatencyTracker:
+    """
+    Rolling window of request durations per host, used to pick the hedge delay
+
+    Per host because a batch mixes fast and slow sites: a shared p95 would
+    hedge every request to the slow ones and never hedge the fast ones.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, host: str, seconds: float):
+        samples = self._samples.get(host)
+        if samples is None:
+            samples = self._samples[host] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, host: str, pct: float) -> Optional[float]:
+        samples = self._samples.get(host)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def hedged(
+    fn: Callable[[], Awaitable[Any]],
+    hedge_after: float,
+    try_acquire: Optional[Callable[[], Optional[Callable[[], None]]]] = None
+) -> Any:
+    """
+    Run fn(); if it hasn't finished after `hedge_after` seconds, start a second
+    copy and return whichever succeeds first (the loser is cancelled)
+
+    try_acquire reserves capacity for the second copy (e.g. a host scheduler
+    slot) without waiting: it returns a release callback, or None to skip
+    the hedge and keep waiting on the first request.
+    """
+    primary = asyncio.ensure_future(fn())
+    tasks = [primary]
+
+    async def hedge(release: Callable[[], None]):
+        try:
+            return await fn()
+        finally:
+            release()
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            release = try_acquire() if try_acquire else (lambda: None)
+            if release is None:
+                logger.debug(f"🪁 No free slot to hedge after {hedge_after:.1f}s, waiting")
+            else:
+                logger.info(f"🪁 Hedging slow request after {hedge_after:.1f}s")
+                tasks.append(asyncio.ensure_future(hedge(release)))
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
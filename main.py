@@ -25,7 +25,10 @@ from api.routes.enrichment import router as enrichment_router
 
 # Import cleanup functions
 from core.html_processing.renderer import cleanup_browser
+from core.html_processing.http_client import init_http_client, close_http_client
+from core.html_processing.render_client import get_render_client, close_render_client
 from storage.cache_manager import get_cache_manager
+from storage.knowledge_store import close_knowledge_store
 
 
 @asynccontextmanager
@@ -38,11 +41,20 @@ async def lifespan(app: FastAPI):
     print("✅ Pagination: Enabled")
     print("✅ Crawling: Enabled")
     
+    await init_http_client()
+    print("✅ HTTP Client Pool: Enabled")
+    
+    if get_render_client():
+        print(f"✅ Render Workers: {len(get_render_client().endpoints)}")
+    
     yield
     
     # Shutdown
     print("🛑 Shutting down ScrapiGen...")
     await cleanup_browser()
+    await close_http_client()
+    await close_render_client()
+    await close_knowledge_store()
     
     cache = get_cache_manager()
     await cache.close()
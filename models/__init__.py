@@ -1,8 +1,10 @@
 from .requests import (
     ScrapeRequest,
     BatchScrapeRequest,
+    SitemapBatchRequest,
     PaginationScrapeRequest,
-    CrawlRequest
+    CrawlRequest,
+    BlocklistUpdateRequest
 )
 from .responses import (
     ScrapeResponse,
@@ -12,8 +14,10 @@ from .responses import (
 __all__ = [
     'ScrapeRequest',
     'BatchScrapeRequest',
+    'SitemapBatchRequest',
     'PaginationScrapeRequest',
     'CrawlRequest',
+    'BlocklistUpdateRequest',
     'ScrapeResponse',
     'JobStatus'
 ]
\ No newline at end of file
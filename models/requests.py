@@ -17,6 +17,14 @@ class BatchScrapeRequest(BaseModel):
     max_concurrent: Optional[int] = 5
 
 
+class SitemapBatchRequest(BaseModel):
+    site_url: HttpUrl                     # Any page on the site, or the sitemap URL itself
+    prompt: str
+    path_prefix: Optional[str] = None     # e.g. "/products/"
+    max_urls: int = 1000
+    max_concurrent: Optional[int] = 5
+
+
 class PaginationScrapeRequest(BaseModel):
     start_url: HttpUrl
     prompt: str
@@ -31,4 +39,9 @@ class CrawlRequest(BaseModel):
     max_depth: int = 2
     max_pages: int = 50
     link_selector: Optional[str] = None
-    auto_detect: bool = True
\ No newline at end of file
+    auto_detect: bool = True
+    use_sitemap: bool = False
+
+class BlocklistUpdateRequest(BaseModel):
+    add: List[str] = []
+    remove: List[str] = []
@@ -0,0 +1,141 @@
+"""
+ScrapiGen render worker
+Runs fetch_html_js (browser pool + auto-solve) in its own process so heavy
+renders never stall the API's event loop. Scale rendering by running more
+workers and listing them in RENDER_WORKER_URLS for the API.
+
+Usage:
+    python render_worker.py                  # RENDER_SERVICE_CONFIG["processes"] workers
+    python render_worker.py --processes 4    # ports 8101..8104
+    python render_worker.py --port 8101 --processes 1
+
+Then start the API with:
+    RENDER_WORKER_URLS=http://127.0.0.1:8101,http://127.0.0.1:8102 uvicorn main:app
+"""
+import sys
+import asyncio
+import argparse
+import multiprocessing
+
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+# Same import order as main.py: api before core (core.extraction <-> api.dependencies)
+import api  # noqa: F401
+from core.html_processing.renderer import fetch_html_js, cleanup_browser, get_browser_pool
+from core.html_processing.circuit_breaker import CircuitOpenError
+from core.html_processing.http_client import close_http_client
+from storage.cache_manager import get_captured_json, get_cache_manager
+from storage.knowledge_store import close_knowledge_store
+from config.config import RENDER_SERVICE_CONFIG
+
+
+class RenderRequest(BaseModel):
+    url: str
+    wait_time: float = 1.5
+    timeout: int = 20000
+    block_resources: bool = True
+    stealth_mode: bool = False
+    wait_strategy: str = "smart"
+    try_auto_solve: bool = True
+    ready_selectors: List[str] = []
+    capture_json: bool = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print("🚀 Render worker started")
+    yield
+    await cleanup_browser()
+    # Same teardown as main.py: pooled HTTP client, knowledge store (render outcomes), cache
+    await close_http_client()
+    await close_knowledge_store()
+    await get_cache_manager().close()
+    print("✅ Render worker stopped")
+
+
+app = FastAPI(title="ScrapiGen Render Worker", lifespan=lifespan)
+
+
+@app.post("/render")
+async def render(request: RenderRequest):
+    """Render one page; same result as fetch_html_js"""
+    try:
+        html, final_url = await fetch_html_js(
+            url=request.url,
+            wait_time=request.wait_time,
+            timeout=request.timeout,
+            block_resources=request.block_resources,
+            stealth_mode=request.stealth_mode,
+            wait_strategy=request.wait_strategy,
+            try_auto_solve=request.try_auto_solve,
+            ready_selectors=request.ready_selectors,
+            capture_json=request.capture_json,
+            allow_remote=False  # This process is the renderer
+        )
+    except CircuitOpenError as e:
+        # Passed back as-is: the API must not count it as a failed render
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "circuit_open", "host": e.host, "retry_after": e.retry_after, "reason": e.reason},
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Render failed: {e}")
+
+    payloads = await get_captured_json(request.url) if request.capture_json else None
+    return {"html": html, "final_url": final_url, "json_payloads": payloads}
+
+
+@app.get("/health")
+async def health():
+    """Liveness + pool usage (for load balancers / orchestration)"""
+    return {"status": "ok", "pool": get_browser_pool().get_stats()}
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def _serve(host: str, port: int):
+    import uvicorn
+    uvicorn.run(app, host=host, port=port, log_level="info")
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="ScrapiGen render worker")
+    parser.add_argument("--host", default=RENDER_SERVICE_CONFIG.get("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=RENDER_SERVICE_CONFIG.get("base_port", 8101))
+    parser.add_argument("--processes", type=int, default=RENDER_SERVICE_CONFIG.get("processes", 2))
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        _serve(args.host, args.port)
+        return
+
+    # One worker process (own event loop + browser pool) per port
+    workers = [
+        multiprocessing.Process(target=_serve, args=(args.host, args.port + i), daemon=False)
+        for i in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    urls = ",".join(f"http://{args.host}:{args.port + i}" for i in range(args.processes))
+    print(f"✅ {args.processes} render workers: RENDER_WORKER_URLS={urls}")
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
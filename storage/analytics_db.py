@@ -11,6 +11,7 @@ analytics_db: Dict = {
     "fail_count": 0,
     "cache_hits": 0,
     "cache_misses": 0,
+    "cache_revalidations": 0,
     "domains_tried": {},
     "strategies_used": {
         "meta_direct": 0,
@@ -8,6 +8,7 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import Optional, Any
 import logging
+from config.settings import CACHE_HTML_TTL, CACHE_HTML_REVALIDATE_WINDOW
 
 logger = logging.getLogger(__name__)
 
@@ -75,8 +76,9 @@ class CacheManager:
         if cache_key in self.memory_cache:
             entry = self.memory_cache[cache_key]
             
-            # Check if expired
-            if datetime.fromisoformat(entry["timestamp"]) + timedelta(seconds=self.memory_ttl) > datetime.now():
+            # Check if expired (entries may carry their own TTL)
+            entry_ttl = entry.get("ttl") or self.memory_ttl
+            if datetime.fromisoformat(entry["timestamp"]) + timedelta(seconds=entry_ttl) > datetime.now():
                 logger.debug(f"💾 L1 Cache HIT: {namespace}/{key[:30]}...")
                 return entry["value"]
             else:
@@ -94,7 +96,7 @@ class CacheManager:
                     parsed = json.loads(value)
                     
                     # Promote to L1 cache
-                    self._set_memory(cache_key, parsed)
+                    self._set_memory(cache_key, parsed, await self._redis_ttl_left(cache_key))
                     
                     return parsed
             except Exception as e:
@@ -124,7 +126,7 @@ class CacheManager:
         cache_key = self._make_key(namespace, key)
         
         # L1: Set in memory
-        self._set_memory(cache_key, value)
+        self._set_memory(cache_key, value, ttl)
         
         # L2: Set in Redis
         if self.redis:
@@ -140,7 +142,16 @@ class CacheManager:
                 logger.error(f"❌ Redis set error: {e}")
     
     
-    def _set_memory(self, cache_key: str, value: Any):
+    async def _redis_ttl_left(self, cache_key: str) -> Optional[int]:
+        """Remaining Redis TTL, so promoted entries don't outlive their L2 copy"""
+        try:
+            remaining = await self.redis.ttl(cache_key)
+            return remaining if remaining and remaining > 0 else None
+        except Exception:
+            return None
+    
+    
+    def _set_memory(self, cache_key: str, value: Any, ttl: Optional[int] = None):
         """Set value in memory cache with LRU eviction"""
         
         # If memory is full, remove oldest
@@ -155,7 +166,8 @@ class CacheManager:
         
         self.memory_cache[cache_key] = {
             "value": value,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "ttl": ttl
         }
     
     
@@ -251,20 +263,81 @@ def get_cache_manager() -> CacheManager:
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-async def cache_rendered_html(url: str, html: str, final_url: str):
-    """Cache rendered HTML"""
+async def cache_rendered_html(
+    url: str,
+    html: str,
+    final_url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    has_payloads: bool = False
+):
+    """
+    Cache fetched HTML
+    
+    Pass etag/last_modified only when html is the static response body they
+    came with; entries without validators are refetched once they expire.
+    has_payloads: the data lives in the url's cached JSON payloads (a
+    replayed endpoint), the HTML is only the shell.
+    """
     cache = get_cache_manager()
     await cache.set("rendered_html", url, {
         "html": html,
         "final_url": final_url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "has_payloads": has_payloads,
         "timestamp": datetime.now().isoformat()
-    })
+    }, ttl=CACHE_HTML_REVALIDATE_WINDOW)
+
+
+async def get_cached_html(url: str, allow_stale: bool = False) -> Optional[dict]:
+    """
+    Get cached rendered HTML
+    
+    Fresh entries are returned as-is. With allow_stale=True, expired entries
+    are returned too, marked with "stale": True, for conditional revalidation.
+    """
+    cache = get_cache_manager()
+    entry = await cache.get("rendered_html", url)
+    if not entry:
+        return None
+    
+    age = datetime.now() - datetime.fromisoformat(entry.get("timestamp", "2000-01-01"))
+    if age < timedelta(seconds=CACHE_HTML_TTL):
+        return entry
+    
+    if allow_stale:
+        return {**entry, "stale": True}
+    
+    return None
+
+
+async def refresh_cached_html(url: str, entry: dict):
+    """Mark a stale entry fresh again after a 304 Not Modified"""
+    await cache_rendered_html(
+        url,
+        entry["html"],
+        entry.get("final_url", url),
+        etag=entry.get("etag"),
+        last_modified=entry.get("last_modified"),
+        has_payloads=entry.get("has_payloads", False)
+    )
+
+
+async def cache_json_payloads(url: str, payloads: list):
+    """Cache JSON API responses captured while rendering url"""
+    cache = get_cache_manager()
+    await cache.set("json_payloads", url, {
+        "payloads": payloads,
+        "timestamp": datetime.now().isoformat()
+    }, ttl=CACHE_HTML_TTL)
 
 
-async def get_cached_html(url: str) -> Optional[dict]:
-    """Get cached rendered HTML"""
+async def get_captured_json(url: str) -> Optional[list]:
+    """JSON payloads captured for url (None if it wasn't rendered with capture)"""
     cache = get_cache_manager()
-    return await cache.get("rendered_html", url)
+    entry = await cache.get("json_payloads", url)
+    return entry["payloads"] if entry else None
 
 
 async def cache_extracted_data(url: str, prompt: str, data: list):
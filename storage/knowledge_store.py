@@ -0,0 +1,187 @@
+"""
+Persistent knowledge store (SQLite, WAL mode)
+What the scraper learns about sites (rendering decisions, domain stats)
+has to survive restarts but is read far more often than written. Values
+live in memory per namespace; writes are queued and flushed to SQLite in
+batches from a worker thread, never on the event loop.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+import logging
+
+from config.config import KNOWLEDGE_STORE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeStore:
+    """Namespaced key -> JSON value store with batched write-behind"""
+
+    def __init__(self, path: str = "scraping_knowledge.db", flush_interval: float = 5.0, batch_size: int = 200):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[tuple, Any] = {}  # (namespace, key) -> value, None = delete
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_flush = time.monotonic()
+        self.stats = {"writes": 0, "flushes": 0, "rows_flushed": 0, "flush_errors": 0}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS knowledge ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    # ========================================================================
+    # READS (memory)
+    # ========================================================================
+
+    def namespace(self, namespace: str) -> Dict[str, Any]:
+        """All values of a namespace (loaded from disk on first use)"""
+        with self._lock:
+            if namespace not in self._data:
+                with self._db_lock:
+                    rows = self._conn.execute(
+                        "SELECT key, value FROM knowledge WHERE namespace = ?", (namespace,)
+                    ).fetchall()
+                values = {}
+                for key, value in rows:
+                    try:
+                        values[key] = json.loads(value)
+                    except ValueError:
+                        logger.warning(f"⚠️ Skipping corrupt knowledge entry {namespace}/{key}")
+                self._data[namespace] = values
+            return self._data[namespace]
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self.namespace(namespace).get(key, default)
+
+    # ========================================================================
+    # WRITES (queued)
+    # ========================================================================
+
+    def put(self, namespace: str, key: str, value: Any):
+        """Set a value now, persist it with the next batch"""
+        values = self.namespace(namespace)
+        with self._lock:
+            values[key] = value
+            self._pending[(namespace, key)] = value
+            self.stats["writes"] += 1
+        self._schedule_flush()
+
+    def delete(self, namespace: str, key: str):
+        values = self.namespace(namespace)
+        with self._lock:
+            values.pop(key, None)
+            self._pending[(namespace, key)] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Flush in the background once the batch is full or the interval is up"""
+        due = (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+        if not due or (self._flush_task and not self._flush_task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()  # No event loop (CLI / scripts): write inline
+            return
+        self._flush_task = loop.create_task(self.flush())
+
+    def _take_pending(self) -> list:
+        """Serialize queued values (on the caller's thread: owners mutate them in place)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        return [(ns, key, None if value is None else json.dumps(value)) for (ns, key), value in pending.items()]
+
+    def _write(self, rows: list):
+        now = time.time()
+        try:
+            with self._db_lock, self._conn:
+                for namespace, key, value in rows:
+                    if value is None:
+                        self._conn.execute("DELETE FROM knowledge WHERE namespace = ? AND key = ?", (namespace, key))
+                    else:
+                        self._conn.execute(
+                            "INSERT INTO knowledge (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)"
+                            " ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                            (namespace, key, value, now)
+                        )
+            self.stats["flushes"] += 1
+            self.stats["rows_flushed"] += len(rows)
+        except sqlite3.Error as e:
+            self.stats["flush_errors"] += 1
+            logger.error(f"❌ Knowledge store flush failed ({len(rows)} rows): {e}")
+
+    def flush_sync(self):
+        rows = self._take_pending()
+        if rows:
+            self._write(rows)
+
+    async def flush(self):
+        """Write queued values from a worker thread"""
+        rows = self._take_pending()
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+
+    async def close(self):
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "path": self.path,
+            "pending": len(self._pending),
+            "namespaces": {ns: len(values) for ns, values in self._data.items()}
+        }
+
+
+# ============================================================================
+# GLOBAL STORE INSTANCE
+# ============================================================================
+
+_store: Optional[KnowledgeStore] = None
+
+
+def get_knowledge_store() -> KnowledgeStore:
+    """Get or create the global knowledge store"""
+    global _store
+
+    if _store is None:
+        _store = KnowledgeStore(
+            path=KNOWLEDGE_STORE_CONFIG.get("path", "scraping_knowledge.db"),
+            flush_interval=KNOWLEDGE_STORE_CONFIG.get("flush_interval", 5.0),
+            batch_size=KNOWLEDGE_STORE_CONFIG.get("batch_size", 200)
+        )
+
+    return _store
+
+
+async def close_knowledge_store():
+    """Flush pending writes and close the database"""
+    global _store
+
+    if _store is not None:
+        await _store.close()
+        _store = None
@@ -0,0 +1,163 @@
+"""
+Byte-budgeted LRU cache for large text payloads (rendered HTML)
+Bounded by total bytes instead of entry count, with TTL eviction and
+optional zlib compression of large values.
+"""
+
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ByteBudgetLRU:
+    """
+    LRU keyed by string, holding one text payload plus small metadata per entry
+
+    Usage:
+        cache.set(key, html, final_url=url)
+        entry = cache.get(key)   # {"html": ..., "final_url": ...} or None
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 3600,
+        compress: bool = True,
+        compress_min_bytes: int = 32 * 1024,
+        compress_level: int = 1,
+        payload_field: str = "html"
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+        self.payload_field = payload_field
+
+        # key -> (payload str|bytes, meta dict, expires_at, size, raw_size)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        self._raw_bytes = 0         # Uncompressed size of what's stored (for the ratio)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ========================================================================
+    # GET / SET
+    # ========================================================================
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, meta, expires_at = entry[:3]
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        if isinstance(payload, bytes):
+            payload = zlib.decompress(payload).decode("utf-8")
+        return {self.payload_field: payload, **meta}
+
+    def set(self, key: str, payload: str, ttl: Optional[float] = None, **meta):
+        raw_size = sys.getsizeof(payload)
+
+        stored: Union[str, bytes] = payload
+        if self.compress and len(payload) >= self.compress_min_bytes:
+            stored = zlib.compress(payload.encode("utf-8"), self.compress_level)
+
+        size = sys.getsizeof(stored) + sys.getsizeof(meta) + sum(sys.getsizeof(v) for v in meta.values())
+
+        # One entry may not take more than a quarter of the budget
+        if size > self.max_bytes // 4:
+            self.rejected += 1
+            logger.debug(f"⚠️ Not caching {key[:30]}: {size:,} bytes exceeds entry limit")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (stored, meta, time.monotonic() + (ttl or self.ttl), size, raw_size)
+        self._bytes += size
+        self._raw_bytes += raw_size
+        self._evict()
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._raw_bytes = 0
+
+    # ========================================================================
+    # EVICTION
+    # ========================================================================
+
+    def _remove(self, key: str):
+        _, _, _, size, raw_size = self._entries.pop(key)
+        self._bytes -= size
+        self._raw_bytes -= raw_size
+
+    def _sweep_expired(self):
+        """Drop expired entries wherever they sit in the LRU order"""
+        now = time.monotonic()
+        expired = [k for k, entry in self._entries.items() if entry[2] <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._last_sweep = now
+
+    def _evict(self):
+        # Expired entries go first (sweep at most once a minute, it's O(n))
+        if time.monotonic() - self._last_sweep > 60:
+            self._sweep_expired()
+
+        # Then least recently used until we're within budget
+        while self._bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        compressed = sum(1 for entry in self._entries.values() if isinstance(entry[0], bytes))
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "usage_percent": round(self._bytes / self.max_bytes * 100, 1) if self.max_bytes else 0.0,
+            "compressed_entries": compressed,
+            "compression_ratio": round(self._raw_bytes / self._bytes, 2) if self._bytes else 1.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 2) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+            "ttl": self.ttl
+        }
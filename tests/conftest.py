@@ -0,0 +1,12 @@
+"""
+Test setup
+config.settings requires GROQ_API_KEY at import time, and core/ can only be
+imported after api (the same order main.py and the CLI scripts use).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+import api  # noqa: E402,F401
@@ -0,0 +1,84 @@
+import pytest
+
+from core.html_processing.adaptive_concurrency import AimdController, parse_retry_after
+from core.html_processing.host_scheduler import HostScheduler
+
+URL = "https://shop.test/item/1"
+
+
+def controller(max_in_flight=2):
+    aimd = AimdController(min_limit=1, max_limit=8, min_latency_samples=3)
+    aimd.scheduler = HostScheduler(requests_per_second=1000.0, burst=100, max_in_flight=max_in_flight)
+    return aimd
+
+
+def saturate(scheduler, url=URL):
+    for _ in range(scheduler.get_max_in_flight(url)):
+        scheduler.try_acquire(url)
+
+
+def test_fast_responses_grow_the_limit_only_while_saturated():
+    aimd = controller()
+
+    for _ in range(10):
+        aimd.on_response(URL, 200, 0.1)
+    assert aimd.get_limit(URL) == 2
+
+    saturate(aimd.scheduler)
+    for _ in range(10):
+        aimd.on_response(URL, 200, 0.1)
+    assert aimd.get_limit(URL) > 2
+    assert aimd.scheduler.get_max_in_flight(URL) == aimd.get_limit(URL)
+
+
+def test_rate_limit_halves_the_limit_and_pauses_the_host():
+    aimd = controller(max_in_flight=8)
+    aimd._window("shop.test").limit = 8.0
+
+    delay = aimd.on_rate_limited(URL, retry_after=3.0)
+
+    assert delay == 3.0
+    assert aimd.get_limit(URL) == 4
+    assert aimd.scheduler.try_acquire(URL) is None  # Paused
+
+
+def test_one_decrease_per_window_of_in_flight_responses():
+    aimd = controller(max_in_flight=8)
+    aimd._window("shop.test").limit = 8.0
+
+    aimd.on_response(URL, 429, 0.1)
+    aimd.on_response(URL, 503, 0.1)
+
+    assert aimd.get_limit(URL) == 4
+
+
+def test_latency_inflation_counts_as_congestion():
+    aimd = controller(max_in_flight=8)
+    aimd._window("shop.test").limit = 8.0
+    for _ in range(5):
+        aimd.on_response(URL, 200, 0.2)
+
+    aimd.on_response(URL, 200, 3.0)
+
+    assert aimd.get_limit(URL) == 4
+    assert "latency" in aimd.get_stats()["hosts"]["shop.test"]["last_reason"]
+
+
+def test_limit_is_restored_after_the_scheduler_forgets_the_host():
+    aimd = controller()
+    aimd._window("shop.test").limit = 5.0
+    aimd.scheduler._hosts.clear()
+
+    aimd.on_response(URL, 200, 0.1)
+
+    assert aimd.scheduler.get_max_in_flight(URL) == 5
+
+
+@pytest.mark.parametrize("value, expected", [("12", 12.0), ("-3", 0.0), ("soon", None), (None, None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    # Dates in the past mean "now"
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
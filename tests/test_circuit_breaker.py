@@ -0,0 +1,167 @@
+import asyncio
+import contextvars
+
+import pytest
+
+from core.html_processing.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN,
+    CircuitOpenError, DomainCircuitBreaker,
+)
+from core.processing import batch
+from core.processing.batch import BatchProcessor
+from core.processing.retry import CIRCUIT_OPEN, TIMEOUT
+
+URL = "https://shop.test/item/1"
+
+
+def tripped_breaker(**kwargs):
+    breaker = DomainCircuitBreaker(failure_threshold=2, open_seconds=0.0, **kwargs)
+    breaker.record_failure(URL, "HTTP 503")
+    breaker.record_failure(URL, "HTTP 503")
+    return breaker
+
+
+def in_task(fn):
+    """Run fn in its own context, like one fetch task"""
+    return contextvars.copy_context().run(fn)
+
+
+def test_opens_after_threshold_and_rejects():
+    breaker = DomainCircuitBreaker(failure_threshold=2, open_seconds=60.0)
+    breaker.record_failure(URL, "HTTP 503")
+    breaker.check(URL)
+
+    breaker.record_failure(URL, "HTTP 503")
+
+    assert breaker.get_state(URL) == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check("https://www.shop.test/other")
+    assert 0 < error.value.retry_after <= 60.0
+
+
+def test_fatal_failure_opens_at_once():
+    breaker = DomainCircuitBreaker(failure_threshold=5)
+    breaker.record_failure(URL, "cf_turnstile_hard", fatal=True)
+
+    assert breaker.get_state(URL) == OPEN
+
+
+def test_one_probe_at_a_time_then_success_closes():
+    breaker = tripped_breaker()
+
+    in_task(lambda: breaker.check(URL))
+    assert breaker.get_state(URL) == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        in_task(lambda: breaker.check(URL))
+
+    breaker.record_success(URL)
+
+    assert breaker.get_state(URL) == CLOSED
+    in_task(lambda: breaker.check(URL))
+
+
+def test_failed_probe_reopens_for_longer():
+    breaker = tripped_breaker()
+    breaker.open_seconds = 10.0
+
+    in_task(lambda: breaker.check(URL))
+    breaker.record_failure(URL, "HTTP 503")
+
+    assert breaker.get_state(URL) == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check(URL)
+    assert error.value.retry_after > 10.0
+
+
+def test_unsettled_probe_is_released_for_the_next_request():
+    breaker = tripped_breaker(probe_timeout=120.0)
+
+    def probe_without_outcome():
+        breaker.check(URL)
+        breaker.release_probe(URL)
+
+    in_task(probe_without_outcome)
+
+    # Not blocked for probe_timeout: the next request becomes the probe
+    in_task(lambda: breaker.check(URL))
+    assert breaker.get_state(URL) == HALF_OPEN
+
+
+def test_release_after_outcome_keeps_the_outcome():
+    breaker = tripped_breaker()
+
+    def probe_that_fails():
+        breaker.check(URL)
+        breaker.record_failure(URL, "HTTP 503")
+        breaker.release_probe(URL)
+
+    in_task(probe_that_fails)
+
+    assert breaker.get_state(URL) == OPEN
+
+
+# ============================================================================
+# BATCH DEFERRALS
+# ============================================================================
+
+def circuit_open_result(attempt, deferrals=0):
+    return {
+        "url": URL, "error": "Circuit open", "error_kind": CIRCUIT_OPEN,
+        "retry_after": 5.0, "attempt": attempt, "deferrals": deferrals, "data": None,
+    }
+
+
+def test_circuit_open_deferral_does_not_spend_an_attempt(tmp_path):
+    processor = BatchProcessor("job", output_dir=str(tmp_path))
+    last_attempt = processor.retry_policy.max_retries
+
+    finished = processor._record_results([circuit_open_result(last_attempt)])
+
+    assert finished == 0
+    (item,) = processor.retry_queue._heap
+    assert item.attempt == last_attempt
+    assert item.deferrals == 1
+    assert processor.stats["deferred"] == 1
+    assert processor.stats["retried"] == 0
+
+
+def test_deferrals_are_bounded(tmp_path):
+    processor = BatchProcessor("job", output_dir=str(tmp_path))
+    processor.retry_policy.max_retries = 0
+    limit = processor.retry_policy.max_deferrals
+
+    finished = processor._record_results([circuit_open_result(0, deferrals=limit)])
+
+    assert finished == 1
+    assert len(processor.retry_queue) == 0
+    assert processor.failed_urls[0]["error_kind"] == CIRCUIT_OPEN
+
+
+def test_real_failures_still_spend_attempts(tmp_path):
+    processor = BatchProcessor("job", output_dir=str(tmp_path))
+    result = {**circuit_open_result(0), "error_kind": TIMEOUT, "retry_after": None}
+
+    processor._record_results([result])
+
+    assert processor.retry_queue._heap[0].attempt == 1
+
+
+class NoSlotsScheduler:
+    """A host that is paused for good: any slot request is a bug"""
+
+    def slot(self, url):
+        raise AssertionError("waited on a host slot for an open domain")
+
+
+def test_open_domain_is_deferred_before_waiting_for_a_host_slot(tmp_path, monkeypatch):
+    breaker = DomainCircuitBreaker(failure_threshold=1, open_seconds=60.0)
+    breaker.record_failure(URL, "HTTP 503")
+    monkeypatch.setattr(batch, "get_circuit_breaker", lambda: breaker)
+    monkeypatch.setattr(batch, "get_host_scheduler", lambda: NoSlotsScheduler())
+    processor = BatchProcessor("job", output_dir=str(tmp_path))
+
+    (result,) = asyncio.run(processor._fetch_all_html([URL]))
+
+    assert result["error_kind"] == CIRCUIT_OPEN
+    assert 0 < result["retry_after"] <= 60.0
+    assert result["attempt"] == 0 and result["deferrals"] == 0
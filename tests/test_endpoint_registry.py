@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+
+from core.html_processing import endpoint_registry
+from core.html_processing.endpoint_registry import EndpointRegistry, page_key, page_number_of
+
+RECORDS = [{"id": i, "name": f"Shoe {i}"} for i in range(3)]
+
+
+def learned_registry(page_url, endpoint_url):
+    registry = EndpointRegistry(min_observations=1)
+    payload = {"url": endpoint_url, "data": {"items": RECORDS}, "request": {"method": "GET", "headers": {}}}
+    registry.observe(page_url, [payload])
+    registry.mark_extracted(endpoint_url)
+    return registry
+
+
+def replay(registry, url, monkeypatch, **kwargs):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"items": RECORDS})
+
+    async def client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(endpoint_registry, "get_http_client", client)
+    return asyncio.run(registry.replay(url, **kwargs)), requests
+
+
+def test_page_suffix_number():
+    assert page_number_of("https://shop.com/shoes/page/3") == 3
+    assert page_number_of("https://shop.com/shoes/p/12/") == 12
+    assert page_number_of("https://shop.com/shoes?page=3") is None
+    assert page_key("https://shop.com/shoes/page/3") == page_key("https://shop.com/shoes/page/1")
+
+
+def test_page_suffix_selects_the_endpoint_page(monkeypatch):
+    registry = learned_registry("https://shop.com/shoes/page/1", "https://api.shop.com/search?q=shoes&page=1")
+
+    template = registry.get_template("https://shop.com/shoes/page/3")
+    assert registry._build_params(template, "https://shop.com/shoes/page/3", 3) == {"q": "shoes", "page": "3"}
+
+    payloads, requests = replay(registry, "https://shop.com/shoes/page/3", monkeypatch)
+
+    assert payloads
+    assert requests[0].url.params["page"] == "3"
+
+
+def test_no_replay_of_later_pages_without_a_page_param(monkeypatch):
+    registry = learned_registry("https://shop.com/shoes/page/1", "https://api.shop.com/search?q=shoes")
+
+    payloads, requests = replay(registry, "https://shop.com/shoes/page/3", monkeypatch)
+
+    assert payloads is None
+    assert requests == []
+
+
+def test_mapped_page_param_missing_from_url_is_derived():
+    registry = learned_registry("https://shop.com/shoes?page=1", "https://api.shop.com/search?page=1")
+    template = registry.get_template("https://shop.com/shoes/page/4")
+
+    assert template.page_params == {"page": "page"}
+    assert registry._build_params(template, "https://shop.com/shoes/page/4", 4)["page"] == "4"
+    assert registry._build_params(template, "https://shop.com/shoes?page=2", None)["page"] == "2"
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+
+from core.html_processing import fetcher
+from core.html_processing.http_client import StaticPage
+from storage.cache_manager import get_cached_html, get_cache_manager
+
+SHELL = "<html><head><title>App</title></head><body><div id='root'></div></body></html>"
+RENDERED = "<html><body>" + "<p>product</p>" * 200 + "</body></html>"
+
+
+class StubDecisions:
+    def decide(self, url):
+        return None
+
+    def record(self, *args, **kwargs):
+        pass
+
+    def wait_strategy_for(self, url, default="smart"):
+        return default
+
+
+class StubRegistry:
+    def __init__(self, payloads=None):
+        self.payloads = payloads
+        self.replays = 0
+        self.page_numbers = []
+
+    def get_template(self, url):
+        return None
+
+    async def replay(self, url, page_number=None):
+        self.replays += 1
+        self.page_numbers.append(page_number)
+        return self.payloads
+
+
+def patch_pipeline(monkeypatch, responses, registry=None):
+    """Static responses are served in order; rendering always returns RENDERED"""
+    calls = {"static": [], "renders": 0}
+
+    async def fake_static(url, headers=None, **kwargs):
+        calls["static"].append(dict(headers or {}))
+        return responses.pop(0)
+
+    async def fake_render(url, **kwargs):
+        calls["renders"] += 1
+        return RENDERED, url
+
+    async def no_log(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(fetcher, "fetch_static_html", fake_static)
+    monkeypatch.setattr(fetcher, "fetch_html_js", fake_render)
+    monkeypatch.setattr(fetcher, "log_render_outcome", no_log)
+    monkeypatch.setattr(fetcher, "get_render_decisions", lambda: StubDecisions())
+    monkeypatch.setattr(fetcher, "get_endpoint_registry", lambda: registry or StubRegistry())
+    monkeypatch.setattr(fetcher, "get_rendering_strategy", lambda url, html: {
+        "needs_js": True, "reason": "test", "wait_time": 1.0, "wait_strategy": "smart",
+        "stealth_mode": False, "block_resources": True, "metrics": {}
+    })
+    return calls
+
+
+def static_page(url, html, status=200, etag='"v1"'):
+    return StaticPage(url, status, httpx.Headers({"etag": etag}), html)
+
+
+def test_rendered_html_is_cached_without_static_validators(monkeypatch):
+    url = "https://spa.test/products"
+    calls = patch_pipeline(monkeypatch, [static_page(url, SHELL)])
+
+    async def main():
+        await get_cache_manager().delete("rendered_html", url)
+        html = await fetcher._fetch_and_render(url)
+        return html, await get_cached_html(url)
+
+    html, entry = asyncio.run(main())
+
+    assert html == RENDERED
+    assert calls["renders"] == 1
+    # A 304 on the unchanged shell must not revalidate the rendered data
+    assert entry["etag"] is None and entry["last_modified"] is None
+    assert fetcher._conditional_headers(entry) == {}
+
+
+def test_static_html_keeps_validators_and_revalidates(monkeypatch):
+    url = "https://static.test/page"
+    body = "<html><body>" + "<p>text</p>" * 200 + "</body></html>"
+    calls = patch_pipeline(monkeypatch, [static_page(url, body), static_page(url, "", status=304)])
+    monkeypatch.setattr(fetcher, "get_rendering_strategy", lambda url, html: {
+        "needs_js": False, "reason": "test", "metrics": {}
+    })
+
+    async def main():
+        await get_cache_manager().delete("rendered_html", url)
+        await fetcher._fetch_and_render(url)
+        entry = await get_cached_html(url)
+        # Pretend it expired: the next fetch is a conditional GET answered with 304
+        html = await fetcher._fetch_and_render(url, stale={**entry, "stale": True})
+        return entry, html
+
+    entry, html = asyncio.run(main())
+
+    assert entry["etag"] == '"v1"'
+    assert calls["static"][1] == {"If-None-Match": '"v1"'}
+    assert html == body
+
+
+def test_replayed_shell_is_refetched_once_its_payloads_expire(monkeypatch):
+    url = "https://replay.test/items"
+    registry = StubRegistry(payloads=[{"url": "https://replay.test/api/items", "data": [{"name": "a"}]}])
+    calls = patch_pipeline(monkeypatch, [static_page(url, SHELL), static_page(url, SHELL)], registry)
+
+    async def main():
+        cache = get_cache_manager()
+        await cache.delete("rendered_html", url)
+        await fetcher.fetch_html(url)
+        entry = await get_cached_html(url)
+        cached_hit = await fetcher.fetch_html(url)
+
+        # Payloads gone while the shell is still fresh: a cache hit would extract from an empty shell
+        await cache.delete("json_payloads", url)
+        await fetcher.fetch_html(url)
+        return entry, cached_hit
+
+    entry, cached_hit = asyncio.run(main())
+
+    assert entry["has_payloads"] and entry["etag"] is None
+    assert cached_hit == SHELL
+    assert registry.replays == 2
+    assert len(calls["static"]) == 2
+    assert calls["renders"] == 0
+
+
+def test_replay_asks_for_the_page_in_the_url_suffix(monkeypatch):
+    url = "https://replay.test/shoes/page/3"
+    registry = StubRegistry(payloads=[{"url": "https://replay.test/api/shoes?page=3", "data": [{"name": "a"}]}])
+    patch_pipeline(monkeypatch, [static_page(url, SHELL)], registry)
+
+    async def main():
+        await get_cache_manager().delete("rendered_html", url)
+        await fetcher._fetch_and_render(url)
+
+    asyncio.run(main())
+
+    assert registry.page_numbers == [3]
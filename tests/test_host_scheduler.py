@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+from core.html_processing.host_scheduler import HostScheduler
+
+
+def test_try_acquire_needs_a_free_slot_and_a_token():
+    scheduler = HostScheduler(requests_per_second=1.0, burst=2, max_in_flight=2)
+
+    first = scheduler.try_acquire("https://www.example.test/a")
+    second = scheduler.try_acquire("https://example.test/b")
+
+    assert first == second == "example.test"
+    # Both slots taken
+    assert scheduler.try_acquire("https://example.test/c") is None
+
+    scheduler.release(first)
+    # Slot free again, but the burst of two is spent for this second
+    assert scheduler.try_acquire("https://example.test/c") is None
+
+
+def test_try_acquire_does_not_jump_queued_requests():
+    scheduler = HostScheduler(requests_per_second=100.0, burst=5, max_in_flight=1)
+
+    async def run():
+        host = await scheduler.acquire("https://example.test/")
+        waiter = asyncio.ensure_future(scheduler.acquire("https://example.test/queued"))
+        await asyncio.sleep(0)
+        scheduler.release(host)
+        # The freed slot belongs to the queued request
+        stolen = scheduler.try_acquire("https://example.test/hedge")
+        scheduler.release(await waiter)
+        return stolen
+
+    assert asyncio.run(run()) is None
+
+
+def test_in_flight_cap_holds_and_cancelled_waiters_pass_their_slot_on():
+    scheduler = HostScheduler(requests_per_second=1000.0, burst=10, max_in_flight=2)
+    peak = []
+    running = []
+
+    async def fetch(i):
+        async with scheduler.slot("https://example.test/"):
+            running.append(i)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(i)
+        return i
+
+    async def run():
+        tasks = [asyncio.ensure_future(fetch(i)) for i in range(6)]
+        await asyncio.sleep(0)
+        tasks[3].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(asyncio.wait_for(run(), 2.0))
+
+    assert max(peak) == 2
+    assert [r for r in results if isinstance(r, int)] == [0, 1, 2, 4, 5]
+
+
+def test_min_interval_lasts_only_as_long_as_its_job():
+    scheduler = HostScheduler(requests_per_second=2.0)
+
+    with scheduler.min_interval("https://example.test/", 5.0):
+        with scheduler.min_interval("https://www.example.test/", 2.0):
+            # The strictest active job wins
+            assert scheduler._hosts["example.test"].interval == 5.0
+        assert scheduler._hosts["example.test"].interval == 5.0
+
+    assert scheduler._hosts["example.test"].interval == 0.5
+
+
+def test_min_interval_with_ttl_expires_and_keys_replace():
+    scheduler = HostScheduler(requests_per_second=2.0)
+    scheduler.set_min_interval("example.test", 10.0, ttl=-1.0, key="robots")
+
+    assert scheduler.try_acquire("https://example.test/") == "example.test"
+    assert scheduler._hosts["example.test"].interval == 0.5
+
+    scheduler.set_min_interval("example.test", 3.0, ttl=60.0, key="robots")
+    scheduler.set_min_interval("example.test", 1.0, ttl=60.0, key="robots")
+    assert scheduler._hosts["example.test"].interval == 1.0
+
+
+def test_idle_hosts_are_evicted():
+    scheduler = HostScheduler(requests_per_second=1000.0, idle_seconds=0.0)
+
+    busy = scheduler.try_acquire("https://busy.test/")
+    scheduler.try_acquire("https://idle.test/")
+    scheduler.release("idle.test")
+    scheduler.set_min_interval("https://slow.test/", 0.001, key="job")
+    time.sleep(0.01)
+
+    scheduler.try_acquire("https://new.test/")
+
+    assert "idle.test" not in scheduler._hosts
+    assert {busy, "slow.test", "new.test"} <= set(scheduler._hosts)
+
+
+def test_gcra_spaces_requests_after_the_burst():
+    scheduler = HostScheduler(requests_per_second=20.0, burst=2, max_in_flight=10)
+    starts = []
+
+    async def fetch():
+        async with scheduler.slot("https://example.test/"):
+            starts.append(asyncio.get_running_loop().time())
+
+    async def run():
+        await asyncio.gather(*[fetch() for _ in range(5)])
+
+    asyncio.run(run())
+
+    starts.sort()
+    # Two back-to-back, then one every 50ms
+    assert starts[1] - starts[0] < 0.02
+    assert starts[4] - starts[0] >= 0.14
+
+
+def test_hosts_do_not_wait_on_each_other():
+    scheduler = HostScheduler(requests_per_second=1.0, burst=1, max_in_flight=1)
+
+    assert scheduler.try_acquire("https://a.test/") == "a.test"
+    assert scheduler.try_acquire("https://b.test/") == "b.test"
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.html_processing import http_client
+from core.html_processing.http_client import fetch_static_html
+
+
+def run_with_transport(handler, coro_factory):
+    """Run coro_factory() with the shared client replaced by a MockTransport client"""
+    async def main():
+        previous = http_client._client
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await coro_factory()
+        finally:
+            await http_client._client.aclose()
+            http_client._client = previous
+    return asyncio.run(main())
+
+
+def test_304_returns_empty_page_instead_of_raising():
+    seen = {}
+
+    def handler(request):
+        seen["etag"] = request.headers.get("if-none-match")
+        return httpx.Response(304, headers={"etag": '"v1"'})
+
+    page = run_with_transport(handler, lambda: fetch_static_html(
+        "https://revalidate.test/page", headers={"If-None-Match": '"v1"'}
+    ))
+
+    assert seen["etag"] == '"v1"'
+    assert page.status_code == 304
+    assert page.html == ""
+    assert page.headers["etag"] == '"v1"'
+
+
+def test_error_status_raises():
+    handler = lambda request: httpx.Response(404, text="missing")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run_with_transport(handler, lambda: fetch_static_html("https://missing.test/"))
+
+
+def test_body_is_capped():
+    handler = lambda request: httpx.Response(200, headers={"content-type": "text/html"}, text="<p>" + "x" * 5000)
+
+    page = run_with_transport(handler, lambda: fetch_static_html("https://big.test/", max_bytes=1000))
+
+    assert page.truncated
+    assert len(page.html) == 1000
+
+
+def test_stop_at_head():
+    html = "<html><head><title>T</title></head><body>" + "x" * 5000 + "</body></html>"
+    handler = lambda request: httpx.Response(200, headers={"content-type": "text/html"}, text=html)
+
+    page = run_with_transport(handler, lambda: fetch_static_html("https://head.test/", stop_at_head=True))
+
+    assert page.truncated
+    assert page.html.endswith("</head>")
+
+
+def test_binary_content_type_rejected():
+    handler = lambda request: httpx.Response(200, headers={"content-type": "application/pdf"}, content=b"%PDF")
+
+    with pytest.raises(ValueError):
+        run_with_transport(handler, lambda: fetch_static_html("https://pdf.test/file"))
+
+
+def test_error_page_returned_when_not_raising():
+    handler = lambda request: httpx.Response(403, headers={"content-type": "text/html"}, text="<p>Just a moment...</p>")
+
+    page = run_with_transport(handler, lambda: fetch_static_html("https://blocked.test/", raise_for_status=False))
+
+    assert page.status_code == 403
+    assert "Just a moment" in page.html
@@ -0,0 +1,77 @@
+import json
+
+from core.html_processing.hydration import parse_hydration_state
+
+PRODUCTS = [{"id": i, "name": f"Product {i}", "price": 10 + i} for i in range(5)]
+
+
+def test_next_data_script():
+    html = (
+        '<html><script id="__NEXT_DATA__" type="application/json">'
+        + json.dumps({"props": {"pageProps": {"products": PRODUCTS}}})
+        + "</script></html>"
+    )
+
+    state = parse_hydration_state(html)
+
+    assert state["source"] == "__NEXT_DATA__"
+    assert state["data"]["props"]["pageProps"]["products"][2]["name"] == "Product 2"
+    assert state["rich"]
+
+
+def test_window_state_literal_with_undefined_and_braces_in_strings():
+    html = (
+        "<script>window.__INITIAL_STATE__ = "
+        '{"title": "a {tricky} string", "missing": undefined, "items": []};</script>'
+    )
+
+    state = parse_hydration_state(html)
+
+    assert state["source"] == "__INITIAL_STATE__"
+    assert state["data"] == {"title": "a {tricky} string", "missing": None, "items": []}
+    assert not state["rich"]
+
+
+def test_window_state_json_parse():
+    payload = json.dumps(json.dumps({"list": PRODUCTS}))
+    html = f"<script>window.__PRELOADED_STATE__ = JSON.parse({payload})</script>"
+
+    state = parse_hydration_state(html)
+
+    assert state["data"]["list"] == PRODUCTS
+    assert state["rich"]
+
+
+def test_nuxt_devalue_payload_is_unflattened():
+    flat = [["Reactive", 1], {"data": 2}, {"title": 3, "tags": 4}, "Hello world", ["Set", 5], "sale"]
+    html = '<script type="application/json" id="__NUXT_DATA__">' + json.dumps(flat) + "</script>"
+
+    state = parse_hydration_state(html)
+
+    assert state["data"] == {"data": {"title": "Hello world", "tags": ["sale"]}}
+
+
+def test_nuxt2_function_state_and_plain_pages_yield_nothing():
+    assert parse_hydration_state("<script>window.__NUXT__=(function(a){return {x:a}}(1))</script>") is None
+    assert parse_hydration_state("<html><body><p>static</p></body></html>") is None
+
+
+def test_malformed_devalue_payload_is_skipped():
+    out_of_range = '<script id="__NUXT_DATA__" type="application/json">[{"a":5}]</script>'
+    cyclic = '<script id="__NUXT_DATA__" type="application/json">[["Reactive",0]]</script>'
+
+    assert parse_hydration_state(out_of_range) is None
+    assert parse_hydration_state(cyclic) is None
+
+    # Another state on the same page is still used
+    html = cyclic + '<script>window.__INITIAL_STATE__ = {"title": "still here"}</script>'
+    assert parse_hydration_state(html)["source"] == "__INITIAL_STATE__"
+
+
+def test_callers_get_their_own_data():
+    html = '<script>window.__INITIAL_STATE__ = {"items": [{"title": "a"}]}</script>'
+
+    first = parse_hydration_state(html)
+    first["data"]["items"].clear()
+
+    assert parse_hydration_state(html)["data"]["items"] == [{"title": "a"}]
@@ -0,0 +1,25 @@
+import asyncio
+import json
+
+from core.html_processing import js_classifier
+from core.html_processing.js_classifier import log_render_outcome
+
+
+def test_outcomes_are_not_logged_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    asyncio.run(log_render_outcome("https://shop.test/", {}, True))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_outcome_log_stops_at_its_size_cap(tmp_path, monkeypatch):
+    log = tmp_path / "outcomes.jsonl"
+    monkeypatch.setitem(js_classifier.NEEDS_JS_MODEL_CONFIG, "outcome_log", str(log))
+    monkeypatch.setitem(js_classifier.NEEDS_JS_MODEL_CONFIG, "outcome_log_max_bytes", 1)
+
+    asyncio.run(log_render_outcome("https://shop.test/a", {}, True))
+    asyncio.run(log_render_outcome("https://shop.test/b", {}, False))
+
+    rows = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [row["url"] for row in rows] == ["https://shop.test/a"]
@@ -0,0 +1,68 @@
+import gc
+import weakref
+
+from core.html_processing import page_signals
+from core.html_processing.page_signals import PageSignals, get_page_signals, register_patterns
+
+PATTERNS = register_patterns(["aa", "loading", "ab"])
+CASED = register_patterns(["Data", "aA"], case_sensitive=True)
+
+HTML = "<div>aaaa aAaA Loading... loading data Data DATA abab</div>"
+
+
+class OverlappingMatcher:
+    """Stands in for the Aho-Corasick automaton: reports every (overlapping) occurrence"""
+
+    def __init__(self, needles):
+        self.needles = needles
+
+    def matches(self, text):
+        found = []
+        for needle in self.needles:
+            start = text.find(needle)
+            while start != -1:
+                found.append((start + len(needle), start, needle))
+                start = text.find(needle, start + 1)
+        for _, start, needle in sorted(found):
+            yield start, needle
+
+
+def counts(scan):
+    return {p: scan.count(p) for p in PATTERNS} | {p: scan.count(p, case_sensitive=True) for p in CASED}
+
+
+def test_automaton_counts_like_str_count(monkeypatch):
+    plain = counts(PageSignals(HTML))
+
+    def automaton():
+        patterns = dict(page_signals._patterns)
+        return OverlappingMatcher(sorted({text.lower() for text, _ in patterns})), patterns
+
+    monkeypatch.setattr(page_signals, "_get_matcher", automaton)
+    scanned = counts(PageSignals(HTML))
+
+    assert scanned == plain
+    assert scanned["aa"] == HTML.lower().count("aa") == 4
+    assert scanned["aA"] == 2
+    assert scanned["loading"] == 2
+    assert scanned["Data"] == 1
+
+
+def test_scans_are_shared_without_keeping_the_page_alive():
+    html = "".join(["<p>loading</p>"] * 1000)
+    first = get_page_signals(html)
+    assert get_page_signals(html)._counts is first._counts
+
+    page = weakref.ref(first)
+    del first
+    # Only the counts are cached: nothing refers to the PageSignals (and its HTML) anymore
+    gc.collect()
+    assert page() is None
+    assert all(not isinstance(v, str) for v in vars(next(iter(page_signals._scans.values()))).values())
+
+
+def test_unregistered_patterns_are_counted_on_demand():
+    signals = get_page_signals(HTML)
+
+    assert signals.count("DATA", case_sensitive=True) == 1
+    assert signals.has("abab")
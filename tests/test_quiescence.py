@@ -0,0 +1,55 @@
+import asyncio
+
+from core.html_processing import quiescence
+from core.html_processing.quiescence import (
+    get_ready_selectors,
+    remember_ready_selectors,
+    wait_for_render,
+)
+
+
+class FakePage:
+    """Answers the in-page wait scripts after a set delay"""
+
+    def __init__(self, selector_delay, selector_settles, quiet_delay):
+        self.selector = (selector_delay, selector_settles)
+        self.quiet = (quiet_delay, True)
+
+    async def evaluate(self, script, args):
+        delay, settled = self.selector if script == quiescence.SELECTOR_SCRIPT else self.quiet
+        await asyncio.sleep(delay)
+        return {"settled": settled}
+
+
+def timed_render(page, selectors, wait_time=5.0):
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await wait_for_render(page, wait_time, "smart", selectors)
+        return loop.time() - start
+    return asyncio.run(run())
+
+
+def test_ready_selectors_are_keyed_by_path_template():
+    remember_ready_selectors("https://www.shop.test/item/123", {"title": "h1.title"})
+
+    assert get_ready_selectors("https://shop.test/item/456") == ["h1.title"]
+    assert get_ready_selectors("https://shop.test/search?q=x") == []
+
+
+def test_quiescence_ends_the_wait_when_selectors_no_longer_match():
+    page = FakePage(selector_delay=5.0, selector_settles=False, quiet_delay=0.05)
+
+    assert timed_render(page, ["h1.gone"]) < 1.0
+
+
+def test_selectors_end_the_wait_before_the_page_settles():
+    page = FakePage(selector_delay=0.05, selector_settles=True, quiet_delay=5.0)
+
+    assert timed_render(page, ["h1.title"]) < 1.0
+
+
+def test_unsettled_selector_wait_falls_back_to_quiescence():
+    page = FakePage(selector_delay=0.05, selector_settles=False, quiet_delay=0.2)
+
+    assert 0.15 < timed_render(page, ["h1.gone"]) < 1.0
@@ -0,0 +1,90 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.html_processing.circuit_breaker import CircuitOpenError
+from core.html_processing.render_client import (
+    RemoteRenderError,
+    RenderServiceClient,
+    RenderWorkersUnavailable,
+)
+
+WORKERS = ["http://w1.test", "http://w2.test"]
+
+
+def render_with(handler):
+    """Render through both workers; returns (result or exception, hosts called, client)"""
+    calls = []
+
+    def record(request):
+        calls.append(request.url.host)
+        return handler(request)
+
+    async def run():
+        client = RenderServiceClient(WORKERS)
+        await client._client.aclose()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+        try:
+            return await client.render("https://shop.test/"), client
+        except Exception as e:
+            return e, client
+        finally:
+            await client.close()
+
+    result, client = asyncio.run(run())
+    return result, calls, client
+
+
+def test_unreachable_worker_is_skipped():
+    def handler(request):
+        if request.url.host == "w1.test":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"html": "<p>ok</p>", "final_url": "https://shop.test/"})
+
+    result, calls, client = render_with(handler)
+
+    assert result == ("<p>ok</p>", "https://shop.test/", [])
+    assert calls == ["w1.test", "w2.test"]
+    assert not client.endpoints[0].is_up()
+
+
+def test_no_reachable_worker():
+    def handler(request):
+        raise httpx.ConnectTimeout("slow connect", request=request)
+
+    result, calls, _ = render_with(handler)
+
+    assert isinstance(result, RenderWorkersUnavailable)
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("error", [httpx.ReadTimeout, httpx.RemoteProtocolError])
+def test_accepted_render_is_not_dispatched_again(error):
+    def handler(request):
+        raise error("worker busy", request=request)
+
+    result, calls, client = render_with(handler)
+
+    assert isinstance(result, RemoteRenderError)
+    assert calls == ["w1.test"]
+    assert all(endpoint.is_up() for endpoint in client.endpoints)
+
+
+def test_worker_circuit_open_is_passed_back():
+    def handler(request):
+        detail = {"error": "circuit_open", "host": "shop.test", "retry_after": 42.0, "reason": "HTTP 503"}
+        return httpx.Response(503, json={"detail": detail})
+
+    result, calls, _ = render_with(handler)
+
+    assert isinstance(result, CircuitOpenError)
+    assert (result.host, result.retry_after) == ("shop.test", 42.0)
+    assert calls == ["w1.test"]
+
+
+def test_failed_render_is_a_remote_error():
+    result, _, _ = render_with(lambda request: httpx.Response(502, json={"detail": "Render failed: boom"}))
+
+    assert isinstance(result, RemoteRenderError)
+    assert "boom" in str(result)
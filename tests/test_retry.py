@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from core.html_processing.circuit_breaker import CircuitOpenError
+from core.processing.retry import (
+    CIRCUIT_OPEN, CLIENT_ERROR, NETWORK, NOT_HTML, PROTECTION, RATE_LIMITED,
+    SERVER_ERROR, TIMEOUT, UNKNOWN,
+    DeferredRetryQueue, LatencyTracker, RetryPolicy,
+    classify_error, get_retry_after, hedged,
+)
+
+
+def status_error(status, headers=None):
+    request = httpx.Request("GET", "https://example.test/")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+
+@pytest.mark.parametrize("error, kind", [
+    (status_error(429), RATE_LIMITED),
+    (status_error(403), PROTECTION),
+    (status_error(503, {"cf-ray": "abc"}), PROTECTION),
+    (status_error(503), SERVER_ERROR),
+    (status_error(404), CLIENT_ERROR),
+    (httpx.ReadTimeout("slow"), TIMEOUT),
+    (asyncio.TimeoutError(), TIMEOUT),
+    (httpx.ConnectError("refused"), NETWORK),
+    (ValueError("Not an HTML page (application/pdf)"), NOT_HTML),
+    (RuntimeError("Cloudflare challenge not solved"), PROTECTION),
+    (RuntimeError("boom"), UNKNOWN),
+    (CircuitOpenError("example.test", 12.0), CIRCUIT_OPEN),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_retry_after_from_header_and_circuit():
+    assert get_retry_after(status_error(429, {"retry-after": "7"})) == 7.0
+    assert get_retry_after(status_error(429)) is None
+    assert get_retry_after(CircuitOpenError("example.test", 12.0)) == 12.0
+    assert get_retry_after(RuntimeError("boom")) is None
+
+
+# ============================================================================
+# BACKOFF / QUEUE
+# ============================================================================
+
+def test_policy_retries_only_retryable_kinds_up_to_the_limit():
+    policy = RetryPolicy(max_retries=2)
+
+    assert policy.should_retry(TIMEOUT, 0)
+    assert policy.should_retry(TIMEOUT, 1)
+    assert not policy.should_retry(TIMEOUT, 2)
+    assert not policy.should_retry(CLIENT_ERROR, 0)
+    assert not policy.should_retry(NOT_HTML, 0)
+
+
+def test_backoff_is_jittered_capped_and_honors_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+
+    for attempt in range(6):
+        delay = policy.backoff(attempt, TIMEOUT)
+        ceiling = min(8.0, 2 ** attempt)
+        assert ceiling / 2 <= delay <= ceiling
+
+    assert 2.0 <= policy.backoff(0, RATE_LIMITED) <= 4.0
+    assert policy.backoff(0, RATE_LIMITED, retry_after=20.0) == 20.0
+    assert policy.backoff(0, RATE_LIMITED, retry_after=1000.0) == 32.0
+
+
+def test_deferred_queue_pops_items_in_due_order():
+    queue = DeferredRetryQueue()
+    queue.push("https://a.test/", 1, 0.0, TIMEOUT)
+    queue.push("https://b.test/", 1, 60.0, TIMEOUT)
+    queue.push("https://c.test/", 2, -1.0, NETWORK)
+
+    due = queue.pop_due()
+
+    assert [item.url for item in due] == ["https://c.test/", "https://a.test/"]
+    assert len(queue) == 1
+
+
+# ============================================================================
+# HEDGING
+# ============================================================================
+
+def test_latency_percentile_is_tracked_per_host():
+    tracker = LatencyTracker(min_samples=20)
+    for i in range(100):
+        tracker.record("fast.test", 0.1)
+        tracker.record("slow.test", 5.0 + i / 100)
+
+    assert tracker.percentile("fast.test", 95) == 0.1
+    assert tracker.percentile("slow.test", 95) > 5.9
+    assert tracker.percentile("new.test", 95) is None
+
+
+class Calls:
+    """fn for hedged(): the first call is slow, later ones fast"""
+
+    def __init__(self, first=1.0, later=0.01):
+        self.delays = [first, later]
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        delay = self.delays[min(self.started, 1)]
+        self.started += 1
+        call = self.started
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return call
+
+
+def test_hedge_wins_when_primary_is_slow_and_releases_its_slot():
+    calls = Calls()
+    released = []
+
+    async def run():
+        result = await hedged(calls, 0.05, lambda: (lambda: released.append(True)))
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == 2
+    assert calls.started == 2
+    assert calls.cancelled == 1
+    assert released == [True]
+
+
+def test_no_hedge_without_a_free_slot():
+    calls = Calls(first=0.1)
+
+    start = time.monotonic()
+    assert asyncio.run(hedged(calls, 0.02, lambda: None)) == 1
+
+    assert calls.started == 1
+    assert time.monotonic() - start >= 0.09
+
+
+def test_fast_primary_never_hedges():
+    calls = Calls(first=0.01)
+    acquired = []
+
+    assert asyncio.run(hedged(calls, 0.5, lambda: acquired.append(True))) == 1
+    assert calls.started == 1
+    assert acquired == []
+
+
+def test_hedge_falls_back_to_the_other_copy_on_failure():
+    attempts = []
+
+    async def flaky():
+        attempts.append(True)
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise httpx.ConnectError("reset")
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    assert asyncio.run(hedged(flaky, 0.01)) == "ok"
+
+
+def test_both_copies_failing_raises():
+    async def broken():
+        await asyncio.sleep(0.02)
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(hedged(broken, 0.01))
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from core.html_processing.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(True)
+        await asyncio.sleep(0.02)
+        return "html"
+
+    async def run():
+        return await asyncio.gather(*[flight.do("url", fetch) for _ in range(5)])
+
+    assert asyncio.run(run()) == ["html"] * 5
+    assert len(calls) == 1
+    assert flight.get_stats()["coalesced"] == 4
+    assert flight.get_stats()["in_flight"] == 0
+
+
+def test_later_callers_start_a_new_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(True)
+        return len(calls)
+
+    async def run():
+        return [await flight.do("url", fetch), await flight.do("url", fetch)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "html"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("url", fetch))
+        follower = asyncio.ensure_future(flight.do("url", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "html"
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(*[flight.do("url", fetch) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do("url", fetch))
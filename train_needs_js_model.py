@@ -0,0 +1,21 @@
+"""
+Train / evaluate the learned needs-JS classifier
+Fits logistic regression on the render outcomes the API logs when
+NEEDS_JS_MODEL_CONFIG["outcome_log"] is set (off by default) and saves the
+model the detector loads on startup. Requires NumPy.
+
+Usage:
+    python train_needs_js_model.py train                  # hold-out report, then fit on everything and save
+    python train_needs_js_model.py evaluate               # score the saved model on the log
+    python train_needs_js_model.py train --threshold 0.6  # render less eagerly (fewer false-positive renders)
+    python train_needs_js_model.py train --log outcomes.jsonl --model config/needs_js_model.json
+"""
+import sys
+
+# Same import order as main.py: api before core (core.extraction <-> api.dependencies)
+import api  # noqa: F401
+from core.html_processing.js_classifier import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())